@@ -4,6 +4,8 @@ import numpy as np
 import os
 from datetime import datetime
 from data_processing.extract_tables import extract_tables
+from data_processing.calendar_dimension import period_labels
+from data_processing.master_store import master_exists, load_day, rows_of_day, save_day
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 try:
@@ -13,77 +15,119 @@ except Exception as e:
     logging.error(f"Failed to extract tables: {e}")
     data_frames = {}
 
-def calculate_mitarbeiterbedarf(row, original_table):
-    """Calculate the Mitarbeiterbedarf value for a given row."""
-    try:
-        current_pb_type = row['PB Type'].replace(" ", "")
-        current_period = row['Period']
-        today = datetime.now().date()  # Current date without time
-
-        # Normalize PB Type and remove spaces for consistent comparison
-        original_table['PB Type'] = original_table['PB Type'].astype(str).str.replace(r"\s+", "", regex=True).str.strip()
-        current_pb_type = current_pb_type.replace(" ", "")
-
-        # Ensure 'Date' is in datetime format
-        original_table['Date'] = pd.to_datetime(original_table['Date'], errors='coerce')
-
-        # Filter the original table for matching PB Type, Period, and today's date
-        matching_rows = original_table[
-            (original_table['PB Type'] == current_pb_type) &
-            (original_table['Period'] == current_period) &
-            (original_table['Date'].dt.date == today)
-        ]
-
-        if matching_rows.empty:
-            logging.warning(f"No data found for PB Type: {current_pb_type}, Period: {current_period} on {today}. Check input data.")
-            return np.nan
-
-        # Calculate total production hours
-        prod_hours_mask = (
-            (matching_rows['Attribute'] == 'Production Hours') |
-            ((current_pb_type == 'PB1') & (matching_rows['Attribute'] == 'Wartung'))
-        )
-        total_production_hours = matching_rows[prod_hours_mask]['Value'].sum()
-
-        if total_production_hours <= 0:
-            logging.warning(f"Invalid production hours ({total_production_hours}) for {current_pb_type}, Period {current_period}.")
-            return np.nan
-
-        # Calculate employee factor
-        employee_factor = matching_rows[
-            matching_rows['Attribute'] == 'Arbeitstage'
-        ]['Value'].sum() * 7.25
-
-        # Calculate effective availability
-        availability_fields = ['Urlaubsquoten(Plan)', 'Krankheitsquoten(Plan)', 'Gleitzeit(Plan)', 'Verteilzeit(Plan)']
-        availability_values = matching_rows[
-            matching_rows['Attribute'].isin(availability_fields)
-        ]['Value'].sum()
-        effective_availability = 1 - (availability_values / 100)
-
-        if 'SMT_OEE' in data_frames and not data_frames['SMT_OEE'].empty:
-            extracted_oee = data_frames['SMT_OEE'].iloc[0, 0] / 100  # Convert percentage to decimal
-        else:
-            logging.warning("OEE data is missing! Using default OEE = 0.807 for PB1.")
-            extracted_oee = 0.807  # Default fallback value
-
-        # ✅ Use extracted OEE dynamically in calculations
-        oee_adjusted = extracted_oee if current_pb_type == 'PB1' else 1
-        # OEE Adjustment
-        #oee_adjusted = 0.807 if current_pb_type == 'PB1' else 1
+MITARBEITERBEDARF_ATTRIBUTE = 'Mitarbeiterbedarf_Brutto(Plan)'
+AVAILABILITY_FIELDS = ['Urlaubsquoten(Plan)', 'Krankheitsquoten(Plan)', 'Gleitzeit(Plan)', 'Verteilzeit(Plan)']
+DEFAULT_OEE = 0.807
 
-        denominator = employee_factor * effective_availability * oee_adjusted
-        if denominator <= 0:
-            logging.warning(f"Denominator {denominator} invalid for {current_pb_type}, Period {current_period}.")
-            return np.nan
 
-        mitarbeiterbedarf = total_production_hours / denominator
-        logging.info(f"Calculated value for {current_pb_type} Period {current_period}: {mitarbeiterbedarf:.2f}")
-        return mitarbeiterbedarf
-
-    except Exception as e:
-        logging.error(f"Calculation error: {str(e)}", exc_info=True)
-        return np.nan
+def get_extracted_oee():
+    """Return the SMT OEE from the Berechnungsbasis as a decimal, or the default for PB1."""
+    try:
+        if 'SMT_OEE' in data_frames and not data_frames['SMT_OEE'].empty:
+            return float(data_frames['SMT_OEE'].iloc[0, 0]) / 100  # Convert percentage to decimal
+    except (TypeError, ValueError) as e:
+        logging.error(f"Invalid OEE value in SMT_OEE table: {e}")
+    logging.warning(f"OEE data is missing! Using default OEE = {DEFAULT_OEE} for PB1.")
+    return DEFAULT_OEE
+
+
+def calculate_mitarbeiterbedarf(today_df, oee=None):
+    """
+    Calculate Mitarbeiterbedarf for every (PB Type, Period) pair of today's rows that has
+    production hours (or Wartung for PB1) in one pass. Periods are matched by their canonical
+    label, so '01.2025' and 1.2025 are the same month.
+
+    Each value is: production hours (plus Wartung for PB1) divided by
+    Arbeitstage * 7.25 * (1 - availability quotas / 100) * OEE (PB1 only).
+    Pairs with invalid production hours or denominator get NaN.
+
+    :param today_df: Today's rows of the master file (Wartung already added).
+    :param oee: OEE for PB1 as a decimal; read from the Berechnungsbasis if not given.
+    :return: DataFrame with 'Period', 'PB Type', 'Attribute' and 'Value' columns.
+    """
+    if oee is None:
+        oee = get_extracted_oee()
+
+    pb_type = today_df['PB Type'].astype(str).str.replace(r"\s+", "", regex=True)
+    attribute = today_df['Attribute']
+    value = pd.to_numeric(today_df['Value'], errors='coerce')
+
+    # Mask each value once into the quantity it contributes to, then sum per pair
+    is_pb1 = pb_type == 'PB1'
+    is_production = (attribute == 'Production Hours') | (is_pb1 & (attribute == 'Wartung'))
+    components = pd.DataFrame({
+        'PB Type': pb_type,
+        'Period': period_labels(today_df['Period']),
+        'production_rows': is_production,
+        'production_hours': value.where(is_production),
+        'arbeitstage': value.where(attribute == 'Arbeitstage'),
+        'availability': value.where(attribute.isin(AVAILABILITY_FIELDS)),
+    })
+    components = components[today_df['PB Type'].notna()]
+    sums = components.groupby(['PB Type', 'Period'], sort=False).sum()
+    # Pairs without any production hours row (e.g. months before the production plan) get no row
+    sums = sums[sums['production_rows'] > 0]
+
+    oee_adjusted = np.where(sums.index.get_level_values('PB Type') == 'PB1', oee, 1)
+    denominator = sums['arbeitstage'] * 7.25 * (1 - sums['availability'] / 100) * oee_adjusted
+    valid = (sums['production_hours'] > 0) & (denominator > 0)
+    mitarbeiterbedarf = (sums['production_hours'] / denominator).where(valid)
+
+    invalid = int((~valid).sum())
+    if invalid:
+        logging.warning(f"Mitarbeiterbedarf: {invalid} of {len(sums)} PB Type/Period pairs have invalid "
+                        f"production hours or denominator and were set to NaN.")
+
+    result = mitarbeiterbedarf.rename('Value').reset_index()
+    result['Attribute'] = MITARBEITERBEDARF_ATTRIBUTE
+    logging.info(f"Calculated Mitarbeiterbedarf for {len(result)} PB Type/Period pairs.")
+    return result[['Period', 'PB Type', 'Attribute', 'Value']]
+
+
+def add_mitarbeiterbedarf(df):
+    """
+    Replace today's Mitarbeiterbedarf_Brutto(Plan) rows of a master DataFrame with fresh calculations.
+    """
+    df = df.copy()
+    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    today = datetime.now().date()
+
+    logging.info(f"📌 Initial data rows: {df.shape[0]}")
+
+    # Remove existing entries for today's Mitarbeiterbedarf_Brutto(Plan)
+    df_clean = df[~(
+        (df['Attribute'] == MITARBEITERBEDARF_ATTRIBUTE) &
+        rows_of_day(df['Date'], today)
+    )]
+
+    logging.info(f"📌 Data after removing today's existing values: {df_clean.shape[0]}")
+
+    # Normalize today's PB Types ('PB 1' -> 'PB1') the same way as the calculation keys
+    df_clean = df_clean.copy()
+    today_mask = rows_of_day(df_clean['Date'], today)
+    normalize_mask = today_mask & df_clean['PB Type'].notna()
+    df_clean.loc[normalize_mask, 'PB Type'] = (
+        df_clean.loc[normalize_mask, 'PB Type'].astype(str).str.replace(r"\s+", "", regex=True)
+    )
+
+    # Generate new calculations from today's rows only, one row per PB Type/Period pair
+    calculation_rows = calculate_mitarbeiterbedarf(df_clean[today_mask])
+    calculation_rows['Date'] = pd.to_datetime(datetime.now().replace(minute=0, second=0, microsecond=0))
+
+    logging.info(f"📌 New rows to append: {calculation_rows.shape[0]}")
+
+    # ✅ Append new calculations to existing data
+    final_df = pd.concat([df_clean, calculation_rows], ignore_index=True)
+
+    # ✅ Drop today's PB Types ('PB 1', 'PB 2', etc.) before saving; older rows are kept as they are
+    final_df = final_df[~(
+        final_df['PB Type'].isin(['PB 1', 'PB 2', 'PB 3', 'PB 4']) &
+        rows_of_day(final_df['Date'], today)
+    )]
+
+    logging.info(f"📌 Final data rows after appending and filtering: {final_df.shape[0]}")
+    return final_df
 
 
 def process_file(input_path, output_dir):
@@ -91,46 +135,14 @@ def process_file(input_path, output_dir):
         # Ensure output directory exists
         os.makedirs(output_dir, exist_ok=True)
 
-        # Read input data
-        df = pd.read_excel(input_path, sheet_name='Sheet1')
-        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        today = datetime.now().date()
-
-        logging.info(f"📌 Initial data rows: {df.shape[0]}")
-
-        # Remove existing entries for today's Mitarbeiterbedarf_Brutto(Plan)
-        df_clean = df[~(
-            (df['Attribute'] == 'Mitarbeiterbedarf_Brutto(Plan)') &
-            (df['Date'].dt.date == today)
-        )]
-
-        logging.info(f"📌 Data after removing today's existing values: {df_clean.shape[0]}")
-
-        # Generate new calculations
-        calculation_rows = df_clean[['Period', 'PB Type']].copy()
-        calculation_rows['Attribute'] = 'Mitarbeiterbedarf_Brutto(Plan)'
-        calculation_rows['Value'] = calculation_rows.apply(
-            lambda r: calculate_mitarbeiterbedarf(r, df_clean), axis=1
-        )
-        calculation_rows['Date'] = pd.to_datetime(datetime.now().replace(minute=0, second=0, microsecond=0))
-
-        logging.info(f"📌 New rows to append: {calculation_rows.shape[0]}")
-
-        # ✅ Append new calculations to existing data
-        final_df = pd.concat([df_clean, calculation_rows], ignore_index=True)
-
-        # ✅ Drop PB Types ('PB 1', 'PB 2', etc.) before saving
-        final_df = final_df[~final_df['PB Type'].isin(['PB 1', 'PB 2', 'PB 3', 'PB 4'])]
-
-        logging.info(f"📌 Final data rows after appending and filtering: {final_df.shape[0]}")
-
         # Generate output path
         output_path = os.path.join(output_dir, os.path.basename(input_path))
 
-        # ✅ Save to output location
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            final_df.to_excel(writer, sheet_name='Sheet1', index=False)
+        # Read input data and calculate
+        final_df = add_mitarbeiterbedarf(load_day(input_path, output_path, datetime.now().date()))
+
+        # ✅ Save to output location (only today's partition changes)
+        save_day(final_df, input_path, output_path, datetime.now().date())
 
         logging.info(f"✔ Successfully processed and appended to: {output_path}")
 
@@ -151,7 +163,7 @@ if __name__ == "__main__":
 
     # Process each file
     for file_type, file_path in input_files.items():
-        if os.path.exists(file_path):
+        if master_exists(file_path):
             process_file(file_path, output_directory)
         else:
             logging.error(f"Input file not found: {file_path}")
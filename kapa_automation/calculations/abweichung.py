@@ -1,117 +1,112 @@
 import logging
 import pandas as pd
-import numpy as np
 import os
 from datetime import datetime
+from data_processing.master_store import master_exists, load_day, rows_of_day, save_day
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def calculate_abweichung(row, original_table):
-    """
-    Calculate Abweichung by comparing actual staff with MitarbeiterbedarfBrutto for a given PB Type and Period.
-    """
-    try:
-        current_pb_type = row['PB Type']
-        current_period = row['Period']
-        today = datetime.now().date()  # Consistent datetime format
-
-        # Ensure 'Date' is in consistent format
-        original_table['Date'] = pd.to_datetime(original_table['Date'], format='%d.%m.%Y %H:%M', errors='coerce', dayfirst=True)
+BEDARF_ATTRIBUTE = 'Mitarbeiterbedarf_Brutto(Plan)'
+IST_ATTRIBUTE = 'Mitarbeiter(IST)'
 
-        # Filter rows for Mitarbeiterbedarf_Brutto(Plan)
-        mitarbeiterbedarf_brutto_table = original_table[
-            original_table['Attribute'].str.strip() == 'Mitarbeiterbedarf_Brutto(Plan)'
-        ]
 
-        mitarbeiterbedarf_brutto_table['Date'] = pd.to_datetime(
-            mitarbeiterbedarf_brutto_table['Date'], format='%d.%m.%Y %H:%M', errors='coerce', dayfirst=True
-        )
-
-        # Filter Mitarbeiterbedarf_Brutto rows for matching PB Type, Period, and Date
-        filtered_bedarf = mitarbeiterbedarf_brutto_table[
-            (mitarbeiterbedarf_brutto_table['PB Type'] == current_pb_type) &
-            (mitarbeiterbedarf_brutto_table['Period'] == current_period) &
-            (mitarbeiterbedarf_brutto_table['Date'].dt.date == today)
-        ]
+def _latest_values(today_df, attribute, pair_index):
+    """
+    Return the last value of an attribute for every (PB Type, Period) pair.
+    The last row wins even if its value is NaN; pairs without a row get 0.
+    """
+    rows = today_df.loc[today_df['Attribute'].astype(str).str.strip() == attribute, ['PB Type', 'Period', 'Value']]
+    latest = rows.drop_duplicates(subset=['PB Type', 'Period'], keep='last').set_index(['PB Type', 'Period'])['Value']
+    found = pair_index.isin(latest.index)
+    return pd.Series(latest.reindex(pair_index).to_numpy(), index=pair_index).where(found, 0)
 
-        mitarbeiterbedarf_brutto_value = filtered_bedarf['Value'].iloc[-1] if not filtered_bedarf.empty else 0
 
-        # Get actual staff for today's date
-        filtered_staff = original_table[
-            (original_table['Attribute'].str.strip() == 'Mitarbeiter(IST)') &
-            (original_table['PB Type'] == current_pb_type) &
-            (original_table['Period'] == current_period) &
-            (original_table['Date'].dt.date == today)
-        ]
+def calculate_abweichung(today_df):
+    """
+    Calculate Abweichung (actual staff minus MitarbeiterbedarfBrutto) for every
+    (PB Type, Period) pair of today's rows with a single keyed join.
 
-        actual_staff = filtered_staff['Value'].iloc[-1] if not filtered_staff.empty else 0
+    :param today_df: Today's rows of the master file.
+    :return: DataFrame with 'Period', 'PB Type', 'Attribute' and 'Value' columns.
+    """
+    try:
+        abweichung_table = today_df[['Period', 'PB Type']].drop_duplicates().reset_index(drop=True)
+        pair_index = pd.MultiIndex.from_frame(abweichung_table[['PB Type', 'Period']])
 
-        # Calculate Abweichung as the difference between actual staff and MitarbeiterbedarfBrutto
-        abweichung = actual_staff - mitarbeiterbedarf_brutto_value
+        mitarbeiterbedarf_brutto = _latest_values(today_df, BEDARF_ATTRIBUTE, pair_index)
+        actual_staff = _latest_values(today_df, IST_ATTRIBUTE, pair_index)
 
-        logging.info(f"Abweichung -> PB Type: {current_pb_type}, Period: {current_period}, "
-                     f"Staff: {actual_staff}, Bedarf: {mitarbeiterbedarf_brutto_value}, Result: {abweichung}")
+        abweichung_table['Attribute'] = 'Abweichung'
+        abweichung_table['Value'] = (actual_staff - mitarbeiterbedarf_brutto).to_numpy()
 
-        return abweichung
+        logging.info(f"Abweichung calculated for {len(abweichung_table)} PB Type/Period pairs "
+                     f"({int(abweichung_table['Value'].isna().sum())} without a valid result).")
+        return abweichung_table
 
     except Exception as e:
         logging.error(f"Error calculating Abweichung: {e}")
-        return np.nan
+        return pd.DataFrame(columns=['Period', 'PB Type', 'Attribute', 'Value'])
 
-def calculate_and_append_abweichung(file_path, output_dir):
+def add_abweichung(master_df, label="master file"):
     """
-    Load the master file, calculate 'Abweichung', and append the results to a new output file.
+    Append today's Abweichung rows to a master DataFrame.
+    Returns the DataFrame unchanged if there is no data for today.
     """
-    try:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+    # Ensure Value column is numeric and clean up date
+    df = master_df.copy()
+    df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+    df['Date'] = pd.to_datetime(df['Date'], format='%d.%m.%Y %H:%M', errors='coerce', dayfirst=True)
 
-        logging.info(f"Processing file: {file_path}")
-        df = pd.read_excel(file_path, sheet_name='Sheet1')
+    today = datetime.now().date()
+    df_filtered = df[rows_of_day(df['Date'], today)]
 
-        # Ensure Value column is numeric and clean up date
-        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-        df['Date'] = pd.to_datetime(df['Date'], format='%d.%m.%Y %H:%M', errors='coerce', dayfirst=True)
+    if df_filtered.empty:
+        logging.warning(f"No data found for today's date {today} in {label}. Skipping calculation.")
+        return master_df
 
-        today = datetime.now().date()
-        df_filtered = df[df['Date'].dt.date == today]
+    logging.info(f"Filtered data for today's date: {df_filtered.shape[0]} rows")
 
-        if df_filtered.empty:
-            logging.warning(f"No data found for today's date {today} in {file_path}. Skipping calculation.")
-            return
+    # Calculate Abweichung for all PB Type/Period pairs at once
+    abweichung_table = calculate_abweichung(df_filtered)
+    abweichung_table['Date'] =pd.to_datetime(datetime.now().replace(minute=0, second=0, microsecond=0))  # Consistent datetime format
 
-        logging.info(f"Filtered data for today's date: {df_filtered.shape[0]} rows")
+    logging.info(f"New Abweichung rows calculated: {abweichung_table.shape[0]}")
 
-        # Prepare Abweichung calculation table
-        abweichung_table = df_filtered[['Period', 'PB Type']].drop_duplicates()
-        abweichung_table['Attribute'] = 'Abweichung'
-        abweichung_table['Value'] = abweichung_table.apply(
-            lambda row: calculate_abweichung(row, df), axis=1
-        )
-        abweichung_table['Date'] =pd.to_datetime(datetime.now().replace(minute=0, second=0, microsecond=0))  # Consistent datetime format
+    if abweichung_table.empty:
+        logging.warning(f"No new 'Abweichung' entries to append for {label}")
+        return master_df
 
-        logging.info(f"New Abweichung rows calculated: {abweichung_table.shape[0]}")
+    # ✅ Debugging: Print shapes before appending
+    print(f"📌 Existing Data Before Appending: {df.shape}")
+    print(f"📌 New Abweichung Rows to Append: {abweichung_table.shape}")
 
-        if abweichung_table.empty:
-            logging.warning(f"No new 'Abweichung' entries to append for {file_path}")
-            return
+    # ✅ Append the calculated Abweichung rows to the existing DataFrame
+    df_combined = pd.concat([df, abweichung_table], ignore_index=True)
 
-        # ✅ Debugging: Print shapes before appending
-        print(f"📌 Existing Data Before Appending: {df.shape}")
-        print(f"📌 New Abweichung Rows to Append: {abweichung_table.shape}")
+    print(f"📌 Final Data After Appending: {df_combined.shape}")
+    return df_combined
 
-        # ✅ Append the calculated Abweichung rows to the existing DataFrame
-        df_combined = pd.concat([df, abweichung_table], ignore_index=True)
 
-        print(f"📌 Final Data After Appending: {df_combined.shape}")
+def calculate_and_append_abweichung(file_path, output_dir):
+    """
+    Load the master file, calculate 'Abweichung', and append the results to a new output file.
+    """
+    try:
+        if not master_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        logging.info(f"Processing file: {file_path}")
+        output_path = os.path.join(output_dir, os.path.basename(file_path))
+        df = load_day(file_path, output_path, datetime.now().date())
+        df_combined = add_abweichung(df, label=file_path)
+        if df_combined is df:
+            return
 
         # Save to the output directory
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, os.path.basename(file_path))
 
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df_combined.to_excel(writer, sheet_name='Sheet1', index=False)
+        save_day(df_combined, file_path, output_path, datetime.now().date())
 
         logging.info(f"✔ Abweichung calculation completed and saved to: {output_path}")
 
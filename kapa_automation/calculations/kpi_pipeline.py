@@ -0,0 +1,53 @@
+import logging
+import os
+from datetime import datetime
+from data_processing.master_store import master_exists, load_day, save_day
+from calculations.wartung import add_wartung
+from calculations.Mitarbeiterbedarf_Brutto import add_mitarbeiterbedarf
+from calculations.abweichung import add_abweichung
+from calculations.utilization import add_utilization
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def run_kpi_pipeline(file_path, personal_factor_avg, personal_factor_df, output_dir):
+    """
+    Run Wartung, Mitarbeiterbedarf, Abweichung and Utilization on one master file in memory.
+
+    Only the rows the stages can change are read (today's partition when writing back
+    to the same master), passed through all four calculation stages and written
+    once at the end. Wartung errors abort the run (as in process_wartung); a failing
+    later stage is logged and skipped, like its standalone process_* function.
+    """
+    if not master_exists(file_path):
+        logging.warning(f"File not found: {file_path}. Skipping KPI calculation.")
+        return
+
+    label = os.path.basename(file_path)
+    output_path = os.path.join(output_dir, label)
+    today = datetime.now().date()
+    logging.info(f"Running KPI pipeline for {file_path}")
+    df = load_day(file_path, output_path, today)
+
+    df = add_wartung(df, personal_factor_avg, label=label)
+
+    stages = [
+        ("Mitarbeiterbedarf", lambda frame: add_mitarbeiterbedarf(frame)),
+        ("Abweichung", lambda frame: add_abweichung(frame, label=label)),
+    ]
+    if personal_factor_df is not None:
+        stages.append(("Utilization", lambda frame: add_utilization(frame, personal_factor_df, label=label)))
+    else:
+        logging.error("❌ Personal_Factor table is missing. Skipping Utilization.")
+
+    for stage_name, stage in stages:
+        try:
+            df = stage(df)
+            logging.info(f"{stage_name} calculation completed for {label}.")
+        except Exception as e:
+            logging.error(f"Error during {stage_name} calculation for {label}: {e}", exc_info=True)
+
+    os.makedirs(output_dir, exist_ok=True)
+    save_day(df, file_path, output_path, today)
+    logging.info(f"✔ KPI pipeline completed and saved to: {output_path}")
@@ -4,77 +4,79 @@ import os
 import numpy as np
 from data_processing.extract_tables import extract_tables
 from datetime import datetime
+from data_processing.master_store import master_exists, load_day, rows_of_day, save_day
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+UTILIZATION_ATTRIBUTES = ['Production Hours', 'Arbeitstage', 'Mitarbeiterbedarf_Brutto(Plan)', 'Mitarbeiter(IST)']
+
+
 def calculate_utilization(df, personal_factor_df):
+    """
+    Calculate Utilization for every (PB Type, Period) pair of today's rows.
+
+    Today's rows are pivoted once (one column per attribute, last value wins) and
+    both formulas are evaluated as column arithmetic:
+    - PB1: Production Hours * 100 / (personal factor * Arbeitstage * 3 * 7.25)
+    - other PB Types: Mitarbeiterbedarf_Brutto(Plan) / Mitarbeiter(IST) * 100
+    """
     try:
         personal_factor_constant = (personal_factor_df['Personal\nFactor'] * personal_factor_df['Result']).sum()
         logging.info(f"Personal Factor Constant: {personal_factor_constant}")
 
         # Ensure Date is parsed correctly
-        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+        dates = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
 
         # Check for invalid dates
-        if df['Date'].isna().sum() > 0:
+        if dates.isna().sum() > 0:
             logging.warning("Some dates could not be parsed correctly. Check the format in Excel.")
 
         today = datetime.now().date()  # Use only the date (ignore time)
 
-        # Clean up column types
-        df['Attribute'] = df['Attribute'].astype(str).str.strip()
-        df['PB Type'] = df['PB Type'].astype(str).str.strip()
-        df['Period'] = df['Period'].astype(str).str.strip()
-
-        def calculate_row(row):
-            pb_type = str(row['PB Type']).strip()
-            period = str(row['Period']).strip()
-
-            # Filter today's data
-            df_today = df[
-                (df['PB Type'] == pb_type) & 
-                (df['Period'] == period) & 
-                (df['Date'].dt.date == today)
-            ]
-
-            if df_today.empty:
-                logging.warning(f"No data found for PB Type: {pb_type}, Period: {period} on {today}")
-                return np.nan
-
-            df_today = df_today.drop_duplicates(subset=['PB Type', 'Period', 'Attribute'], keep='last')
-
-            # PB1 uses "Production Hours" and "Kurzarbeitsplanung"
-            if pb_type == 'PB1':
-                production_hours = df_today[df_today['Attribute'] == 'Production Hours']['Value'].sum()
-                arbeitstage = df_today[df_today['Attribute'] == 'Arbeitstage']['Value'].sum()
-
-                if production_hours > 0 and arbeitstage > 0:
-                    utilization_value = (production_hours * 100) / (personal_factor_constant * arbeitstage * 3 * 7.25)
-                    logging.info(f"Utilization calculated for PB1 ({period}): {utilization_value:.2f}%")
-                    return utilization_value
-                else:
-                    logging.warning(f"Invalid values for PB1: Production Hours={production_hours}, Arbeitstage={arbeitstage}")
-                    return np.nan
-
-            # Other PB Types use "MitarbeiterbedarfBrutto" and "Mitarbeiter"
-            else:
-                mitarbeiterbedarf_brutto = df_today[df_today['Attribute'] == 'Mitarbeiterbedarf_Brutto(Plan)']['Value'].sum()
-                mitarbeiter = df_today[df_today['Attribute'] == 'Mitarbeiter(IST)']['Value'].sum()
-
-                if mitarbeiter <= 0:
-                    logging.warning(f"No Mitarbeiter data for PB{pb_type}, skipping calculation.")
-                    return np.nan
-
-                utilization_value = (mitarbeiterbedarf_brutto / mitarbeiter) * 100
-                logging.info(f"Utilization calculated for PB{pb_type} ({period}): {utilization_value:.2f}%")
-                return utilization_value
-
-        utilization_table = df[['Period', 'PB Type']].drop_duplicates()
+        # Select today's rows and clean up column types
+        df_today = df.loc[rows_of_day(dates, today), ['PB Type', 'Period', 'Attribute', 'Value']].copy()
+        for col in ['Attribute', 'PB Type', 'Period']:
+            df_today[col] = df_today[col].astype(str).str.strip()
+
+        if df_today.empty:
+            logging.warning(f"No data found for today ({today}). No utilization calculated.")
+            return pd.DataFrame()
+
+        # One column per attribute, keeping the last value of each PB Type/Period/Attribute
+        df_today = df_today.drop_duplicates(subset=['PB Type', 'Period', 'Attribute'], keep='last')
+        pairs = df_today[['PB Type', 'Period']].drop_duplicates()
+        pivot = (
+            df_today[df_today['Attribute'].isin(UTILIZATION_ATTRIBUTES)]
+            .pivot(index=['PB Type', 'Period'], columns='Attribute', values='Value')
+            .reindex(index=pd.MultiIndex.from_frame(pairs), columns=UTILIZATION_ATTRIBUTES)
+            .fillna(0)
+        )
+
+        # PB1 uses "Production Hours" and "Arbeitstage"
+        production_hours = pivot['Production Hours']
+        arbeitstage = pivot['Arbeitstage']
+        pb1_valid = (production_hours > 0) & (arbeitstage > 0)
+        pb1_value = ((production_hours * 100) / (personal_factor_constant * arbeitstage * 3 * 7.25)).where(pb1_valid)
+
+        # Other PB Types use "MitarbeiterbedarfBrutto" and "Mitarbeiter"
+        mitarbeiter = pivot['Mitarbeiter(IST)']
+        other_valid = mitarbeiter > 0
+        other_value = ((pivot['Mitarbeiterbedarf_Brutto(Plan)'] / mitarbeiter.where(other_valid)) * 100).where(other_valid)
+
+        is_pb1 = pivot.index.get_level_values('PB Type') == 'PB1'
+        utilization = pd.Series(np.where(is_pb1, pb1_value, other_value), index=pivot.index)
+
+        utilization_table = pairs[['Period', 'PB Type']].reset_index(drop=True)
         utilization_table['Attribute'] = 'Utilization'
-        utilization_table['Value'] = utilization_table.apply(calculate_row, axis=1)
+        utilization_table['Value'] = utilization.to_numpy()
         utilization_table['Date'] = pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0))
 
+        skipped = int(utilization_table['Value'].isna().sum())
+        logging.info(f"Utilization calculated for {len(utilization_table) - skipped} of {len(utilization_table)} "
+                     f"PB Type/Period pairs (PB1: {int(is_pb1.sum())}); {skipped} skipped due to invalid "
+                     f"Production Hours/Arbeitstage or missing Mitarbeiter data.")
+
         return utilization_table.dropna(subset=['Value'])
 
     except Exception as e:
@@ -82,54 +84,65 @@ def calculate_utilization(df, personal_factor_df):
         return pd.DataFrame()
 
 
-def process_utilization(file_path, personal_factor_df, output_dir):
-    try:
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+def add_utilization(master_df, personal_factor_df, label="master file"):
+    """
+    Replace today's Utilization rows of a master DataFrame with fresh calculations.
+    Returns the DataFrame unchanged if no utilization could be calculated.
+    """
+    df = master_df.copy()
 
-        logging.info(f"Processing file: {file_path}")
-        df = pd.read_excel(file_path, sheet_name='Sheet1')
+    # Ensure 'Value' column is numeric
+    df['Value'] = pd.to_numeric(df['Value'], errors='coerce').fillna(0)
 
-        # Ensure 'Value' column is numeric
-        df['Value'] = pd.to_numeric(df['Value'], errors='coerce').fillna(0)
+    # Ensure 'Date' column is in datetime format
+    df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
 
-        # Ensure 'Date' column is in datetime format
-        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+    # Check for invalid dates and drop rows with NaT
+    if df['Date'].isna().sum() > 0:
+        logging.warning(f"Invalid or missing dates detected in {label}. Dropping these rows.")
+        df = df.dropna(subset=['Date'])
 
-        # Check for invalid dates and drop rows with NaT
-        if df['Date'].isna().sum() > 0:
-            logging.warning(f"Invalid or missing dates detected in {file_path}. Dropping these rows.")
-            df = df.dropna(subset=['Date'])
+    today = datetime.now().date()
 
-        today = datetime.now().date()
+    # Remove existing utilization entries for today's date
+    df = df[~((df['Attribute'] == 'Utilization') & rows_of_day(df['Date'], today))]
 
-        # Remove existing utilization entries for today's date
-        df = df[~((df['Attribute'] == 'Utilization') & (df['Date'].dt.date == today))]
+    # Calculate utilization
+    utilization_table = calculate_utilization(df, personal_factor_df)
 
-        # Calculate utilization
-        utilization_table = calculate_utilization(df, personal_factor_df)
+    if utilization_table.empty:
+        logging.warning(f"No utilization data calculated for {label}")
+        return master_df
 
-        if utilization_table.empty:
-            logging.warning(f"No utilization data calculated for {file_path}")
-            return
+    # ✅ Debugging: Print shapes before appending
+    print(f"📌 Existing Data Before Appending: {df.shape}")
+    print(f"📌 New Utilization Rows to Append: {utilization_table.shape}")
 
-        # ✅ Debugging: Print shapes before appending
-        print(f"📌 Existing Data Before Appending: {df.shape}")
-        print(f"📌 New Utilization Rows to Append: {utilization_table.shape}")
+    # ✅ Append the calculated utilization rows to the existing DataFrame
+    df_combined = pd.concat([df, utilization_table], ignore_index=True).drop_duplicates(
+        subset=['Period', 'PB Type', 'Attribute', 'Date'], keep='last'
+    )
+
+    print(f"📌 Final Data After Appending: {df_combined.shape}")
+    return df_combined
 
-        # ✅ Append the calculated utilization rows to the existing DataFrame
-        df_combined = pd.concat([df, utilization_table], ignore_index=True).drop_duplicates(
-            subset=['Period', 'PB Type', 'Attribute', 'Date'], keep='last'
-        )
 
-        print(f"📌 Final Data After Appending: {df_combined.shape}")
+def process_utilization(file_path, personal_factor_df, output_dir):
+    try:
+        if not master_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        logging.info(f"Processing file: {file_path}")
+        output_path = os.path.join(output_dir, os.path.basename(file_path))
+        df = load_day(file_path, output_path, datetime.now().date())
+        df_combined = add_utilization(df, personal_factor_df, label=file_path)
+        if df_combined is df:
+            return
 
         # Save updated data
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, os.path.basename(file_path))
 
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df_combined.to_excel(writer, sheet_name='Sheet1', index=False, header=True)
+        save_day(df_combined, file_path, output_path, datetime.now().date())
 
         logging.info(f"✔ Utilization calculation completed and saved to: {output_path}")
 
@@ -3,6 +3,7 @@ import pandas as pd
 import os
 import logging
 import yaml
+from data_processing.master_store import upsert_rows
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -40,25 +41,10 @@ def save_data_with_append(new_monthly, new_weekly, output_dir):
     def _safe_save(new_data, path):
         if not new_data.empty:
             try:
-                # Read existing file if available
-                if os.path.exists(path):
-                    existing = pd.read_excel(path)
-                    logging.info(f"📌 Existing records in {path}: {len(existing)}")
-                else:
-                    existing = pd.DataFrame()
-                    logging.info(f"📌 No existing file found. Creating {path}.")
-                
-                # Append new data, remove duplicates
-                combined = pd.concat([existing, new_data], ignore_index=True)
-                combined = combined.drop_duplicates(
-                    subset=['PB Type', 'Period', 'Attribute', 'Date'], 
-                    keep='last'
-                )
-
-                logging.info(f"📌 After appending: {len(combined)} total rows in {path}")
-
-                # Save updated data
-                combined.to_excel(path, index=False, engine='openpyxl')
+                # Rows with the same (PB Type, Period, Attribute, Date) replace the stored ones.
+                # Only the partitions of the new rows' days can hold duplicates,
+                # because 'Date' is part of the duplicate key.
+                upsert_rows(new_data, path, ['PB Type', 'Period', 'Attribute', 'Date'])
                 logging.info(f"✔ Successfully saved {path}")
 
             except Exception as e:
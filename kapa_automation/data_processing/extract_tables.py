@@ -3,6 +3,11 @@ import pandas as pd
 import yaml
 import os
 import logging
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from openpyxl.utils import column_index_from_string
+from pandas.io.parsers import TextParser
+from data_processing.input_cache import cached_parse, configure_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,12 +27,111 @@ with open(config_path, "r", encoding="utf-8") as config_file:
 # Access nested keys under 'data_extraction'
 input_file_path = config['data_extraction']['input_file_path']
 sheet_name = config['data_extraction']['sheet_name']
+configure_cache(config)
+
+# Bump whenever TABLE_LAYOUT or the parsing below changes, so cached tables are re-extracted
+EXTRACTION_VERSION = 1
+
+# Layout of the tables in the "Data basis" sheet.
+# start_row: 0-based sheet row where the table starts (the old `skiprows`)
+# rows:      number of data rows (the old `nrows`)
+# columns:   Excel column range (the old `usecols`)
+# header_row: None if the first row of the table holds the column names,
+#             otherwise the 0-based sheet row the column names are taken from
+TABLE_LAYOUT = {
+    'SMT_OEE':                        {'start_row': 13, 'rows': 2, 'columns': 'T',     'header_row': None},
+    'SMT_OEE_Total_Monthly':          {'start_row': 8,  'rows': 1, 'columns': 'A:N',   'header_row': 2},
+    'SMT_OEE_Total_Weekly':           {'start_row': 8,  'rows': 1, 'columns': 'A:N',   'header_row': 10},
+    'Personal_Factor':                {'start_row': 2,  'rows': 5, 'columns': 'P:R',   'header_row': None},
+    'Urlaubsquoten(Plan)_Weekly':     {'start_row': 10, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Urlaubsquoten(Plan)_Monthly':    {'start_row': 16, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Krankheitsquoten(Plan)_Monthly': {'start_row': 22, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Mitarbeiter(IST)_Monthly':       {'start_row': 28, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Mitarbeiter(IST)_Weekly':        {'start_row': 85, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Gleitzeit(Plan)_Monthly':        {'start_row': 34, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Verteilzeit(Plan)_Monthly':      {'start_row': 40, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Kurzarbeitstage(Plan)_Monthly':  {'start_row': 53, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Kurzarbeitstage(Plan)_Weekly':   {'start_row': 46, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Working_or_not_Monthly':         {'start_row': 59, 'rows': 6, 'columns': 'A,H:S', 'header_row': None},
+    'Working_or_not_Weekly':          {'start_row': 59, 'rows': 6, 'columns': 'A:G',   'header_row': None},
+    'Arbeitstage_Monthly':            {'start_row': 73, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Arbeitstage_Weekly':             {'start_row': 79, 'rows': 5, 'columns': 'A:N',   'header_row': None},
+    'Krankheitsquoten(Plan)_Weekly':  {'start_row': 23, 'rows': 4, 'columns': 'A:N',   'header_row': 10},
+    'Gleitzeit(Plan)_Weekly':         {'start_row': 35, 'rows': 4, 'columns': 'A:N',   'header_row': 10},
+    'Verteilzeit(Plan)_Weekly':       {'start_row': 41, 'rows': 4, 'columns': 'A:N',   'header_row': 10},
+}
+
+
+def _convert_cell(cell):
+    """Convert an openpyxl cell the same way pandas.read_excel does."""
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def load_sheet_grid(input_file_path, sheet_name):
+    """Parse the sheet once into a list of rows (read-only, cached values)."""
+    workbook = load_workbook(input_file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        return [[_convert_cell(cell) for cell in row] for row in workbook[sheet_name].iter_rows()]
+    finally:
+        workbook.close()
+
+
+def parse_column_range(columns):
+    """Turn an Excel column range such as 'A,H:S' into 0-based column positions."""
+    positions = []
+    for part in columns.split(','):
+        first, _, last = part.strip().partition(':')
+        start = column_index_from_string(first) - 1
+        end = column_index_from_string(last or first) - 1
+        positions.extend(range(start, end + 1))
+    return positions
+
+
+def slice_grid(grid, start_row, rows, columns, header=0):
+    """
+    Cut a table out of the in-memory sheet grid.
+    Produces the same DataFrame as pd.read_excel(skiprows=start_row, nrows=rows, usecols=columns, header=header).
+    """
+    positions = parse_column_range(columns)
+    row_count = rows + (1 if header == 0 else 0)
+    sheet_rows = grid[start_row:start_row + row_count]
+    # Like pandas, drop trailing rows that are completely empty in the sheet
+    while sheet_rows and all(value == "" for value in sheet_rows[-1]):
+        sheet_rows = sheet_rows[:-1]
+    block = [[row[pos] if pos < len(row) else "" for pos in positions] for row in sheet_rows]
+    try:
+        return TextParser(block, header=header, skip_blank_lines=False).read(nrows=rows)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+def extract_table(grid, name):
+    """Extract a single named table from the sheet grid using TABLE_LAYOUT."""
+    layout = TABLE_LAYOUT[name]
+    if layout['header_row'] is None:
+        return slice_grid(grid, layout['start_row'], layout['rows'], layout['columns'], header=0)
+    header = slice_grid(grid, layout['header_row'], 1, layout['columns'], header=None)
+    data = slice_grid(grid, layout['start_row'], layout['rows'], layout['columns'], header=None)
+    data.columns = header.iloc[0]
+    return data
+
+
+def _extract_all_tables(input_file_path, sheet_name):
+    """Parse the sheet once, then cut every table out of the in-memory grid."""
+    grid = load_sheet_grid(input_file_path, sheet_name)
+    data_frames = {}
+    for name in TABLE_LAYOUT:
+        logging.info(f"Extracting {name} table...")
+        data_frames[name] = extract_table(grid, name)
+    return data_frames
 
-def load_and_rename_first_column(input_file_path, usecols, skiprows, nrows, new_name="PB Type"):
-    """Loads an Excel sheet, renames the first column to ensure consistent naming."""
-    df = pd.read_excel(input_file_path, sheet_name=sheet_name, usecols=usecols, skiprows=skiprows, nrows=nrows)
-    df.rename(columns={df.columns[0]: new_name}, inplace=True)
-    return df
 
 def extract_tables():
     """Extract tables from the Excel sheet as per defined rows and columns."""
@@ -40,104 +144,11 @@ def extract_tables():
         logging.error(f"File does not exist at the specified path: {input_file_path}")
         return data_frames
 
-    # Extract tables as defined in the initial code
-    logging.info("Extracting SMT OEE table...")
-    df_smt_oee = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=13, nrows=2, usecols='T', header=0)
-    data_frames['SMT_OEE'] = df_smt_oee
-    print(df_smt_oee)
-
-
-    logging.info("Extracting SMT  Total OEE table...")
-    df_smt_oee_header = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=2, nrows=1, usecols='A:N', header=None)
-    df_smt_oee_data = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=8, nrows=1, usecols='A:N', header=None)
-    df_smt_oee_data.columns = df_smt_oee_header.iloc[0]
-    data_frames['SMT_OEE_Total_Monthly'] = df_smt_oee_data
-
-    logging.info("Extracting SMT  Total OEE table...")
-    df_smt_oee_header = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=10, nrows=1, usecols='A:N', header=None)
-    df_smt_oee_data = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=8, nrows=1, usecols='A:N', header=None)
-    df_smt_oee_data.columns = df_smt_oee_header.iloc[0]
-    data_frames['SMT_OEE_Total_Weekly'] = df_smt_oee_data
-
-    logging.info("Extracting Personal Factor table...")
-    df_personal_factor = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=2, nrows=5, usecols='P:R', header=0)
-    data_frames['Personal_Factor'] = df_personal_factor
-    print(df_personal_factor)
-
-    logging.info("Extracting Urlaubsquoten (Plan) Weekly table...")
-    df_urlaubsquoten_weekly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=10, nrows=5, usecols='A:N', header=0)
-    data_frames['Urlaubsquoten(Plan)_Weekly'] = df_urlaubsquoten_weekly
-
-    logging.info("Extracting Urlaubsquoten (Plan) Monthly table...")
-    df_urlaubsquoten_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=16, nrows=5, usecols='A:N', header=0)
-    data_frames['Urlaubsquoten(Plan)_Monthly'] = df_urlaubsquoten_monthly
-
-    logging.info("Extracting Krankheitsquoten (Plan) Monthly table...")
-    df_krankheitsquoten_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=22, nrows=5, usecols='A:N', header=0)
-    data_frames['Krankheitsquoten(Plan)_Monthly'] = df_krankheitsquoten_monthly
-
-    logging.info("Extracting Mitarbeiter IST (brutto) Monthly table...")
-    df_mitarbeiter_ist_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=28, nrows=5, usecols='A:N', header=0)
-    data_frames['Mitarbeiter(IST)_Monthly'] = df_mitarbeiter_ist_monthly
-
-    logging.info("Extracting Mitarbeiter IST (brutto) Weekly table...")
-    df_mitarbeiter_ist_weekly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=85, nrows=5, usecols='A:N', header=0)
-    data_frames['Mitarbeiter(IST)_Weekly'] = df_mitarbeiter_ist_weekly
-
-
-    logging.info("Extracting Gleitzeit (Plan) Monthly table...")
-    df_gleitzeit_plan_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=34, nrows=5, usecols='A:N', header=0)
-    data_frames['Gleitzeit(Plan)_Monthly'] = df_gleitzeit_plan_monthly
-
-    logging.info("Extracting Verteilzeit (Plan) Monthly table...")
-    df_verteilzeit_plan_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=40, nrows=5, usecols='A:N', header=0)
-    data_frames['Verteilzeit(Plan)_Monthly'] = df_verteilzeit_plan_monthly
-
-    logging.info("Extracting Kurzarbeitstage (Plan) Monthly table...")
-    df_kurzarbeitstage_plan_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=53, nrows=5, usecols='A:N', header=0)
-    data_frames['Kurzarbeitstage(Plan)_Monthly'] = df_kurzarbeitstage_plan_monthly
-
-
-    logging.info("Extracting Kurzarbeitstage (Plan) Weekly  table...")
-    df_kurzarbeitstage_plan_weekly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=46, nrows=5, usecols='A:N', header=0)
-    data_frames['Kurzarbeitstage(Plan)_Weekly'] = df_kurzarbeitstage_plan_weekly
-
-
-    logging.info("Extracting Working or not Monthly table...")
-    df_working_or_not_monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=59, nrows=6, usecols='A,H:S', header=0)
-    data_frames['Working_or_not_Monthly'] = df_working_or_not_monthly
-
-    logging.info("Extracting Working or not Weekly table...")
-    df_working_or_not_weekly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=59, nrows=6, usecols='A:G', header=0)
-    data_frames['Working_or_not_Weekly'] = df_working_or_not_weekly
-
-    logging.info("Extracting Kurzarbeitsplanung Monthly table...")
-    df_Kurzarbeitsplanung_Monthly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=73, nrows=5, usecols='A:N', header=0)
-    data_frames['Arbeitstage_Monthly'] = df_Kurzarbeitsplanung_Monthly
-
-    logging.info("Extracting Kurzarbeitsplanung Weekly table...")
-    df_kurzarbeitsplanung_weekly = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=79, nrows=5, usecols='A:N', header=0)
-    data_frames['Arbeitstage_Weekly'] = df_kurzarbeitsplanung_weekly
-
-    logging.info("Extracting Krankheitsquoten (Plan) Weekly table...")
-    df_krankheitsquoten_weekly_header = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=10, nrows=1, usecols='A:N', header=None)
-    df_krankheitsquoten_weekly_data = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=23, nrows=4, usecols='A:N', header=None)
-    df_krankheitsquoten_weekly_data.columns = df_krankheitsquoten_weekly_header.iloc[0]
-    data_frames['Krankheitsquoten(Plan)_Weekly'] = df_krankheitsquoten_weekly_data
-
-
-    
-    logging.info("Extracting Gleitzeit (Plan) Weekly table...")
-    df_gleitzeit_plan_weekly_header = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=10, nrows=1, usecols='A:N', header=None)
-    df_gleitzeit_plan_weekly_data = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=35, nrows=4, usecols='A:N', header=None)
-    df_gleitzeit_plan_weekly_data.columns = df_gleitzeit_plan_weekly_header.iloc[0]
-    data_frames['Gleitzeit(Plan)_Weekly'] = df_gleitzeit_plan_weekly_data
-
-    logging.info("Extracting Verteilzeit (Plan) Weekly table...")
-    df_verteilzeit_plan_weekly_header = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=10, nrows=1, usecols='A:N', header=None)
-    df_verteilzeit_plan_weekly_data = pd.read_excel(input_file_path, sheet_name=sheet_name, skiprows=41, nrows=4, usecols='A:N', header=None)
-    df_verteilzeit_plan_weekly_data.columns = df_verteilzeit_plan_weekly_header.iloc[0]
-    data_frames['Verteilzeit(Plan)_Weekly'] = df_verteilzeit_plan_weekly_data
+    # Served from the input cache if this workbook content was extracted before
+    data_frames = cached_parse(
+        input_file_path, f"extract_tables.{sheet_name}", EXTRACTION_VERSION,
+        lambda: _extract_all_tables(input_file_path, sheet_name)
+    )
 
     logging.info("Extraction complete. Data stored in dictionary for further processing.")
     return data_frames
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+import os
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Cache of parsed input files, keyed by content hash + parser name + parser version.
+# The index remembers size/mtime per path so unchanged files are not even re-hashed.
+# Entries are pickled because the extracted tables use dates as column labels,
+# which Feather/Arrow cannot store.
+CACHE_SETTINGS = {
+    "enabled": True,
+    "directory": os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")), ".input_cache"),
+}
+CACHE_STATS = {"hits": 0, "misses": 0, "errors": 0}
+INDEX_FILE = "index.json"
+
+
+def configure_cache(config):
+    """Apply the 'cache' section of the YAML config (enabled, directory)."""
+    settings = (config or {}).get("cache", {})
+    CACHE_SETTINGS["enabled"] = settings.get("enabled", CACHE_SETTINGS["enabled"])
+    CACHE_SETTINGS["directory"] = settings.get("directory", CACHE_SETTINGS["directory"])
+
+
+def _load_index():
+    index_path = os.path.join(CACHE_SETTINGS["directory"], INDEX_FILE)
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    index_path = os.path.join(CACHE_SETTINGS["directory"], INDEX_FILE)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(tmp_path, index_path)
+
+
+def file_digest(file_path):
+    """Return the SHA-256 of a file. The hash is reused while size and mtime are unchanged."""
+    stat = os.stat(file_path)
+    index = _load_index()
+    key = os.path.abspath(file_path)
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(block)
+    digest = sha256.hexdigest()
+
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    _save_index(index)
+    return digest
+
+
+def cached_parse(file_path, parser_name, parser_version, parse_func):
+    """
+    Return parse_func() for file_path, served from the cache if the file content was parsed before.
+    Bump parser_version whenever the parser output changes, so old entries are ignored.
+    """
+    if not CACHE_SETTINGS["enabled"] or not os.path.exists(file_path):
+        return parse_func()
+
+    try:
+        os.makedirs(CACHE_SETTINGS["directory"], exist_ok=True)
+        digest = file_digest(file_path)
+        cache_path = os.path.join(CACHE_SETTINGS["directory"], f"{digest}-{parser_name}-v{parser_version}.pkl")
+        if os.path.exists(cache_path):
+            result = pd.read_pickle(cache_path)
+            CACHE_STATS["hits"] += 1
+            logging.info(f"Cache hit for {file_path} ({parser_name})")
+            return result
+    except Exception as e:
+        CACHE_STATS["errors"] += 1
+        logging.warning(f"Input cache unavailable for {file_path}: {e}")
+        return parse_func()
+
+    CACHE_STATS["misses"] += 1
+    result = parse_func()
+    try:
+        tmp_path = cache_path + ".tmp"
+        pd.to_pickle(result, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        CACHE_STATS["errors"] += 1
+        logging.warning(f"Could not cache parsed data of {file_path}: {e}")
+    return result
+
+
+def log_cache_summary():
+    """Log the cache statistics of this run and reset the counters."""
+    total = CACHE_STATS["hits"] + CACHE_STATS["misses"]
+    logging.info(
+        f"Input cache: {CACHE_STATS['hits']} hits, {CACHE_STATS['misses']} misses, "
+        f"{CACHE_STATS['errors']} errors ({total} cached reads) in {CACHE_SETTINGS['directory']}"
+    )
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
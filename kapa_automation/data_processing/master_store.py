@@ -0,0 +1,571 @@
+import glob
+import logging
+import numbers
+import os
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from data_processing import sqlite_store
+from data_processing.calendar_dimension import period_labels
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Every master file gets a sibling directory holding one sub-folder per day
+# (e.g. master_file_monthly_store/Date=2025-03-04/part-103000-000001.parquet).
+# A run only writes or replaces the partition of its own day, so the cost of
+# a save does not grow with the history kept in the master.
+STORE_SUFFIX = "_store"
+PARTITION_PREFIX = "Date="
+UNKNOWN_PARTITION = "unknown"
+
+# Month periods arrive as '03.2025' (Berechnungsbasis) and as 3.2025 or '3.2025'
+# (production hours). Rows are stored and read with one canonical label ('3.2025'),
+# so the KPI steps group and join the periods of both sources.
+PERIOD_COLUMN = 'Period'
+
+# Object columns of numbers (e.g. a 'Value' column built from int and float cells) are
+# written as numeric columns. Columns mixing numbers and text are split into a text and a
+# numeric '<col>__numbers' column and named in the part file, so reading merges them back.
+MIXED_COLUMNS_ATTR = "mixed_columns"
+NUMBERS_SUFFIX = "__numbers"
+NUMERIC_INFERRED_TYPES = ("integer", "floating", "mixed-integer-float", "decimal")
+
+# Every partition keeps the hashes of its composite keys (PB Type, Period, Attribute, Date)
+# in a small index file. An upsert whose keys are all new only appends a part file
+# and extends the index; the partition is only read and rewritten on a key collision.
+# The index records the part files, pandas version and KEY_INDEX_VERSION it was built
+# from and is rebuilt from the key columns whenever they no longer match.
+KEY_INDEX_FILE = "_key_index.npz"
+# Bump whenever the hashed key values change (e.g. their normalization), so old indexes are rebuilt
+KEY_INDEX_VERSION = 3
+# Missing timestamp in the hashed keys (the int64 value of NaT)
+NAT_KEY = np.iinfo('int64').min
+
+# Backend of the master stores: "parquet" (partition folders) or "sqlite" (one indexed
+# database per master, see sqlite_store). Set from the 'storage' section of the config.
+STORAGE_SETTINGS = {"backend": "parquet"}
+BACKENDS = ("parquet", "sqlite")
+
+
+def configure_storage(config):
+    """Apply the 'storage' section of the YAML config (backend)."""
+    backend = (config or {}).get("storage", {}).get("backend", STORAGE_SETTINGS["backend"])
+    if backend not in BACKENDS:
+        logging.warning(f"Unknown storage backend '{backend}', falling back to 'parquet'.")
+        backend = "parquet"
+    STORAGE_SETTINGS["backend"] = backend
+
+
+def _use_sqlite():
+    return STORAGE_SETTINGS["backend"] == "sqlite"
+
+
+def get_store_path(master_file_path):
+    """Return the partitioned store directory that belongs to a master file."""
+    root, _ = os.path.splitext(master_file_path)
+    return root + STORE_SUFFIX
+
+
+def partition_key(date_value):
+    """Return the partition folder name for a single 'Date' value."""
+    timestamp = pd.to_datetime(date_value, errors='coerce')
+    if pd.isna(timestamp):
+        return PARTITION_PREFIX + UNKNOWN_PARTITION
+    return PARTITION_PREFIX + timestamp.strftime('%Y-%m-%d')
+
+
+def master_exists(master_file_path):
+    """Return True if the master has a store or a legacy .xlsx file."""
+    if _use_sqlite() and sqlite_store.db_exists(master_file_path):
+        return True
+    return os.path.isdir(get_store_path(master_file_path)) or os.path.exists(master_file_path)
+
+
+def list_partitions(master_file_path):
+    """List the partition folders of a store, oldest first."""
+    if _use_sqlite():
+        _seed_sqlite(master_file_path)
+        return sqlite_store.list_days(master_file_path)
+    return _list_partition_dirs(master_file_path)
+
+
+def _list_partition_dirs(master_file_path):
+    store_path = get_store_path(master_file_path)
+    if not os.path.isdir(store_path):
+        return []
+    return sorted(name for name in os.listdir(store_path) if name.startswith(PARTITION_PREFIX))
+
+
+def _make_arrow_safe(df):
+    """
+    Prepare a DataFrame for pyarrow. Object columns holding only numbers become numeric;
+    columns mixing numbers and text keep the text and move the numbers to a '<col>__numbers'
+    column. The mixed columns are listed in df.attrs, which pandas stores in the part file,
+    so _read_part can merge them back.
+    """
+    df = df.copy()
+    mixed_columns = []
+    for col in df.columns:
+        if df[col].dtype == object:
+            inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+            if inferred in NUMERIC_INFERRED_TYPES:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            elif inferred.startswith('mixed'):
+                is_number = df[col].map(_is_number)
+                text = df[col].where(~is_number)
+                df[f"{col}{NUMBERS_SUFFIX}"] = pd.to_numeric(df[col].where(is_number), errors='coerce')
+                df[col] = text.where(text.isna(), text.astype(str))
+                mixed_columns.append(str(col))
+    df.columns = [str(col) for col in df.columns]
+    df.attrs = {MIXED_COLUMNS_ATTR: mixed_columns} if mixed_columns else {}
+    return df
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _read_part(part_path, columns=None):
+    """Read one part file and restore the numbers of its mixed columns."""
+    if columns is not None:
+        stored = pq.read_schema(part_path).names
+        columns = list(columns) + [f"{col}{NUMBERS_SUFFIX}" for col in columns if f"{col}{NUMBERS_SUFFIX}" in stored]
+    df = pd.read_parquet(part_path, columns=columns, engine='pyarrow')
+    for col in df.attrs.pop(MIXED_COLUMNS_ATTR, []):
+        numbers_col = f"{col}{NUMBERS_SUFFIX}"
+        if numbers_col in df.columns:
+            if col in df.columns:
+                df[col] = df[col].astype(object).where(df[numbers_col].isna(), df[numbers_col])
+            df = df.drop(columns=numbers_col)
+    return df
+
+
+def _canonical_periods(df):
+    """Return the DataFrame with canonical month labels in 'Period' (see calendar_dimension.period_label)."""
+    if PERIOD_COLUMN not in df.columns or df.empty:
+        return df
+    return df.assign(**{PERIOD_COLUMN: period_labels(df[PERIOD_COLUMN])})
+
+
+def partition_keys(df, date_column='Date'):
+    """Return the partition folder name of every row."""
+    if date_column in df.columns:
+        return pd.to_datetime(df[date_column], errors='coerce').map(partition_key)
+    return pd.Series(PARTITION_PREFIX + UNKNOWN_PARTITION, index=df.index)
+
+
+def _write_part(data, partition_dir):
+    """Write a DataFrame (or a prepared pyarrow Table) as one part file into a partition folder and return its path."""
+    os.makedirs(partition_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%H%M%S%f')
+    part_path = os.path.join(partition_dir, f"part-{stamp}-{os.getpid()}.parquet")
+    tmp_path = part_path + ".tmp"
+    if isinstance(data, pa.Table):
+        pq.write_table(data, tmp_path)
+    else:
+        _make_arrow_safe(data).to_parquet(tmp_path, index=False, engine='pyarrow')
+    os.replace(tmp_path, part_path)
+    return part_path
+
+
+def _type_kind(arrow_type):
+    """Group Arrow types that convert into each other without changing values; None for all-null columns."""
+    if pa.types.is_null(arrow_type):
+        return None
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "number"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "string"
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return "datetime"
+    return str(arrow_type)
+
+
+def _conform_to_partition(df, partition_dir):
+    """
+    Convert new rows to a table with the column types of a partition's stored parts, so a
+    partition never holds a column as numbers in one part and as text in another. Returns
+    None if the columns differ or a column does not convert without loss.
+    """
+    parts = _part_names(partition_dir)
+    table = pa.Table.from_pandas(_make_arrow_safe(df), preserve_index=False)
+    if not parts:
+        return table
+    schema = pq.read_schema(os.path.join(partition_dir, parts[0]))
+    if sorted(table.schema.names) != sorted(schema.names):
+        return None
+    for field in schema:
+        if _type_kind(table.schema.field(field.name).type) not in (None, _type_kind(field.type)):
+            return None
+    try:
+        # The new rows keep their own pandas metadata (e.g. their mixed columns)
+        return table.select(schema.names).cast(schema.with_metadata(table.schema.metadata))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def _read_partition_dir(partition_dir):
+    frames = [_read_part(path) for path in sorted(glob.glob(os.path.join(partition_dir, "*.parquet")))]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _seed_from_excel(master_file_path, date_column='Date'):
+    """
+    Copy an existing master workbook into the store once, so no history is lost
+    when switching from the .xlsx master to the partitioned store.
+    """
+    store_path = get_store_path(master_file_path)
+    if os.path.isdir(store_path) or not os.path.exists(master_file_path):
+        return
+    legacy_df = _canonical_periods(pd.read_excel(master_file_path, engine='openpyxl'))
+    logging.info(f"📌 Migrating {len(legacy_df)} rows from {master_file_path} into {store_path}")
+    os.makedirs(store_path, exist_ok=True)
+    for key, part in legacy_df.groupby(partition_keys(legacy_df, date_column), sort=True):
+        _write_part(part, os.path.join(store_path, key))
+
+
+def _seed_sqlite(master_file_path):
+    """
+    Copy an existing store (or legacy workbook) into the SQLite database once,
+    so no history is lost when switching the backend.
+    """
+    if sqlite_store.db_exists(master_file_path):
+        return
+    legacy_df = _read_parquet_master(master_file_path)
+    if legacy_df.empty:
+        return
+    logging.info(f"📌 Migrating {len(legacy_df)} rows of {master_file_path} into {sqlite_store.get_db_path(master_file_path)}")
+    sqlite_store.append_rows(legacy_df, master_file_path)
+
+
+def read_master(master_file_path):
+    """Read the full history of a master file, falling back to the legacy .xlsx master."""
+    if _use_sqlite() and sqlite_store.db_exists(master_file_path):
+        return _canonical_periods(sqlite_store.read_rows(master_file_path))
+    return _canonical_periods(_read_parquet_master(master_file_path))
+
+
+def _read_parquet_master(master_file_path):
+    store_path = get_store_path(master_file_path)
+    if not os.path.isdir(store_path):
+        if os.path.exists(master_file_path):
+            return pd.read_excel(master_file_path, engine='openpyxl')
+        return pd.DataFrame()
+
+    frames = [_read_partition_dir(os.path.join(store_path, partition))
+              for partition in _list_partition_dirs(master_file_path)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_partition(master_file_path, partition):
+    """Read the rows of a single partition (e.g. 'Date=2025-03-04')."""
+    if _use_sqlite():
+        _seed_sqlite(master_file_path)
+        return _canonical_periods(sqlite_store.read_day(master_file_path, partition))
+    _seed_from_excel(master_file_path)
+    return _canonical_periods(_read_partition_dir(os.path.join(get_store_path(master_file_path), partition)))
+
+
+def read_day(master_file_path, day, filters=None):
+    """
+    Read the rows of one day, optionally narrowed to column values,
+    e.g. filters={'PB Type': 'PB1', 'Attribute': 'Production Hours'}.
+    With the SQLite backend this is a single indexed query.
+    """
+    if _use_sqlite():
+        _seed_sqlite(master_file_path)
+        return _canonical_periods(sqlite_store.read_day(master_file_path, day, filters))
+    df = read_partition(master_file_path, partition_key(day))
+    for col, value in (filters or {}).items():
+        if df.empty:
+            break
+        df = df[df[col] == value]
+    return df.reset_index(drop=True)
+
+
+def append_partition(df, master_file_path, date_column='Date'):
+    """Append rows to the store. Only new part files are written."""
+    if df is None or df.empty:
+        logging.info(f"📌 No rows to append to {master_file_path}.")
+        return 0
+    df = _canonical_periods(df)
+    if _use_sqlite():
+        _seed_sqlite(master_file_path)
+        sqlite_store.append_rows(df, master_file_path)
+        logging.info(f"✔ Appended {len(df)} rows to {sqlite_store.get_db_path(master_file_path)}")
+        return len(df)
+    _seed_from_excel(master_file_path, date_column=date_column)
+    store_path = get_store_path(master_file_path)
+    for key, part in df.groupby(partition_keys(df, date_column), sort=True):
+        _write_part(part, os.path.join(store_path, key))
+    logging.info(f"✔ Appended {len(df)} rows to {store_path}")
+    return len(df)
+
+
+def replace_partition(df, master_file_path, partition):
+    """
+    Replace a whole partition with the given rows.
+    The new part file is written before the old ones are removed.
+    """
+    df = _canonical_periods(df)
+    if _use_sqlite():
+        _seed_sqlite(master_file_path)
+        sqlite_store.replace_day(df, master_file_path, partition)
+        logging.info(f"✔ Replaced {partition} of {sqlite_store.get_db_path(master_file_path)} with {len(df)} rows")
+        return
+    _seed_from_excel(master_file_path)
+    partition_dir = os.path.join(get_store_path(master_file_path), partition)
+    old_parts = glob.glob(os.path.join(partition_dir, "*.parquet"))
+    if not df.empty:
+        _write_part(df, partition_dir)
+    for path in old_parts:
+        os.remove(path)
+    if df.empty and os.path.isdir(partition_dir) and not os.listdir(partition_dir):
+        os.rmdir(partition_dir)
+    logging.info(f"✔ Replaced {partition} of {master_file_path} with {len(df)} rows")
+
+
+def _key_parts(values):
+    """
+    Split a key column into numbers (float64), timestamps (int64 ns) and other values (text),
+    so values drop_duplicates treats as equal hash equally and others do not: 5 and 5.0
+    match, '10.2025' and 10.2025 do not.
+    """
+    size = len(values)
+    numbers = np.full(size, np.nan)
+    timestamps = np.full(size, NAT_KEY, dtype='int64')
+    texts = np.full(size, None, dtype=object)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        # Independent of the stored resolution (ns/us)
+        timestamps = values.astype('datetime64[ns]').to_numpy().view('int64')
+    elif pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        numbers = values.astype('float64').to_numpy()
+    elif pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        texts = values.astype(object).where(values.notna(), None).to_numpy()
+    else:
+        objects = values.astype(object)
+        is_number = objects.map(lambda value: isinstance(value, (int, float, np.number))).to_numpy()
+        is_timestamp = objects.map(lambda value: isinstance(value, (datetime, np.datetime64))).to_numpy()
+        numbers[is_number] = objects[is_number].astype('float64').to_numpy()
+        if is_timestamp.any():
+            stamps = pd.to_datetime(objects[is_timestamp]).astype('datetime64[ns]')
+            timestamps[is_timestamp] = stamps.to_numpy().view('int64')
+        other = ~is_number & ~is_timestamp & objects.notna().to_numpy()
+        texts[other] = objects[other].map(str).to_numpy()
+    return numbers, timestamps, texts
+
+
+def key_hashes(df, key_columns):
+    """Return one 64-bit hash per row of the composite key; equal keys always get equal hashes."""
+    keys = {}
+    for col in key_columns:
+        keys[f"{col}/number"], keys[f"{col}/timestamp"], keys[f"{col}/text"] = _key_parts(df[col])
+    return pd.util.hash_pandas_object(pd.DataFrame(keys, index=df.index), index=False).to_numpy()
+
+
+def _part_names(partition_dir):
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(partition_dir, "*.parquet")))
+
+
+def _key_index_version():
+    return f"{KEY_INDEX_VERSION}/{pd.__version__}"
+
+
+def _save_key_index(partition_dir, key_columns, hashes, unique):
+    """Store the key hashes of a partition together with the part files they describe."""
+    path = os.path.join(partition_dir, KEY_INDEX_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file:
+        np.savez(file, hashes=hashes, unique=np.array(unique), parts=np.array(_part_names(partition_dir)),
+                 columns=np.array(key_columns), version=np.array(_key_index_version()))
+    os.replace(tmp_path, path)
+
+
+def load_key_index(master_file_path, partition, key_columns):
+    """
+    Return (hashes, unique) for the stored keys of a partition, where unique tells whether
+    the stored keys are free of duplicates. Rebuilds the index from the key columns if it is
+    missing or outdated; returns None if the partition cannot be indexed.
+    """
+    partition_dir = os.path.join(get_store_path(master_file_path), partition)
+    parts = _part_names(partition_dir)
+    path = os.path.join(partition_dir, KEY_INDEX_FILE)
+    if os.path.exists(path):
+        try:
+            with np.load(path) as index:
+                if (index["parts"].tolist() == parts and index["columns"].tolist() == list(key_columns)
+                        and str(index["version"]) == _key_index_version()):
+                    return index["hashes"], bool(index["unique"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    try:
+        frames = [_read_part(os.path.join(partition_dir, part), columns=list(key_columns)) for part in parts]
+    except Exception as e:
+        logging.warning(f"⚠ Cannot index keys of {partition} in {master_file_path}: {e}")
+        return None
+    if frames:
+        stored = _canonical_periods(pd.concat(frames, ignore_index=True))
+    else:
+        stored = pd.DataFrame(columns=list(key_columns))
+    hashes = key_hashes(stored, key_columns)
+    unique = len(np.unique(hashes)) == len(hashes)
+    if parts:
+        _save_key_index(partition_dir, key_columns, hashes, unique)
+    return hashes, unique
+
+
+def upsert_rows(df, master_file_path, key_columns):
+    """
+    Add rows to a master, replacing stored rows with the same key (the new row wins).
+    Only the partitions of the new rows' days are touched, so 'Date' must be part of the key.
+    New rows are checked against the key index of their partition: if no key is stored yet,
+    they are appended without reading the partition.
+    """
+    df = _canonical_periods(df)
+    if _use_sqlite():
+        _seed_sqlite(master_file_path)
+        return sqlite_store.upsert_rows(df, master_file_path, key_columns)
+
+    _seed_from_excel(master_file_path)
+    for partition, new_part in df.groupby(partition_keys(df), sort=True):
+        new_part = new_part.drop_duplicates(subset=key_columns, keep='last')
+        new_hashes = key_hashes(new_part, key_columns)
+        index = load_key_index(master_file_path, partition, key_columns)
+        if index is not None and index[1] and not np.isin(new_hashes, index[0]).any():
+            partition_dir = os.path.join(get_store_path(master_file_path), partition)
+            table = _conform_to_partition(new_part, partition_dir)
+            if table is not None:
+                _write_part(table, partition_dir)
+                _save_key_index(partition_dir, key_columns, np.concatenate([index[0], new_hashes]), True)
+                logging.info(f"📌 {len(new_part)} new keys appended to {master_file_path} [{partition}] "
+                             f"({len(index[0])} stored keys)")
+                continue
+
+        existing = read_partition(master_file_path, partition)
+        logging.info(f"📌 Existing records in {master_file_path} [{partition}]: {len(existing)}")
+
+        # Append new data, remove duplicates
+        combined = pd.concat([existing, new_part], ignore_index=True)
+        combined = combined.drop_duplicates(subset=key_columns, keep='last')
+
+        logging.info(f"📌 After appending: {len(combined)} rows in {master_file_path} [{partition}]")
+
+        # Save updated partition
+        replace_partition(combined, master_file_path, partition)
+        if not combined.empty:
+            partition_dir = os.path.join(get_store_path(master_file_path), partition)
+            _save_key_index(partition_dir, key_columns, key_hashes(combined, key_columns), True)
+    return len(df)
+
+
+def write_master(df, master_file_path, date_column='Date'):
+    """Write a complete DataFrame as a fresh store, replacing any existing one."""
+    df = _canonical_periods(df)
+    if _use_sqlite():
+        sqlite_store.write_rows(df, master_file_path)
+        logging.info(f"✔ Wrote {len(df)} rows to {sqlite_store.get_db_path(master_file_path)}")
+        return
+    store_path = get_store_path(master_file_path)
+    if os.path.isdir(store_path):
+        shutil.rmtree(store_path)
+    os.makedirs(store_path, exist_ok=True)
+    for key, part in df.groupby(partition_keys(df, date_column), sort=True):
+        _write_part(part, os.path.join(store_path, key))
+    logging.info(f"✔ Wrote {len(df)} rows to {store_path}")
+
+
+def rows_of_day(dates, day):
+    """
+    Return a boolean mask of the timestamps that fall on `day`.
+    Compares against the bounds of the day instead of formatting every timestamp.
+    """
+    start = pd.Timestamp(day).normalize()
+    dates = pd.to_datetime(dates, errors='coerce')
+    return (dates >= start) & (dates < start + pd.Timedelta(days=1))
+
+
+def load_day(source_path, output_path, day):
+    """
+    Load the rows a calculation step needs to update the rows of `day` (the counterpart of save_day).
+
+    If the step writes back to its own master, only the partition of `day` is
+    read, because save_day only replaces that partition. Writing to a different
+    location needs the complete history.
+    """
+    if os.path.abspath(source_path) != os.path.abspath(output_path):
+        return read_master(source_path)
+    df = read_partition(source_path, partition_key(day))
+    if df.empty:
+        # No rows for the day: the steps have nothing to do, but still need the columns of the master
+        return empty_master(source_path)
+    return df
+
+
+def empty_master(master_file_path):
+    """Return an empty DataFrame with the stored columns of a master, without reading any rows."""
+    if _use_sqlite():
+        return pd.DataFrame(columns=sqlite_store.list_columns(master_file_path))
+    part_paths = sorted(glob.glob(os.path.join(get_store_path(master_file_path), PARTITION_PREFIX + "*", "*.parquet")))
+    if not part_paths:
+        return pd.DataFrame()
+    # The columns come from the footer of one part file
+    columns = [name for name in pq.read_schema(part_paths[-1]).names if not name.endswith(NUMBERS_SUFFIX)]
+    return pd.DataFrame(columns=columns)
+
+
+def save_day(df, source_path, output_path, day, date_column='Date'):
+    """
+    Persist the result of a calculation step that only changes rows of one day.
+
+    If the step writes back to its own master, only the partition of `day` is
+    replaced. Writing to a different location stores the complete frame.
+    """
+    if os.path.abspath(source_path) != os.path.abspath(output_path):
+        write_master(df, output_path, date_column=date_column)
+        return
+    replace_partition(df[rows_of_day(df[date_column], day)], output_path, partition_key(day))
+
+
+def drop_partition(master_file_path, partition):
+    """Remove a whole partition folder from the store."""
+    if _use_sqlite():
+        sqlite_store.delete_day(master_file_path, partition)
+        return
+    partition_dir = os.path.join(get_store_path(master_file_path), partition)
+    if os.path.isdir(partition_dir):
+        shutil.rmtree(partition_dir)
+
+
+def export_to_excel(master_file_path):
+    """Write the full store back to the .xlsx master so Power BI can keep reading it."""
+    if _use_sqlite():
+        if not sqlite_store.db_exists(master_file_path):
+            return
+    elif not os.path.isdir(get_store_path(master_file_path)):
+        return
+    try:
+        df = read_master(master_file_path)
+        with pd.ExcelWriter(master_file_path, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='Sheet1', index=False)
+        logging.info(f"✔ Exported {len(df)} rows to {master_file_path}")
+    except Exception as e:
+        logging.error(f"⚠ Export failed for {master_file_path}: {str(e)}")
+
+
+if __name__ == "__main__":
+    # Export masters on demand, e.g.: python -m data_processing.master_store sqlite /main/master_files/master_file_monthly.xlsx
+    import sys
+
+    configure_storage({"storage": {"backend": sys.argv[1]}})
+    for path in sys.argv[2:]:
+        export_to_excel(path)
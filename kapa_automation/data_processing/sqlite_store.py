@@ -0,0 +1,229 @@
+import logging
+import os
+import sqlite3
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Optional SQLite backend of the master stores (storage: backend: "sqlite").
+# Every master gets one database next to its .xlsx (e.g. master_file_monthly.sqlite)
+# with a single table. A composite index on (PB Type, Period, Attribute, Date) serves
+# the upserts and the lookups of the calculation steps, an index on 'Date' serves
+# day slices; each save is one executemany() in one transaction.
+DB_SUFFIX = ".sqlite"
+TABLE = "master"
+DATE_COLUMN = 'Date'
+KEY_COLUMNS = ['PB Type', 'Period', 'Attribute', 'Date']
+# Timestamps are stored as sortable text, so a day is a range query on the index
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+TIMESTAMP_PATTERN = r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
+
+sqlite3.register_adapter(pd.Timestamp, lambda value: value.strftime(TIMESTAMP_FORMAT))
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.float64, float)
+sqlite3.register_adapter(np.bool_, bool)
+
+
+def get_db_path(master_file_path):
+    """Return the SQLite database that belongs to a master file."""
+    root, _ = os.path.splitext(master_file_path)
+    return root + DB_SUFFIX
+
+
+def db_exists(master_file_path):
+    """Return True if the master has a SQLite database."""
+    return os.path.exists(get_db_path(master_file_path))
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _connect(master_file_path):
+    conn = sqlite3.connect(get_db_path(master_file_path))
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def _table_columns(conn):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE})")]
+
+
+def _prepare_table(conn, columns):
+    """
+    Create the table and its indexes on first use and add columns that appear in later runs.
+    Columns are declared without a type, so every value keeps the type it was written with.
+    """
+    existing = _table_columns(conn)
+    if not existing:
+        conn.execute(f"CREATE TABLE {TABLE} ({', '.join(_quote(col) for col in columns)})")
+    else:
+        for col in columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_quote(col)}")
+    columns = _table_columns(conn)
+
+    if all(col in columns for col in KEY_COLUMNS):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_key ON {TABLE} ({', '.join(map(_quote, KEY_COLUMNS))})")
+    if DATE_COLUMN in columns:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_day ON {TABLE} ({_quote(DATE_COLUMN)})")
+
+
+def _records(df):
+    """Convert a DataFrame to rows of plain Python values (missing values become NULL)."""
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _insert(conn, df):
+    columns = ", ".join(_quote(col) for col in df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    conn.executemany(f"INSERT INTO {TABLE} ({columns}) VALUES ({placeholders})", _records(df))
+
+
+def _day_clause(day):
+    """Return the WHERE clause and parameters selecting one day (a date or 'Date=YYYY-MM-DD')."""
+    if isinstance(day, str) and day.startswith(DATE_COLUMN + "="):
+        day = day[len(DATE_COLUMN) + 1:]
+    day = pd.to_datetime(day, errors='coerce')
+    if pd.isna(day):
+        return f"{_quote(DATE_COLUMN)} IS NULL", ()
+    day = day.normalize()
+    return (f"{_quote(DATE_COLUMN)} >= ? AND {_quote(DATE_COLUMN)} < ?",
+            (day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')))
+
+
+def _restore_timestamps(df):
+    """Turn the stored timestamp text back into datetime columns."""
+    for col in df.columns:
+        if not (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])):
+            continue
+        values = df[col].dropna()
+        if len(values) and values.map(type).eq(str).all() and values.str.fullmatch(TIMESTAMP_PATTERN).all():
+            df[col] = pd.to_datetime(df[col], format=TIMESTAMP_FORMAT)
+    return df
+
+
+def read_rows(master_file_path, where="", params=()):
+    """Read the rows of a master database matching an SQL condition, in insertion order."""
+    if not db_exists(master_file_path):
+        return pd.DataFrame()
+    conn = _connect(master_file_path)
+    try:
+        if not _table_columns(conn):
+            return pd.DataFrame()
+        query = f"SELECT * FROM {TABLE}" + (f" WHERE {where}" if where else "") + " ORDER BY rowid"
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+    return _restore_timestamps(df)
+
+
+def read_day(master_file_path, day, filters=None):
+    """
+    Read the rows of one day by an indexed query.
+    filters narrows the slice further, e.g. {'PB Type': 'PB1', 'Attribute': 'Production Hours'}.
+    """
+    where, params = _day_clause(day)
+    for col, value in (filters or {}).items():
+        where += f" AND {_quote(col)} = ?"
+        params += (value,)
+    return read_rows(master_file_path, where, params)
+
+
+def list_columns(master_file_path):
+    """Return the column names of a master database (empty if it does not exist)."""
+    if not db_exists(master_file_path):
+        return []
+    conn = _connect(master_file_path)
+    try:
+        return _table_columns(conn)
+    finally:
+        conn.close()
+
+
+def append_rows(df, master_file_path):
+    """Append rows to a master database in one transaction."""
+    conn = _connect(master_file_path)
+    try:
+        with conn:
+            _prepare_table(conn, [str(col) for col in df.columns])
+            _insert(conn, df)
+    finally:
+        conn.close()
+    return len(df)
+
+
+def upsert_rows(df, master_file_path, key_columns=KEY_COLUMNS):
+    """
+    Insert rows in one transaction, replacing stored rows with the same key (the new row wins,
+    as with drop_duplicates(keep='last')). Missing key values match each other, as in pandas.
+    """
+    df = df.drop_duplicates(subset=key_columns, keep='last')
+    conn = _connect(master_file_path)
+    try:
+        with conn:
+            _prepare_table(conn, [str(col) for col in df.columns])
+            where = " AND ".join(f"{_quote(col)} IS ?" for col in key_columns)
+            replaced = conn.total_changes
+            conn.executemany(f"DELETE FROM {TABLE} WHERE {where}", _records(df[key_columns]))
+            replaced = conn.total_changes - replaced
+            _insert(conn, df)
+    finally:
+        conn.close()
+    logging.info(f"✔ Upserted {len(df)} rows into {get_db_path(master_file_path)} ({replaced} replaced)")
+    return len(df)
+
+
+def replace_day(df, master_file_path, day):
+    """Replace the rows of one day with the given rows in one transaction."""
+    conn = _connect(master_file_path)
+    try:
+        with conn:
+            _prepare_table(conn, [str(col) for col in df.columns])
+            where, params = _day_clause(day)
+            conn.execute(f"DELETE FROM {TABLE} WHERE {where}", params)
+            if not df.empty:
+                _insert(conn, df)
+    finally:
+        conn.close()
+
+
+def delete_day(master_file_path, day):
+    """Delete the rows of one day."""
+    if not db_exists(master_file_path):
+        return
+    conn = _connect(master_file_path)
+    try:
+        with conn:
+            where, params = _day_clause(day)
+            conn.execute(f"DELETE FROM {TABLE} WHERE {where}", params)
+    finally:
+        conn.close()
+
+
+def write_rows(df, master_file_path):
+    """Replace the whole content of a master database."""
+    path = get_db_path(master_file_path)
+    if os.path.exists(path):
+        os.remove(path)
+    append_rows(df, master_file_path)
+
+
+def list_days(master_file_path):
+    """List the days held by a master database as partition names ('Date=2025-03-04'), oldest first."""
+    if not db_exists(master_file_path):
+        return []
+    conn = _connect(master_file_path)
+    try:
+        if DATE_COLUMN not in _table_columns(conn):
+            return []
+        rows = conn.execute(f"SELECT DISTINCT substr({_quote(DATE_COLUMN)}, 1, 10) FROM {TABLE}").fetchall()
+    finally:
+        conn.close()
+    days = sorted(f"{DATE_COLUMN}={day}" for (day,) in rows if day is not None)
+    if any(day is None for (day,) in rows):
+        days.append(f"{DATE_COLUMN}=unknown")
+    return days
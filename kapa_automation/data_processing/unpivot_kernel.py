@@ -0,0 +1,85 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Wide-to-long reshape shared by all unpivot steps. It is equivalent to
+# pd.melt(...) followed by constant metadata columns, but builds the long frame
+# in one step: ids are repeated with a single take(), the values are read with
+# one column-major ravel and all columns are handed to the constructor without a copy.
+
+
+def compile_period_matcher(*patterns):
+    r"""
+    Compile the regexes that identify period columns into one matcher.
+
+    :param patterns: Regular expressions, e.g. r'^\d{2}\.\d{4}$', r'^KW\d{2}$'.
+    :return: Compiled regex; use it as the matcher argument of unpivot().
+    """
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def select_value_columns(df, id_vars, matcher=None):
+    """
+    Return the columns to unpivot, in DataFrame order.
+
+    :param matcher: Compiled regex (matched against string column names) or a callable col -> bool.
+                    None selects every column that is not an id column.
+    """
+    if matcher is None:
+        return [col for col in df.columns if col not in id_vars]
+    if callable(matcher) and not hasattr(matcher, "match"):
+        return [col for col in df.columns if col not in id_vars and matcher(col)]
+    return [col for col in df.columns if col not in id_vars and isinstance(col, str) and matcher.match(col)]
+
+
+def unpivot(df, id_vars, var_name, value_name, value_vars=None, matcher=None, constants=None, categorical=False):
+    """
+    Unpivot a wide DataFrame into long format.
+
+    :param df: Wide DataFrame.
+    :param id_vars: Columns kept as identifiers.
+    :param var_name: Name of the column holding the former column names (e.g. 'Period').
+    :param value_name: Name of the column holding the values (e.g. 'Value').
+    :param value_vars: Columns to unpivot. If None, they are selected with matcher.
+    :param matcher: See select_value_columns.
+    :param constants: Dict of metadata columns with one value for all rows (e.g. {'Attribute': 'Production Hours'}).
+    :param categorical: Store text id columns and text constants as categoricals to save memory.
+    :return: Long DataFrame with the columns id_vars, var_name, value_name and the constants, in melt's row order.
+    """
+    id_vars = list(id_vars)
+    if value_vars is None:
+        value_vars = select_value_columns(df, id_vars, matcher)
+    rows, width = len(df), len(value_vars)
+
+    # Every id row once per value column (melt's column-major order)
+    columns = {}
+    for col in id_vars:
+        id_data = df[col]
+        if categorical and (pd.api.types.is_object_dtype(id_data) or pd.api.types.is_string_dtype(id_data)):
+            # Repeat the integer codes only, not the strings
+            codes, categories = pd.factorize(id_data)
+            columns[col] = pd.Categorical.from_codes(np.tile(codes, width), categories=categories)
+        elif isinstance(id_data.dtype, np.dtype):
+            columns[col] = np.tile(id_data.to_numpy(), width)
+        else:
+            columns[col] = id_data.take(np.tile(np.arange(rows), width)).reset_index(drop=True)
+
+    columns[var_name] = df.columns[df.columns.get_indexer(value_vars)].repeat(rows)
+
+    values = df[value_vars]
+    dtypes = set(values.dtypes)
+    if len(dtypes) == 1 and not isinstance(next(iter(dtypes)), np.dtype):
+        # Extension dtypes (e.g. nullable integers) are kept by stacking the columns
+        columns[value_name] = pd.concat([values[col] for col in value_vars], ignore_index=True)
+    else:
+        columns[value_name] = values.to_numpy().ravel(order="F")
+
+    index = pd.RangeIndex(rows * width)
+    for name, value in (constants or {}).items():
+        if categorical and isinstance(value, str):
+            columns[name] = pd.Categorical.from_codes(np.zeros(len(index), dtype=np.int8), categories=[value])
+        else:
+            columns[name] = pd.Series(value, index=index)
+
+    # copy=False keeps the columns as separate blocks instead of consolidating them into one object block
+    return pd.DataFrame(columns, index=index, copy=False)
@@ -1,6 +1,9 @@
 import logging
 import pandas as pd
-from datetime import datetime   
+from datetime import date, datetime
+import numpy as np
+from data_processing.calendar_dimension import month_label, resolve_period
+from data_processing.unpivot_kernel import unpivot
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -22,26 +25,67 @@ def rename_first_column(df, table_name):
             df.rename(columns={df.columns[0]: "PB Type"}, inplace=True)
     return df
 
+# Output format of all date-like periods
+PERIOD_FORMAT = '%m.%Y'
+
+# Converted labels, shared by all tables of a run (the tables mostly use the same months)
+_PERIOD_LABEL_CACHE = {}
+
 # Function to convert date-like periods to mm.yyyy format
 def convert_period_format(period):
     """
     Converts date-like strings into 'mm.yyyy' format.
+    Dates (the usual column labels of the Excel tables) are resolved through the calendar dimension.
     """
     try:
-        if pd.to_datetime(period, errors='coerce', dayfirst=True):
-            return pd.to_datetime(period, errors='coerce', dayfirst=True).strftime('%m.%Y')
+        if isinstance(period, (datetime, date)):
+            return month_label(period)
+        parsed = pd.to_datetime(period, errors='coerce', dayfirst=True)
+        if parsed:
+            return parsed.strftime(PERIOD_FORMAT)
         return period
     except Exception as e:
         logging.warning(f"Unable to convert period '{period}': {e}")
         return period  # Return as is if conversion fails
 
+def convert_period_labels(labels):
+    """
+    Converts a list of distinct (hashable) period labels to 'mm.yyyy' format.
+    - Dates are formatted in one vectorized call with an explicit format.
+    - Labels that already are periods ('KW07', '03.2025') are kept.
+    - Other labels are parsed one by one and cached; unparsable labels are passed through unchanged.
+    """
+    converted = {}
+    date_labels = []
+    for label in labels:
+        if isinstance(label, (datetime, date)) and not pd.isna(label):
+            date_labels.append(label)
+        elif isinstance(label, str) and resolve_period(label) is not None:
+            converted[label] = label
+        else:
+            if label not in _PERIOD_LABEL_CACHE:
+                _PERIOD_LABEL_CACHE[label] = convert_period_format(label)
+            converted[label] = _PERIOD_LABEL_CACHE[label]
+
+    if date_labels:
+        formatted = pd.to_datetime(pd.Series(date_labels, dtype=object)).dt.strftime(PERIOD_FORMAT)
+        converted.update(zip(date_labels, formatted))
+    return [converted[label] for label in labels]
+
 # Function to preprocess periods
 def preprocess_periods(df):
     """
     Preprocesses the 'Period' column to standardize date formats to 'mm.yyyy'.
+    Each distinct label is converted once and mapped back to the rows by its code.
     """
-    if 'Period' in df.columns:
-        df['Period'] = df['Period'].apply(convert_period_format)
+    if 'Period' in df.columns and not df.empty:
+        periods = df['Period'].to_numpy(dtype=object)
+        codes, labels = pd.factorize(periods)
+        converted = np.empty(len(labels), dtype=object)
+        converted[:] = convert_period_labels(list(labels))
+        # Missing periods (code -1) are kept as they are
+        values = np.where(codes >= 0, converted[codes], periods)
+        df['Period'] = pd.Series(list(values), index=df.index)
     return df
 
 # Function to unpivot (melt) the DataFrame
@@ -54,21 +98,21 @@ def unpivot_table(df, id_var, var_name, value_name, attribute_name):
         if id_var not in df.columns:
             raise KeyError(f"The id_var '{id_var}' does not exist in the DataFrame columns: {df.columns}")
         
-        # Perform unpivoting
-        df_unpivoted = pd.melt(
+        # Perform unpivoting and add the 'Attribute' and 'Date' columns
+        df_unpivoted = unpivot(
             df,
             id_vars=[id_var],
             var_name=var_name,
-            value_name=value_name
+            value_name=value_name,
+            constants={
+                'Attribute': attribute_name,
+                'Date': pd.to_datetime(datetime.now().replace(minute=0, second=0, microsecond=0)),  # Add current date
+            }
         )
         
         # Log unpivoted DataFrame shape
         logging.info(f"Unpivoted DataFrame shape: {df_unpivoted.shape}")
         
-        # Add 'Attribute' and 'Date' columns
-        df_unpivoted['Attribute'] = attribute_name
-        df_unpivoted['Date'] = pd.to_datetime(datetime.now().replace(minute=0, second=0, microsecond=0)) # Add current date
-        
         # Log added columns
         logging.info(f"Columns after adding 'Attribute' and 'Date': {df_unpivoted.columns.tolist()}")
 
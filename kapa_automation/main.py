@@ -6,10 +6,10 @@ from data_processing.extract_tables import extract_tables
 from data_processing.unpivoted_tables import unpivot_all_tables
 from data_processing.append_to_master import append_data_to_combined
 from data_processing.Combined import process_production_data, save_data_with_append
-from calculations.wartung import process_wartung
-from calculations.Mitarbeiterbedarf_Brutto import process_file  # Assuming this function is in `calculations/mitarbeiterbedarf.py`
-from calculations.abweichung import calculate_and_append_abweichung
-from calculations.utilization import process_utilization  # Assuming the utilization function is defined here
+from data_processing.master_store import configure_storage, export_to_excel
+from data_processing.input_cache import log_cache_summary
+from data_processing.calendar_dimension import configure_calendar
+from calculations.kpi_pipeline import run_kpi_pipeline
 
 # 1️⃣ Get the base directory where the script is located
 base_dir = os.path.abspath(os.path.dirname(__file__))
@@ -58,6 +58,8 @@ def main():
         with open(config_path, "r", encoding="utf-8") as config_file:
             config = yaml.safe_load(config_file)
         logging.info("Configuration loaded successfully.")
+        configure_calendar(config)
+        configure_storage(config)
     except Exception as e:
         logging.error(f"Error loading configuration: {e}")
         return
@@ -75,6 +77,7 @@ def main():
     try:
         logging.info("Extracting tables...")
         data_frames = extract_tables()
+        log_cache_summary()
         logging.info("Table extraction complete.")
     except Exception as e:
         logging.error(f"Error during table extraction: {e}")
@@ -144,61 +147,27 @@ def main():
         personal_factor_avg = None  # Handle error case
 
 
-    # Step 7: Wartung Processing
+    # Steps 7-10: Wartung, Mitarbeiterbedarf, Abweichung and Utilization
+    # Each master is loaded once, passed through all four stages in memory and written once.
+    input_files = {
+        "monthly": os.path.join(output_dir, "master_file_monthly.xlsx"),
+        "weekly": os.path.join(output_dir, "master_file_weekly.xlsx")
+    }
     try:
-        logging.info("Processing wartung for master files...")
-        process_wartung("master_file_monthly.xlsx", personal_factor_avg, output_dir)
-        process_wartung("master_file_weekly.xlsx", personal_factor_avg, output_dir)
-        logging.info("Wartung calculation and update completed.")
-    except Exception as e:
-        logging.error(f"Error processing wartung: {e}")
-        return
-
-    # Step 8: Mitarbeiterbedarf Processing
-    try:
-        input_files = {
-            "monthly": os.path.join(output_dir, "master_file_monthly.xlsx"),
-            "weekly": os.path.join(output_dir, "master_file_weekly.xlsx")
-        }
-
-        for file_type, file_path in input_files.items():
-            if os.path.exists(file_path):
-                process_file(file_path, output_dir)
-            else:
-                logging.warning(f"File not found: {file_path}. Skipping processing for {file_type}.")
-        
-        logging.info("Mitarbeiterbedarf processing completed successfully.")
-    except Exception as e:
-        logging.error(f"Error during mitarbeiterbedarf processing: {e}")
-        return
-
-    # Step 9: Abweichung Processing
-    try:
-        logging.info("Processing Abweichung for master files...")
+        logging.info("Processing KPI calculations for master files...")
         for file_type, file_name in input_files.items():
-            if os.path.exists(file_name):
-                calculate_and_append_abweichung(file_name, output_dir)
-                logging.info(f"Abweichung calculation and appending completed for {file_type} file.")
-            else:
-                logging.warning(f"File not found: {file_name}. Skipping Abweichung processing for {file_type}.")
-        logging.info("Abweichung processing completed successfully.")
+            run_kpi_pipeline(file_name, personal_factor_avg, data_frames.get("Personal_Factor"), output_dir)
+            logging.info(f"KPI calculations completed for {file_type} file.")
+        logging.info("KPI processing completed successfully.")
     except Exception as e:
-        logging.error(f"Error during Abweichung processing: {e}")
+        logging.error(f"Error during KPI processing: {e}")
         return
 
-    # Step 10: Utilization Processing
-    try:
-        logging.info("Processing Utilization for master files...")
+    # Step 11: Export master files for Power BI
+    if config.get('storage', {}).get('export_excel', True):
         for file_type, file_name in input_files.items():
-            if os.path.exists(file_name):
-                process_utilization(file_name, personal_factor_df, output_dir)
-                logging.info(f"Utilization calculation and appending completed for {file_type} file.")
-            else:
-                logging.warning(f"File not found: {file_name}. Skipping Utilization processing for {file_type}.")
-        logging.info("Utilization processing completed successfully.")
-    except Exception as e:
-        logging.error(f"Error during Utilization processing: {e}")
-        return
+            export_to_excel(file_name)
+        logging.info("Master files exported to Excel.")
 
     logging.info("Data processing workflow completed successfully.")
 
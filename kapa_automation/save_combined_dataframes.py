@@ -2,6 +2,7 @@ import pandas as pd
 import os
 import logging
 from datetime import datetime
+from data_processing.master_store import upsert_rows, export_to_excel
 
 def save_combined_dataframes(monthly, weekly, output_dir):
     # Validate inputs
@@ -22,18 +23,21 @@ def save_combined_dataframes(monthly, weekly, output_dir):
         
         # Add "Date" column if missing
         if "Date" not in new_data.columns:
-            new_data["Date"] = datetime.now().strftime("%d.%m.%Y %H:%M")
+            # A Timestamp, so the store files the rows under today's partition
+            new_data["Date"] = pd.Timestamp(datetime.now().replace(second=0, microsecond=0))
         
         try:
-            # Append to existing data
-            existing = pd.read_excel(path) if os.path.exists(path) else pd.DataFrame()
-            combined = pd.concat([existing, new_data], ignore_index=True)
-            combined = combined.drop_duplicates()  # Remove duplicates
-            combined.to_excel(path, index=False, engine="openpyxl")
+            # Append to existing data; rows identical in every column are stored once.
+            # New rows are checked against the key index of the store, not the whole history.
+            upsert_rows(new_data, path, list(new_data.columns))
             logging.info(f"Saved {len(new_data)} rows to {path}")
         except Exception as e:
             logging.error(f"Failed to save {path}: {str(e)}")
 
     # Save monthly and weekly data
     _safe_save(monthly, monthly_path)
-    _safe_save(weekly, weekly_path)
\ No newline at end of file
+    _safe_save(weekly, weekly_path)
+
+    # Export the .xlsx masters once, after both saves
+    for path in (monthly_path, weekly_path):
+        export_to_excel(path)
@@ -0,0 +1,41 @@
+import builtins
+import io
+import os
+import sys
+from unittest import mock
+
+import pytest
+import yaml
+
+KAPA_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, KAPA_ROOT)
+
+TEST_CONFIG = {
+    "data_extraction": {
+        "input_file_path": os.path.join(KAPA_ROOT, "Berechnungsbasis_Kapa.xlsx"),
+        "sheet_name": "Data basis",
+    },
+    "cache": {"enabled": False},
+}
+
+# extract_tables loads the config from a fixed path when it is imported
+_open = builtins.open
+
+
+def _open_test_config(path, *args, **kwargs):
+    if str(path).endswith("config.yaml"):
+        return io.StringIO(yaml.safe_dump(TEST_CONFIG))
+    return _open(path, *args, **kwargs)
+
+
+with mock.patch("builtins.open", _open_test_config):
+    import data_processing.extract_tables  # noqa: E402,F401
+
+from data_processing import master_store  # noqa: E402
+
+
+@pytest.fixture(params=master_store.BACKENDS)
+def backend(request):
+    master_store.configure_storage({"storage": {"backend": request.param}})
+    yield request.param
+    master_store.configure_storage({"storage": {"backend": "parquet"}})
@@ -0,0 +1,99 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from calculations.kpi_pipeline import run_kpi_pipeline
+from data_processing import master_store
+from data_processing.append_to_master import append_data_to_combined
+from data_processing.Combined import process_production_data, save_data_with_append
+from data_processing.extract_tables import extract_tables
+from data_processing.unpivoted_tables import unpivot_all_tables
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+PERSONAL_FACTOR = pd.DataFrame({'Personal\nFactor': [1.0, 0.8], 'Result': [2, 2]})
+KPI_ATTRIBUTES = ['Wartung', 'Mitarbeiterbedarf_Brutto(Plan)', 'Abweichung', 'Utilization']
+
+
+def stamped(rows):
+    df = pd.DataFrame(rows, columns=['PB Type', 'Period', 'Attribute', 'Value'])
+    df['Date'] = pd.Timestamp(datetime.now().replace(minute=0, second=0, microsecond=0))
+    return df
+
+
+def test_kpis_of_a_partition_built_from_two_upserts(tmp_path):
+    output_dir = str(tmp_path)
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    # Production hours read from Excel (2.2025, float values) ...
+    production = stamped([('PB2', 2.2025, 'Production Hours', 130.5), ('PB2', 3.2025, 'Production Hours', 261.0),
+                          ('PB3', 2.2025, 'Production Hours', 65.25), ('PB3', 3.2025, 'Production Hours', 87.0)])
+    # ... and Berechnungsbasis rows ('02.2025', int values), upserted into the same partition
+    extracted = stamped([(pb, period, attribute, value)
+                         for pb in ('PB2', 'PB3')
+                         for period in ('02.2025', '03.2025')
+                         for attribute, value in (('Arbeitstage', 20), ('Urlaubsquoten(Plan)', 10),
+                                                  ('Mitarbeiter(IST)', 5))])
+    save_data_with_append(production, pd.DataFrame(), output_dir)
+    save_data_with_append(extracted, pd.DataFrame(), output_dir)
+
+    run_kpi_pipeline(master_path, 0.9, PERSONAL_FACTOR, output_dir)
+
+    df = master_store.read_day(master_path, datetime.now().date())
+    kpis = df.pivot_table(index=['PB Type', 'Period'], columns='Attribute', values='Value', dropna=False)
+    assert kpis.index.tolist() == [('PB2', '2.2025'), ('PB2', '3.2025'), ('PB3', '2.2025'), ('PB3', '3.2025')]
+
+    hours_per_employee = 20 * 7.25 * 0.9
+    bedarf = kpis['Mitarbeiterbedarf_Brutto(Plan)']
+    assert bedarf.tolist() == pytest.approx([hours / hours_per_employee for hours in (130.5, 261.0, 65.25, 87.0)])
+    assert kpis['Abweichung'].tolist() == pytest.approx((5 - bedarf).tolist())
+    assert kpis['Utilization'].tolist() == pytest.approx((bedarf / 5 * 100).tolist())
+
+
+def test_a_day_without_rows_does_not_read_the_history(tmp_path, backend, monkeypatch):
+    output_dir = str(tmp_path)
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    yesterday = stamped([('PB2', '02.2025', 'Arbeitstage', 20), ('PB2', 2.2025, 'Production Hours', 130.5)])
+    yesterday['Date'] -= pd.Timedelta(days=1)
+    save_data_with_append(yesterday, pd.DataFrame(), output_dir)
+
+    def read_master(master_file_path):
+        raise AssertionError("the full history was read")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(master_store, "read_master", read_master)
+        run_kpi_pipeline(master_path, 0.9, PERSONAL_FACTOR, output_dir)
+
+    assert len(master_store.read_master(master_path)) == 2
+    assert master_store.read_day(master_path, datetime.now().date()).empty
+
+
+def run_pipeline(output_dir):
+    """Run the steps of main.main() on Berechnungsbasis_Kapa.xlsx and the production hours in tests/data."""
+    data_frames = extract_tables()
+    monthly, weekly = append_data_to_combined(unpivot_all_tables(data_frames), pd.DataFrame(), pd.DataFrame())
+    save_data_with_append(monthly[monthly['PB Type'] != "SMT Gesamt"], weekly[weekly['PB Type'] != "SMT Gesamt"],
+                          output_dir)
+    assert process_production_data({'combined_total_production_hours': {
+        'monthly': os.path.join(DATA_DIR, "combined_monthly_production_hours.xlsx"),
+        'weekly': os.path.join(DATA_DIR, "combined_weekly_production_hours.xlsx"),
+        'output_dir': output_dir}})
+
+    personal_factor = data_frames['Personal_Factor']
+    personal_factor_avg = ((personal_factor['Personal\nFactor'] * personal_factor['Result']).sum()
+                           / personal_factor['Result'].sum())
+    for name in ("master_file_monthly.xlsx", "master_file_weekly.xlsx"):
+        run_kpi_pipeline(os.path.join(output_dir, name), personal_factor_avg, personal_factor, output_dir)
+
+
+def test_kpis_match_the_baseline(tmp_path, backend):
+    run_pipeline(str(tmp_path))
+
+    # KPI rows of a full run of the pipeline before the store and calculation changes
+    baseline = pd.read_csv(os.path.join(DATA_DIR, "kpi_baseline.csv"), dtype={'Period': str})
+    for master, expected in baseline.groupby('Master'):
+        df = master_store.read_master(str(tmp_path / f"master_file_{master}.xlsx"))
+        actual = df[df['Attribute'].isin(KPI_ATTRIBUTES)].set_index(['PB Type', 'Period', 'Attribute'])['Value']
+        expected = expected.set_index(['PB Type', 'Period', 'Attribute'])['Value']
+        assert actual.sort_index().index.tolist() == expected.sort_index().index.tolist()
+        assert actual.sort_index().astype(float).tolist() == pytest.approx(expected.sort_index().tolist())
@@ -0,0 +1,111 @@
+import glob
+import os
+
+import openpyxl
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data_processing import master_store
+
+KEY_COLUMNS = ['PB Type', 'Period', 'Attribute', 'Date']
+
+
+def rows(periods, attribute, values, date='2025-03-04 10:00'):
+    return pd.DataFrame({
+        'PB Type': 'PB1',
+        'Period': pd.Series(periods, dtype=object),
+        'Value': values,
+        'Attribute': attribute,
+        'Date': pd.Timestamp(date),
+    })
+
+
+def test_periods_are_stored_with_one_label(tmp_path, backend):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    # Berechnungsbasis rows use '01.2025', production hours come as 2.2025 from Excel
+    master_store.upsert_rows(rows(['01.2025', '02.2025', '10.2025'], 'Arbeitstage', [20, 19, 23]),
+                             master_path, KEY_COLUMNS)
+    master_store.upsert_rows(rows([1.2025, 2.2025, 10.2025], 'Production Hours', [445.0, 126.0, 1049.0]),
+                             master_path, KEY_COLUMNS)
+
+    df = master_store.read_day(master_path, '2025-03-04')
+    assert df['Period'].tolist() == ['1.2025', '2.2025', '10.2025'] * 2
+
+
+def test_upsert_replaces_rows_across_period_types(tmp_path, backend):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    master_store.upsert_rows(rows(['02.2025'], 'Production Hours', [100.0]), master_path, KEY_COLUMNS)
+    master_store.upsert_rows(rows([2.2025], 'Production Hours', [126.0]), master_path, KEY_COLUMNS)
+
+    df = master_store.read_master(master_path)
+    assert df[['Period', 'Value']].values.tolist() == [['2.2025', 126.0]]
+
+
+def test_legacy_workbook_periods(tmp_path):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    legacy = pd.concat([rows([1.2025, 12.2025], 'Arbeitstage', [20, 18], date='2025-03-03 10:00'),
+                        rows(['KW07'], 'Arbeitstage', [5], date='2025-03-03 10:00')])
+    legacy.to_excel(master_path, index=False)
+
+    master_store.upsert_rows(rows(['01.2025'], 'Arbeitstage', [21]), master_path, KEY_COLUMNS)
+
+    df = master_store.read_master(master_path)
+    assert df['Period'].tolist() == ['1.2025', '12.2025', 'KW07', '1.2025']
+
+
+def part_files(master_path, day):
+    partition_dir = os.path.join(master_store.get_store_path(master_path), master_store.partition_key(day))
+    return sorted(glob.glob(os.path.join(partition_dir, "*.parquet")))
+
+
+def test_new_keys_are_written_with_the_stored_column_types(tmp_path):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    master_store.upsert_rows(rows(['02.2025'], 'Production Hours', [130.5]), master_path, KEY_COLUMNS)
+    master_store.upsert_rows(rows([3.2025], 'Production Hours', [261]), master_path, KEY_COLUMNS)
+
+    parts = part_files(master_path, '2025-03-04')
+    assert len(parts) == 2
+    assert pq.read_schema(parts[0]).remove_metadata() == pq.read_schema(parts[1]).remove_metadata()
+    df = master_store.read_master(master_path)
+    assert df['Value'].dtype == 'float64'
+    assert df['Period'].tolist() == ['2.2025', '3.2025']
+
+
+def test_new_keys_of_another_type_rewrite_the_partition(tmp_path):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    master_store.upsert_rows(rows(['02.2025'], 'Production Hours', [130.5]), master_path, KEY_COLUMNS)
+    master_store.upsert_rows(rows(['03.2025'], 'Production Hours', ['n/a']), master_path, KEY_COLUMNS)
+
+    assert len(part_files(master_path, '2025-03-04')) == 1
+    assert master_store.read_master(master_path)['Value'].tolist() == [130.5, 'n/a']
+
+
+def test_all_column_keys_match_numbers_by_value(tmp_path):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    df = rows(['02.2025'], 'Production Hours', [5.0]).assign(Label=pd.Series(['10.2025'], dtype=object))
+    master_store.upsert_rows(df, master_path, list(df.columns))
+    # 5 and 5.0 are the same value, the text '10.2025' and the number 10.2025 are not
+    master_store.upsert_rows(df.assign(Value=5), master_path, list(df.columns))
+    master_store.upsert_rows(df.assign(Label=10.2025), master_path, list(df.columns))
+
+    assert master_store.read_master(master_path)['Label'].tolist() == ['10.2025', 10.2025]
+
+
+def test_write_read_export_round_trip(tmp_path, backend):
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    values = pd.Series([445, 4.5, '10.2025', 'n/a', None], dtype=object)
+    master_store.upsert_rows(rows(['01.2025', '02.2025', '03.2025', '04.2025', '05.2025'], 'Production Hours', values),
+                             master_path, KEY_COLUMNS)
+
+    df = master_store.read_master(master_path)
+    assert df['Value'].tolist()[:4] == [445, 4.5, '10.2025', 'n/a']
+    assert pd.isna(df['Value'].iloc[4])
+
+    master_store.export_to_excel(master_path)
+    sheet = openpyxl.load_workbook(master_path)['Sheet1']
+    header = [cell.value for cell in sheet[1]]
+    periods = [row[header.index('Period')].value for row in sheet.iter_rows(min_row=2)]
+    cells = [row[header.index('Value')] for row in sheet.iter_rows(min_row=2)]
+    assert periods == ['1.2025', '2.2025', '3.2025', '4.2025', '5.2025']
+    assert [cell.value for cell in cells] == [445, 4.5, '10.2025', 'n/a', None]
+    assert [cell.data_type for cell in cells[:4]] == ['n', 'n', 's', 's']
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from calculations.Mitarbeiterbedarf_Brutto import (
+    MITARBEITERBEDARF_ATTRIBUTE, add_mitarbeiterbedarf, calculate_mitarbeiterbedarf,
+)
+
+
+def today_rows():
+    now = pd.Timestamp(datetime.now().replace(minute=0, second=0, microsecond=0))
+    return pd.DataFrame([
+        # Berechnungsbasis rows
+        ('PB 2', '02.2025', 'Arbeitstage', 20.0),
+        ('PB 2', '02.2025', 'Urlaubsquoten(Plan)', 10.0),
+        ('PB 2', '01.2025', 'Arbeitstage', 21.0),
+        # Production hours, read from Excel as a number
+        ('PB2', 2.2025, 'Production Hours', 130.5),
+    ], columns=['PB Type', 'Period', 'Attribute', 'Value']).assign(Date=now)
+
+
+def test_periods_of_both_sources_are_matched():
+    result = calculate_mitarbeiterbedarf(today_rows(), oee=0.8)
+
+    # January has no production hours and gets no row
+    assert result[['PB Type', 'Period']].values.tolist() == [['PB2', '2.2025']]
+    assert result['Value'].iloc[0] == pytest.approx(130.5 / (20 * 7.25 * 0.9))
+
+
+def test_only_todays_pb_types_are_filtered():
+    history = pd.DataFrame({'PB Type': ['PB 2'], 'Period': ['2.2025'], 'Attribute': ['Arbeitstage'],
+                            'Value': [19.0], 'Date': [pd.Timestamp('2025-02-01 10:00')]})
+    df = add_mitarbeiterbedarf(pd.concat([history, today_rows()], ignore_index=True))
+
+    assert len(df[df['Date'] < pd.Timestamp('2025-02-02')]) == 1
+    assert len(df[df['Attribute'] == MITARBEITERBEDARF_ATTRIBUTE]) == 1
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pandas as pd
+
+import save_combined_dataframes as module
+from data_processing import master_store
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        # A day <= 12, so day and month cannot be swapped unnoticed
+        return cls(2026, 10, 5, 10, 30)
+
+
+def test_rows_are_stored_under_their_day_and_exported(tmp_path, backend, monkeypatch):
+    monkeypatch.setattr(module, "datetime", FixedDatetime)
+    master_path = str(tmp_path / "master_file_monthly.xlsx")
+    monthly = pd.DataFrame({'PB Type': ['PB1', 'PB2'], 'Period': ['1.2025', '1.2025'],
+                            'Attribute': 'Arbeitstage', 'Value': [20, 20]})
+    module.save_combined_dataframes(monthly, pd.DataFrame(), str(tmp_path))
+    # The same rows (now with their 'Date') again: identical rows are stored once
+    module.save_combined_dataframes(monthly, pd.DataFrame(), str(tmp_path))
+
+    assert master_store.list_partitions(master_path) == ["Date=2026-10-05"]
+    assert len(master_store.read_day(master_path, '2026-10-05')) == 2
+    assert len(pd.read_excel(master_path)) == 2
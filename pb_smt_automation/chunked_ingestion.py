@@ -0,0 +1,146 @@
+import os
+import re
+import pandas as pd
+
+# Chunked ingestion for large wayconnect exports. Instead of parsing a whole CSV,
+# the file is read in bounded chunks with declared dtypes; every chunk is cleaned,
+# unpivoted and appended to its master store right away, so peak memory depends on
+# the chunk size and not on the planning horizon of the export.
+INGESTION_SETTINGS = {
+    "mode": "full",
+    "engine": "c",
+    "chunk_rows": 50000,
+    "block_size_mb": 16,
+}
+ENGINES = ("c", "pyarrow")
+# The pyarrow reader needs the two header lines inside its first block
+MIN_BLOCK_SIZE = 64 * 1024
+
+# Numeric columns per export layout; every other column is read as text
+VALUE_COLUMNS = {
+    "pb": re.compile(r'^Ecktermin '),
+    "smt": re.compile(r'^Ecktermin '),
+    "smt_load": re.compile(r'^Durchschnitt$|^(?:\w{3}|Q\d) \d{4},\.\.\.$'),
+}
+
+# Column holding the run timestamp; it is taken from the first chunk, so a file
+# streamed across an hour boundary still ends up in a single run
+RUN_STAMP_COLUMNS = {
+    "pb": "Date",
+    "smt": "Date",
+    "smt_load": "Todays Date",
+}
+
+
+def get_ingestion_settings(config):
+    """
+    Read the 'ingestion' section of the YAML config (mode, engine, chunk_rows, block_size_mb).
+
+    :param config: Loaded configuration dictionary.
+    :return: Settings dict; mode is "full" or "chunked".
+    """
+    settings = dict(INGESTION_SETTINGS, **(config or {}).get("ingestion", {}))
+    if settings["mode"] not in ("full", "chunked"):
+        print(f"Unknown ingestion mode '{settings['mode']}', falling back to 'full'.")
+        settings["mode"] = "full"
+    if settings["engine"] not in ENGINES:
+        print(f"Unknown CSV engine '{settings['engine']}', falling back to 'c'.")
+        settings["engine"] = "c"
+    settings["chunk_rows"] = int(settings["chunk_rows"])
+    return settings
+
+
+def read_header(file_path):
+    """
+    Read the column names of a wayconnect export (header in the second line).
+    Names are deduplicated the same way as in a full pd.read_csv ('Art', 'Art.1', 'Unnamed: 5').
+    """
+    return list(pd.read_csv(file_path, delimiter=';', header=1, nrows=0).columns)
+
+
+def declare_dtypes(columns, layout):
+    """
+    Return the declared dtypes of a header: float64 for the value columns of the layout, text otherwise.
+    Declaring them keeps the dtypes identical in every chunk instead of inferring them per chunk.
+    """
+    value_columns = VALUE_COLUMNS[layout]
+    return {col: "float64" if value_columns.search(col) else "str" for col in columns}
+
+
+def _iter_pandas_chunks(file_path, columns, dtypes, settings):
+    reader = pd.read_csv(file_path, delimiter=';', skiprows=2, header=None, names=columns,
+                         dtype=dtypes, chunksize=settings["chunk_rows"])
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _iter_pyarrow_chunks(file_path, columns, dtypes, settings):
+    import pyarrow as pa
+    from pyarrow import csv
+
+    column_types = {col: pa.float64() if dtype == "float64" else pa.string() for col, dtype in dtypes.items()}
+    block_size = max(int(settings["block_size_mb"] * 1024 * 1024), MIN_BLOCK_SIZE)
+    reader = csv.open_csv(
+        file_path,
+        read_options=csv.ReadOptions(skip_rows=2, column_names=columns, block_size=block_size),
+        parse_options=csv.ParseOptions(delimiter=';'),
+        # Empty fields are missing values, as with pd.read_csv
+        convert_options=csv.ConvertOptions(column_types=column_types, strings_can_be_null=True,
+                                           quoted_strings_can_be_null=True),
+    )
+    for batch in reader:
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def iter_csv_chunks(file_path, layout, settings=None):
+    """
+    Read a wayconnect export in chunks with declared dtypes.
+
+    :param file_path: Path to the CSV file.
+    :param layout: Export layout ('pb', 'smt' or 'smt_load'), selects the numeric columns.
+    :param settings: Settings from get_ingestion_settings (defaults if None).
+    :return: Generator of DataFrames with the same columns as a full read.
+    """
+    settings = settings or INGESTION_SETTINGS
+    columns = read_header(file_path)
+    dtypes = declare_dtypes(columns, layout)
+    if settings["engine"] == "pyarrow":
+        return _iter_pyarrow_chunks(file_path, columns, dtypes, settings)
+    return _iter_pandas_chunks(file_path, columns, dtypes, settings)
+
+
+def stream_file(label, file_path, layout, prepare_chunk, master_file_path, append_func, settings=None):
+    """
+    Stream one export into its master: read a chunk, prepare it, append it, read the next one.
+
+    :param label: Name of the input used in messages (e.g. 'PB1 - weekly').
+    :param file_path: Path to the CSV file.
+    :param layout: Export layout ('pb', 'smt' or 'smt_load').
+    :param prepare_chunk: Function (raw chunk) -> long-format DataFrame or None (no rows to append).
+    :param master_file_path: Path to the master Excel file.
+    :param append_func: Function (df, master_file_path) that writes the rows, e.g. append_to_master_file.
+    :return: Number of rows appended.
+    """
+    if not os.path.exists(file_path):
+        print(f"File not found: {file_path}")
+        return 0
+
+    stamp_column = RUN_STAMP_COLUMNS.get(layout)
+    stamp = None
+    chunks = rows = 0
+    for chunk in iter_csv_chunks(file_path, layout, settings):
+        chunks += 1
+        df = prepare_chunk(chunk)
+        if df is None or df.empty:
+            continue
+        if stamp_column in df.columns:
+            if stamp is None:
+                stamp = df[stamp_column].iloc[0]
+            df[stamp_column] = stamp
+        append_func(df, master_file_path)
+        rows += len(df)
+
+    print(f"Streamed {label}: {chunks} chunk(s), {rows} rows appended to {os.path.basename(master_file_path)}")
+    return rows
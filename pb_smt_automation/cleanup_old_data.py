@@ -1,78 +1,287 @@
 import os
+import json
+import time
 import pandas as pd
 from datetime import datetime, timedelta
+from master_store import STORE_SUFFIX, get_store_path, list_partitions, drop_partitions_before
+from sqlite_store import DB_SUFFIX, get_db_path, delete_days_before
+from parallel import run_tasks
+
+# Plain workbooks get a small sidecar with the date range of their rows, e.g.
+# combined_weekly_production_hours.xlsx -> combined_weekly_production_hours.xlsx.dates.json.
+# While size and mtime of the workbook match the sidecar, a file whose oldest row
+# is inside the retention window is skipped without being opened.
+DATE_RANGE_SUFFIX = ".dates.json"
+
+# Retention sweep defaults; the 'retention' section of the YAML config overrides them.
+# Rewriting a workbook is a CPU-bound openpyxl load/save, so files are swept in a process pool.
+RETENTION_SETTINGS = {
+    "months_to_keep": 8,
+    "date_column": "Date",
+    "date_format": "%Y-%m-%d",
+    "workers": 1,
+    "executor": "process",
+}
+
+
+def get_retention_settings(config):
+    """
+    Read the 'retention' section of the YAML config.
+
+    :param config: Loaded configuration dictionary.
+    :return: Settings dict with the keyword arguments of delete_old_data_from_output_files.
+    """
+    settings = dict(RETENTION_SETTINGS, **(config or {}).get("retention", {}))
+    settings["months_to_keep"] = int(settings["months_to_keep"])
+    settings["workers"] = int(settings["workers"] or 1)
+    if settings["executor"] not in ("thread", "process"):
+        print(f"Unknown executor '{settings['executor']}', falling back to 'process'.")
+        settings["executor"] = "process"
+    return settings
+
+
+def get_cutoff_day(months_to_keep=8):
+    """
+    Return the first day to keep. Retention works on whole days, matching the day partitions of the stores.
+    """
+    return pd.Timestamp(datetime.now() - timedelta(days=months_to_keep * 30)).normalize()
+
+
+def parse_dates(values, date_format='%Y-%m-%d'):
+    """
+    Convert a date column to datetime. Values that do not match date_format (e.g. timestamps)
+    are parsed flexibly; values that are no date at all become NaT.
+    """
+    try:
+        return pd.to_datetime(values, format=date_format)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, errors='coerce')
+
+
+def _sidecar_path(file_path):
+    return file_path + DATE_RANGE_SUFFIX
+
+
+def read_date_range(file_path, date_column='Date'):
+    """
+    Return the (min, max) dates stored in the sidecar of a workbook, or None if the sidecar
+    is missing or outdated (the workbook was written since).
+    """
+    sidecar_path = _sidecar_path(file_path)
+    if not os.path.exists(sidecar_path):
+        return None
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    stat = os.stat(file_path)
+    if meta.get("size") != stat.st_size or meta.get("mtime_ns") != stat.st_mtime_ns or meta.get("date_column") != date_column:
+        return None
+    return pd.to_datetime(meta["min"]), pd.to_datetime(meta["max"])
+
+
+def write_date_range(file_path, dates, date_column='Date'):
+    """
+    Store the date range of a workbook's rows next to it (see read_date_range).
+    """
+    stat = os.stat(file_path)
+    meta = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "date_column": date_column,
+        "min": None if dates.isna().all() else dates.min().isoformat(),
+        "max": None if dates.isna().all() else dates.max().isoformat(),
+    }
+    with open(_sidecar_path(file_path), "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+
+
+def delete_old_partitions(master_file_path, months_to_keep=8):
+    """
+    Drop the expired day partitions of a master store. Live partitions are neither read nor rewritten.
+
+    :param master_file_path: Path to the master Excel file the store belongs to.
+    :param months_to_keep: Number of months to retain data (default is 8).
+    :return: Number of rows dropped.
+    """
+    dropped = drop_partitions_before(master_file_path, get_cutoff_day(months_to_keep))
+    rows = sum(dropped.values())
+    print(f"Dropped {len(dropped)} expired partition(s) with {rows} rows from {get_store_path(master_file_path)}")
+    return rows
+
+
+def delete_old_rows_from_db(master_file_path, months_to_keep=8):
+    """
+    Delete the expired rows of a SQLite master with one indexed DELETE.
+
+    :param master_file_path: Path to the master Excel file the database belongs to.
+    :param months_to_keep: Number of months to retain data (default is 8).
+    :return: Number of rows dropped.
+    """
+    rows = delete_days_before(master_file_path, get_cutoff_day(months_to_keep))
+    print(f"Deleted {rows} expired rows from {get_db_path(master_file_path)}")
+    return rows
+
 
 def delete_old_data(file_path, date_column='Date', months_to_keep=8, date_format='%Y-%m-%d'):
     """
     Delete data older than a specified number of months from an Excel file.
+    The file is skipped without being opened if its sidecar shows no expired rows.
 
     :param file_path: Path to the Excel file.
     :param date_column: Column containing the date information (default is 'Date').
     :param months_to_keep: Number of months to retain data (default is 8).
-    :param date_format: Date format in the date column (default is '%Y-%m-%d').
+    :param date_format: Preferred date format of the date column (default is '%Y-%m-%d');
+                        other date and timestamp formats are parsed as well.
+    :return: Number of rows dropped, or None if the file was skipped or could not be processed.
     """
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
-        return
+        return None
+
+    # Calculate the cutoff date
+    cutoff_day = get_cutoff_day(months_to_keep)
+
+    date_range = read_date_range(file_path, date_column)
+    if date_range is not None and (pd.isna(date_range[0]) or date_range[0] >= cutoff_day):
+        print(f"No expired rows in {file_path}, skipped.")
+        return None
 
     try:
         # Load the data from the Excel file
         df = pd.read_excel(file_path, engine='openpyxl')
     except Exception as e:
         print(f"Error reading the file: {e}")
-        return
+        return None
 
     if date_column not in df.columns:
         print(f"Column '{date_column}' not found in the file.")
-        return
-
-    # Calculate the cutoff date
-    cutoff_date = datetime.now() - timedelta(days=months_to_keep * 30)
+        return None
 
     # Convert the 'Date' column to datetime for filtering
-    try:
-        df[date_column] = pd.to_datetime(df[date_column], format=date_format)
-    except Exception as e:
-        print(f"Error converting the '{date_column}' column to datetime: {e}")
-        return
+    dates = parse_dates(df[date_column], date_format)
+    if dates.isna().all() and df[date_column].notna().any():
+        print(f"Column '{date_column}' in {file_path} holds no dates, skipped.")
+        return None
 
-    # Filter the DataFrame to retain only rows newer than the cutoff date
-    filtered_df = df[df[date_column] >= cutoff_date]
+    # Retain only rows newer than the cutoff date
+    keep = dates >= cutoff_day
+    print(f"Original rows: {len(df)} | Rows after filtering: {int(keep.sum())}")
 
-    print(f"Original rows: {len(df)} | Rows after filtering: {len(filtered_df)}")
-
-    # Save the filtered DataFrame back to the Excel file
+    # Save the filtered DataFrame back to the Excel file, only if rows were dropped
     try:
-        filtered_df.to_excel(file_path, index=False, engine='openpyxl')
-        print(f"Updated file saved: {file_path}")
+        if not keep.all():
+            df[date_column] = dates
+            df[keep].to_excel(file_path, index=False, engine='openpyxl')
+            print(f"Updated file saved: {file_path}")
+        write_date_range(file_path, dates[keep], date_column)
     except Exception as e:
         print(f"Error saving the updated file: {e}")
+        return None
+    return int((~keep).sum())
 
 
-def delete_old_data_from_output_files(output_folder, months_to_keep=8, date_column='Date', date_format='%Y-%m-%d'):
+def find_output_files(output_folder):
     """
-    Iterate over all relevant Excel files in the output folder and delete data older than a specified number of months.
+    Return the master stores and the plain Excel workbooks of the output folder.
+
+    :return: Tuple (store masters, workbooks); store masters are (kind, path) pairs with kind
+             "store" (partition folders) or "sqlite" (database). A store master is given as
+             the path of its .xlsx, which may not exist if the Excel export is disabled.
+    """
+    store_masters, workbooks = [], []
+    for root, dirs, files in os.walk(output_folder):
+        for directory in list(dirs):
+            if directory.endswith(STORE_SUFFIX):
+                store_masters.append(("store", os.path.join(root, directory[:-len(STORE_SUFFIX)] + ".xlsx")))
+                dirs.remove(directory)  # The partition folders hold no workbooks
+        for file in files:
+            if file.endswith(".xlsx"):
+                workbooks.append(os.path.join(root, file))
+            elif file.endswith(DB_SUFFIX):
+                store_masters.append(("sqlite", os.path.join(root, file[:-len(DB_SUFFIX)] + ".xlsx")))
+    # The .xlsx of a store is only an export; it is rewritten from the store
+    exports = {path for _, path in store_masters}
+    workbooks = [path for path in workbooks if path not in exports]
+    return sorted(store_masters), sorted(workbooks)
+
+
+def sweep_output_file(kind, file_path, months_to_keep=8, date_column='Date', date_format='%Y-%m-%d'):
+    """
+    Apply retention to one output file and time it. Runs in a worker of the retention sweep.
+
+    :param kind: "store" or "sqlite" (file_path is the master of a store) or "file" (plain workbook).
+    :return: Dict with the keys 'file', 'kind', 'rows_dropped' (None if skipped) and 'seconds'.
+    """
+    started = time.perf_counter()
+    if kind == "store":
+        print(f"Processing store: {get_store_path(file_path)}")
+        rows_dropped = delete_old_partitions(file_path, months_to_keep=months_to_keep)
+    elif kind == "sqlite":
+        print(f"Processing database: {get_db_path(file_path)}")
+        rows_dropped = delete_old_rows_from_db(file_path, months_to_keep=months_to_keep)
+    else:
+        print(f"Processing file: {file_path}")
+        rows_dropped = delete_old_data(
+            file_path=file_path,
+            date_column=date_column,
+            months_to_keep=months_to_keep,
+            date_format=date_format
+        )
+    return {
+        "file": file_path,
+        "kind": kind,
+        "rows_dropped": rows_dropped,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def log_retention_summary(results, seconds):
+    """
+    Print the rows dropped and the time taken per file, slowest first.
+    """
+    print("Retention summary:")
+    for result in sorted(results, key=lambda result: result["seconds"], reverse=True):
+        name = {"store": get_store_path, "sqlite": get_db_path}.get(result["kind"], str)(result["file"])
+        dropped = "skipped" if result["rows_dropped"] is None else f"{result['rows_dropped']} rows dropped"
+        print(f"  {result['seconds']:7.2f}s  {dropped:>20}  {os.path.basename(name)}")
+    total = sum(result["rows_dropped"] or 0 for result in results)
+    print(f"Retention dropped {total} rows from {len(results)} output file(s) in {seconds:.2f}s.")
+
+
+def delete_old_data_from_output_files(output_folder, months_to_keep=8, date_column='Date', date_format='%Y-%m-%d',
+                                      workers=1, executor="process"):
+    """
+    Delete data older than a specified number of months from all processed output files.
+    - Master stores: expired day partitions are dropped, nothing else is opened.
+    - SQLite masters: expired rows are deleted by date.
+    - Other Excel files: rows older than the cutoff are deleted; files without expired rows
+      (according to their date range sidecar) are skipped.
+    Files are independent, so they are swept concurrently if workers > 1.
 
     :param output_folder: Folder containing all processed output files.
     :param months_to_keep: Number of months to retain data (default is 8).
     :param date_column: Column containing the date information (default is 'Date').
-    :param date_format: Date format in the date column (default is '%Y-%m-%d').
+    :param date_format: Preferred date format of the date column (default is '%Y-%m-%d').
+    :param workers: Number of files processed concurrently (1 = one after another).
+    :param executor: "process" or "thread".
+    :return: List of per-file results (see sweep_output_file).
     """
     if not os.path.exists(output_folder):
         print(f"Output folder not found: {output_folder}")
-        return
+        return []
 
-    # Iterate through all Excel files in the output folder
-    for root, _, files in os.walk(output_folder):
-        for file in files:
-            if file.endswith(".xlsx"):
-                file_path = os.path.join(root, file)
-                print(f"Processing file: {file_path}")
-
-                # Apply the delete_old_data function
-                delete_old_data(
-                    file_path=file_path,
-                    date_column=date_column,
-                    months_to_keep=months_to_keep,
-                    date_format=date_format
-                )
+    started = time.perf_counter()
+    store_masters, workbooks = find_output_files(output_folder)
+    targets = [(kind, path) for kind, path in store_masters if kind == "sqlite" or list_partitions(path)]
+    targets += [("file", path) for path in workbooks]
+
+    # Apply the retention to every output file
+    results = run_tasks(
+        [(sweep_output_file, (kind, path, months_to_keep, date_column, date_format)) for kind, path in targets],
+        workers=workers,
+        executor=executor
+    )
+    log_retention_summary(results, time.perf_counter() - started)
+    return results
@@ -1,6 +1,7 @@
 from datetime import datetime
 import pandas as pd
 import logging
+from calendar_dimension import week_info, month_info
 def extract_month_from_week(period):
     """
     Extract the month from a week period of the format 'KWXX'.
@@ -12,9 +13,9 @@ def extract_month_from_week(period):
         try:
             week = int(period[2:4])  # Extract week number
             year = datetime.now().year  # Default to the current year
-            # Use ISO calendar to find the first day of the week
-            first_week_date = datetime.strptime(f'{year} {week} 1', '%G %V %u')
-            return first_week_date.strftime("%m")  # Return month in MM format
+            # Look up the first day of the ISO week in the calendar dimension
+            info = week_info(year, week)
+            return f"{info['month']:02d}" if info else None  # Return month in MM format
         except ValueError:
             return None
     return None
@@ -30,10 +31,9 @@ def extract_week_from_month(period):
         if "." in period:
             month = int(period[:2])
             year = int(period[3:])
-            # Calculate the week number for the first day of the month
-            first_day_of_month = datetime(year, month, 1)
-            week_number = first_day_of_month.isocalendar()[1]
-            return f"{week_number:02d}"  # Return as 'XX'
+            # Look up the ISO week of the first day of the month in the calendar dimension
+            info = month_info(year, month)
+            return f"{info['week']:02d}" if info else None  # Return as 'XX'
     except ValueError:
         return None
     return None
@@ -59,9 +59,45 @@ def extract_quarter(period):
         return None
     return None
 
+def _extract_month(x):
+    """
+    Extract the Month ('MM') from a single period value.
+    """
+    x = str(x) if not pd.isna(x) else ''  # Convert to string or handle NaN
+    if x.lower().startswith("kw" or "KW"):  # Case insensitive check for 'KW'
+        return extract_month_from_week(x)
+    return x[:2] if '.' in x else None
+
+def _extract_week(x):
+    """
+    Extract the Week ('XX') from a single period value.
+    """
+    x = str(x) if not pd.isna(x) else ''  # Convert to string or handle NaN
+    if "." in x and not x.lower().startswith("kw" or "KW"):
+        return extract_week_from_month(x)
+    elif x.lower().startswith("kw" or "KW"):
+        return x[2:4]
+    return None
+
+def build_period_dimension(periods, dtype=object):
+    """
+    Build the period dimension: 'Month', 'Week' and 'Quarter' for each distinct period.
+
+    :param periods: Distinct period values (e.g. the uniques of the 'Period' column).
+    :param dtype: dtype of the source period column.
+    :return: DataFrame with one row per period and the columns 'Period', 'Month', 'Week', 'Quarter'.
+    """
+    dimension = pd.DataFrame({'Period': pd.Series(periods, dtype=dtype)})
+    dimension['Month'] = dimension['Period'].apply(_extract_month)
+    dimension['Week'] = dimension['Period'].apply(_extract_week)
+    dimension['Quarter'] = dimension['Period'].apply(extract_quarter)
+    return dimension
+
 def add_date_and_extract_columns(df, period_column='Period'):
     """
     Add extracted 'Month', 'Week', and 'Quarter' columns to the DataFrame.
+    The values are derived once per distinct period and mapped back to the rows by their period code,
+    so the cost depends on the number of periods, not on the number of rows.
 
     :param df: Input DataFrame
     :param period_column: Column name containing the period (e.g., 'Period').
@@ -69,26 +105,13 @@ def add_date_and_extract_columns(df, period_column='Period'):
     """
     # Check if the period column exists
     if period_column in df.columns:
-        # Extract Month from 'Period' column
-        def extract_month(x):
-            x = str(x) if not pd.isna(x) else ''  # Convert to string or handle NaN
-            if x.lower().startswith("kw" or "KW"):  # Case insensitive check for 'KW'
-                return extract_month_from_week(x)
-            return x[:2] if '.' in x else None
-
-        # Extract Week from 'Period' column
-        def extract_week(x):
-            x = str(x) if not pd.isna(x) else ''  # Convert to string or handle NaN
-            if "." in x and not x.lower().startswith("kw" or "KW"):
-                return extract_week_from_month(x)
-            elif x.lower().startswith("kw" or "KW"):
-                return x[2:4]
-            return None
+        # Integer code per row pointing into the distinct periods
+        codes, periods = pd.factorize(df[period_column], use_na_sentinel=False)
+        dimension = build_period_dimension(periods, dtype=df[period_column].dtype)
 
-        # Apply transformations
-        df['Month'] = df[period_column].apply(extract_month)
-        df['Week'] = df[period_column].apply(extract_week)
-        df['Quarter'] = df[period_column].apply(extract_quarter)
+        # Map the dimension back to all rows
+        for column in ['Month', 'Week', 'Quarter']:
+            df[column] = pd.Series(dimension[column].to_numpy()[codes], index=df.index, dtype=dimension[column].dtype)
 
     return df
 
@@ -0,0 +1,126 @@
+import os
+import json
+import hashlib
+import functools
+import logging
+import threading
+import pandas as pd
+
+# Cache of parsed input files (Feather), keyed by content hash + parser name + parser version.
+# The index remembers size/mtime per path so unchanged files are not even re-hashed.
+CACHE_SETTINGS = {
+    "enabled": True,
+    "directory": os.path.join(os.path.abspath(os.path.dirname(__file__)), ".input_cache"),
+}
+CACHE_STATS = {"hits": 0, "misses": 0, "errors": 0}
+INDEX_FILE = "index.json"
+
+
+def configure_cache(config):
+    """
+    Apply the 'cache' section of the YAML config (enabled, directory).
+    """
+    settings = (config or {}).get("cache", {})
+    CACHE_SETTINGS["enabled"] = settings.get("enabled", CACHE_SETTINGS["enabled"])
+    CACHE_SETTINGS["directory"] = settings.get("directory", CACHE_SETTINGS["directory"])
+
+
+def _tmp_path(path):
+    # Unique per process and thread, so concurrent workers never share a temp file
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def _load_index():
+    index_path = os.path.join(CACHE_SETTINGS["directory"], INDEX_FILE)
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(index):
+    index_path = os.path.join(CACHE_SETTINGS["directory"], INDEX_FILE)
+    tmp_path = _tmp_path(index_path)
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(index, file)
+    os.replace(tmp_path, index_path)
+
+
+def file_digest(file_path):
+    """
+    Return the SHA-256 of a file. The hash is reused while size and mtime are unchanged.
+    """
+    stat = os.stat(file_path)
+    index = _load_index()
+    key = os.path.abspath(file_path)
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha256.update(block)
+    digest = sha256.hexdigest()
+
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    _save_index(index)
+    return digest
+
+
+def cached_input(parser_version):
+    """
+    Decorator for parser functions of the form func(file_path) -> DataFrame.
+    Bump parser_version whenever the parser output changes, so old entries are ignored.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(file_path):
+            if not CACHE_SETTINGS["enabled"] or not os.path.exists(file_path):
+                return func(file_path)
+
+            try:
+                os.makedirs(CACHE_SETTINGS["directory"], exist_ok=True)
+                digest = file_digest(file_path)
+                cache_path = os.path.join(
+                    CACHE_SETTINGS["directory"], f"{digest}-{func.__module__}.{func.__name__}-v{parser_version}.feather"
+                )
+                if os.path.exists(cache_path):
+                    df = pd.read_feather(cache_path)
+                    CACHE_STATS["hits"] += 1
+                    logging.info(f"Cache hit for {file_path}")
+                    return df
+            except Exception as e:
+                CACHE_STATS["errors"] += 1
+                logging.warning(f"Input cache unavailable for {file_path}: {e}")
+                return func(file_path)
+
+            CACHE_STATS["misses"] += 1
+            df = func(file_path)
+            if isinstance(df, pd.DataFrame):
+                try:
+                    tmp_path = _tmp_path(cache_path)
+                    df.reset_index(drop=True).to_feather(tmp_path)
+                    os.replace(tmp_path, cache_path)
+                except Exception as e:
+                    CACHE_STATS["errors"] += 1
+                    logging.warning(f"Could not cache parsed data of {file_path}: {e}")
+            return df
+        return wrapper
+    return decorator
+
+
+def log_cache_summary():
+    """
+    Log the cache statistics of this run and reset the counters.
+    """
+    total = CACHE_STATS["hits"] + CACHE_STATS["misses"]
+    logging.info(
+        f"Input cache: {CACHE_STATS['hits']} hits, {CACHE_STATS['misses']} misses, "
+        f"{CACHE_STATS['errors']} errors ({total} cached reads) in {CACHE_SETTINGS['directory']}"
+    )
+    for key in CACHE_STATS:
+        CACHE_STATS[key] = 0
@@ -4,6 +4,7 @@ import pandas as pd
 import sys
 import re
 import logging
+from functools import partial
 
 # Add project root to Python path
 #sys.path.append(os.path.abspath("C:/Users/PATANS/Downloads/pb_smt_data_automation"))
@@ -11,8 +12,8 @@ project_root = os.path.abspath(os.path.dirname(__file__))  # Gets the current sc
 sys.path.append(project_root)  # Adds the project root dynamically
 print(f"📂 Project Root Added to Path: {project_root}")
 # Import modules
-from pb_operations.data_extraction import extract_data
-from pb_operations.clean_rename import clean_and_rename_columns
+from pb_operations.ingestion import ingest_pb_files
+from pb_operations.clean_rename import rename_pb_columns, select_customer_rows
 from pb_operations.data_unpivoting import unpivot_data
 from pb_operations.append import append_to_master_file
 from pb_operations.seperating_first_line import process_pb_files, save_combined_production_hours
@@ -23,13 +24,29 @@ from smt_operations.clean_rename import clean_and_rename_smt_columns
 from smt_operations.data_unpivoting import unpivot_smt_data
 from smt_operations.append import append_to_master_smt_file
 
-from smt_load_operations.extraction import extract_smt_load_data
+from smt_load_operations.extraction import extract_smt_load_data, drop_unused_columns, add_todays_date
 from smt_load_operations.clean_rename import rename_columns_for_12_months, rename_columns_for_5_quarters
 from smt_load_operations.data_unpivoting import unpivot_smt_load_table, add_belastungsart_column
 from smt_load_operations.append import append_to_master_smt_load_file
 #from utility_functions import process_file
-from cleanup_old_data import delete_old_data_from_output_files
+from cleanup_old_data import delete_old_data_from_output_files, get_retention_settings
 from helpers import add_date_and_extract_columns , map_week_to_month_and_quarter # Common helper
+from master_store import configure_storage, export_to_excel, buffer_append, flush_write_buffer
+from input_cache import configure_cache, log_cache_summary
+from rename_planner import log_plan_summary
+from parallel import get_worker_settings, run_tasks
+from calendar_dimension import configure_calendar
+from chunked_ingestion import get_ingestion_settings, stream_file
+
+# Master files that are kept as partitioned stores next to the optional .xlsx export
+MASTER_FILES = [
+    "pb_master_monthly.xlsx",
+    "pb_master_weekly.xlsx",
+    "smt_master_monthly.xlsx",
+    "smt_master_weekly.xlsx",
+    "smt_load_master_12months.xlsx",
+    "smt_load_master_5quarters.xlsx",
+]
 
 
 def load_config(config_path):
@@ -50,22 +67,22 @@ def main():
 
     # Step 1: Perform data cleanup
     print("Deleting old data from processed output files...")
-    delete_old_data_from_output_files(output_folder, months_to_keep=8, date_column="Date", date_format='%Y-%m-%d')
+    delete_old_data_from_output_files(output_folder, **get_retention_settings(config))
 
     # Step 2: Proceed with your existing workflow
     process_files(config, base_output_folder)
 
-def process_pb_combined_hours(base_output_folder):
+def process_pb_combined_hours(base_output_folder, pb_frames):
     """
     Process PB files for combined production hours.
-    Extracts data, unpivots, and saves weekly and monthly combined files, including additional attributes.
+    Takes the ingested PB frames, unpivots, and saves weekly and monthly combined files, including additional attributes.
     """
     # Define local lists to store production hours
     total_production_hours_weekly = []
     total_production_hours_monthly = []
 
     # Process PB files
-    process_pb_files(total_production_hours_weekly, total_production_hours_monthly)
+    process_pb_files(pb_frames, total_production_hours_weekly, total_production_hours_monthly)
 
     # Save unpivoted weekly production hours
     weekly_output_file = os.path.join(base_output_folder, "combined_weekly_production_hours.xlsx")
@@ -104,15 +121,18 @@ def process_pb_combined_hours(base_output_folder):
 
 
 
-def process_single_file(process_type, frequency, file_path, clean_rename_func, unpivot_func, master_file_path, extraction_func):
+def prepare_single_file(process_type, frequency, file_path, clean_rename_func, unpivot_func, extraction_func, ingested_df=None):
     """
-    Process a single PB or SMT file and append results to the master file.
+    Extract, clean, unpivot and date a single PB or SMT file, without touching the master file.
+    If ingested_df is given, the file was already parsed in this run and extraction_func is not called.
+
+    :return: Final DataFrame ready to be appended, or None if a step failed.
     """
     print(f"\n>> Processing {process_type} | Frequency: {frequency}")
     print(f"File Path: {file_path}")
 
     # Step 1: Extract Data
-    df = extraction_func(file_path)
+    df = ingested_df if ingested_df is not None else extraction_func(file_path)
     if df is None or df.empty:
         print(f"Error: Data extraction failed for {process_type} - {frequency}.")
         return None
@@ -136,7 +156,16 @@ def process_single_file(process_type, frequency, file_path, clean_rename_func, u
         return None
 
     # Step 4: Add Date, Month, Week, and Quarter
-    df_final = add_date_and_extract_columns(df_unpivoted, period_column='Period')
+    return add_date_and_extract_columns(df_unpivoted, period_column='Period')
+
+
+def process_single_file(process_type, frequency, file_path, clean_rename_func, unpivot_func, master_file_path, extraction_func, ingested_df=None):
+    """
+    Process a single PB or SMT file and append results to the master file.
+    """
+    df_final = prepare_single_file(process_type, frequency, file_path, clean_rename_func, unpivot_func, extraction_func, ingested_df)
+    if df_final is None:
+        return None
 
     # Step 5: Append to Master File
     append_to_master_file(df_final, master_file_path)
@@ -145,15 +174,18 @@ def process_single_file(process_type, frequency, file_path, clean_rename_func, u
     return df_final
 
 
-def process_smt_load_file(file_path, master_file_path, rename_func, suffix):
+def prepare_smt_load_file(file_path, rename_func, suffix, ingested_df=None):
     """
-    Process SMT Load Table (12 months or 5 quarters).
+    Extract, rename and unpivot an SMT Load Table (12 months or 5 quarters), without touching the master file.
+    If ingested_df is given, the file was already parsed (e.g. one chunk of it) and is not read again.
+
+    :return: Unpivoted DataFrame ready to be appended, or None if extraction failed.
     """
     print(f"\n>> Processing SMT Load Table | {suffix}")
     print(f"File Path: {file_path}")
 
     # Step 1: Extract Data
-    df = extract_smt_load_data(file_path)
+    df = ingested_df if ingested_df is not None else extract_smt_load_data(file_path)
     if df is None or df.empty:
         print(f"Error: Data extraction failed for SMT Load - {suffix}.")
         return None
@@ -172,33 +204,145 @@ def process_smt_load_file(file_path, master_file_path, rename_func, suffix):
     # Step 5: Add Belastungsart to SMT0 rows
     smt0_unpivoted = add_belastungsart_column(smt0_unpivoted)
 
+    return df_unpivoted
+
+
+def process_smt_load_file(file_path, master_file_path, rename_func, suffix):
+    """
+    Process SMT Load Table (12 months or 5 quarters).
+    """
+    df_unpivoted = prepare_smt_load_file(file_path, rename_func, suffix)
+    if df_unpivoted is None:
+        return None
+
     # Step 6: Append to Master File
     append_to_master_smt_load_file(df_unpivoted, master_file_path)
     print(f"Successfully processed and appended SMT Load {suffix} to master file.")
 
 
+def prepare_job(label, prepare_func, args):
+    """
+    Run one prepare step. An error only drops this input, the other files of the run are still written.
+    """
+    try:
+        return prepare_func(*args)
+    except Exception as e:
+        print(f"Error while processing {label}: {e}")
+        return None
+
+
+def prepare_pb_chunk(pb_type, frequency, file_path, first_rows, chunk):
+    """
+    Prepare one chunk of a PB file. The first row of the file (the PB total) is kept
+    in first_rows for the combined production hours.
+    """
+    df = rename_pb_columns(chunk)
+    first_rows.setdefault((pb_type, frequency), df.iloc[[0]])
+    return prepare_single_file(pb_type, frequency, file_path, select_customer_rows, unpivot_data, None, df)
+
+
+def prepare_smt_chunk(frequency, file_path, chunk):
+    """
+    Prepare one chunk of an SMT file.
+    """
+    return prepare_single_file("SMT", frequency, file_path, clean_and_rename_smt_columns, unpivot_smt_data, None, chunk)
+
+
+def prepare_smt_load_chunk(file_path, rename_func, suffix, chunk):
+    """
+    Prepare one chunk of an SMT Load Table.
+    """
+    return prepare_smt_load_file(file_path, rename_func, suffix, add_todays_date(drop_unused_columns(chunk)))
+
+
+def stream_files(config, base_output_folder, settings):
+    """
+    Chunked ingestion mode: every file is read in chunks and each chunk is cleaned,
+    unpivoted and appended to its master right away, so peak memory is bounded by the
+    chunk size instead of the file size. Files are streamed one after another.
+    """
+    data_extraction = config['data_extraction']
+
+    # Each stream: (label, file path, layout, chunk function, master file, append function)
+    streams = []
+
+    # PB Processing; the first row of every file is collected for the combined hours
+    pb_first_rows = {}
+    for pb_type, frequencies in data_extraction['pb_input_files'].items():
+        for frequency, file_path in frequencies.items():
+            master_file = "pb_master_monthly.xlsx" if frequency == 'monthly' else "pb_master_weekly.xlsx"
+            streams.append((f"{pb_type} - {frequency}", file_path, "pb",
+                            partial(prepare_pb_chunk, pb_type, frequency, file_path, pb_first_rows),
+                            master_file, append_to_master_file))
+
+    # SMT Processing
+    for frequency, file_path in data_extraction['smt_input_files'].items():
+        master_file = "smt_master_monthly.xlsx" if frequency == 'monthly' else "smt_master_weekly.xlsx"
+        streams.append((f"SMT - {frequency}", file_path, "smt",
+                        partial(prepare_smt_chunk, frequency, file_path),
+                        master_file, append_to_master_file))
+
+    # SMT Load Processing
+    smt_load_renames = {'12months': rename_columns_for_12_months, '5quarters': rename_columns_for_5_quarters}
+    for suffix, file_path in data_extraction.get('smt_load_files', {}).items():
+        if suffix in smt_load_renames:
+            streams.append((f"SMT Load {suffix}", file_path, "smt_load",
+                            partial(prepare_smt_load_chunk, file_path, smt_load_renames[suffix], suffix),
+                            f"smt_load_master_{suffix}.xlsx", append_to_master_smt_load_file))
+
+    for label, file_path, layout, prepare_chunk, master_file, append_func in streams:
+        try:
+            stream_file(label, file_path, layout, prepare_chunk,
+                        os.path.join(base_output_folder, master_file), append_func, settings)
+        except Exception as e:
+            # Chunks appended before the error stay in the master
+            print(f"Error while streaming {label}: {e}")
+
+    #Process PB Combined Hours
+    process_pb_combined_hours(base_output_folder, pb_first_rows)
+
+
 def process_files(config, base_output_folder):
     """
     Orchestrates processing for PB, SMT, and SMT Load files.
+    The files are prepared concurrently if 'processing.workers' > 1. The new rows are
+    buffered per master and every master is written once at the end of the run.
+    With 'ingestion.mode: chunked' the files are streamed instead (see stream_files).
     """
+    ingestion_settings = get_ingestion_settings(config)
+    if ingestion_settings["mode"] == "chunked":
+        stream_files(config, base_output_folder, ingestion_settings)
+        return
+
+    workers, executor = get_worker_settings(config)
+
+    # Parse every PB file once; combined hours and PB masters share these frames
+    pb_input_files = config['data_extraction']['pb_input_files']
+    pb_frames = ingest_pb_files(pb_input_files, workers, executor)
+
     #Process PB Combined Hours
-    process_pb_combined_hours(base_output_folder)
+    process_pb_combined_hours(base_output_folder, pb_frames)
+
+    # Each job: (label, master file, append function, prepare function, arguments)
+    jobs = []
+
     # PB Processing
-    pb_input_files = config['data_extraction']['pb_input_files']
     pb_master_file_path_monthly = os.path.join(base_output_folder, "pb_master_monthly.xlsx")
     pb_master_file_path_weekly = os.path.join(base_output_folder, "pb_master_weekly.xlsx")
 
     for pb_type, frequencies in pb_input_files.items():
         for frequency, file_path in frequencies.items():
-            process_single_file(
-                process_type=pb_type,
-                frequency=frequency,
-                file_path=file_path,
-                clean_rename_func=clean_and_rename_columns,
-                unpivot_func=unpivot_data,
-                master_file_path=(pb_master_file_path_monthly if frequency == 'monthly' else pb_master_file_path_weekly),
-                extraction_func=extract_data,
-            )
+            ingested_df = pb_frames.get((pb_type, frequency))
+            if ingested_df is None:
+                print(f"Skipping {pb_type} - {frequency}: file could not be ingested.")
+                continue
+            jobs.append((
+                f"{pb_type} - {frequency}",
+                pb_master_file_path_monthly if frequency == 'monthly' else pb_master_file_path_weekly,
+                append_to_master_file,
+                prepare_single_file,
+                (pb_type, frequency, file_path, select_customer_rows, unpivot_data, None, ingested_df),
+            ))
 
     # SMT Processing
     smt_input_files = config['data_extraction']['smt_input_files']
@@ -206,15 +350,13 @@ def process_files(config, base_output_folder):
     smt_master_file_path_weekly = os.path.join(base_output_folder, "smt_master_weekly.xlsx")
 
     for frequency, file_path in smt_input_files.items():
-        process_single_file(
-            process_type="SMT",
-            frequency=frequency,
-            file_path=file_path,
-            clean_rename_func=clean_and_rename_smt_columns,
-            unpivot_func=unpivot_smt_data,
-            master_file_path=(smt_master_file_path_monthly if frequency == 'monthly' else smt_master_file_path_weekly),
-            extraction_func=extract_smt_data,
-        )
+        jobs.append((
+            f"SMT - {frequency}",
+            smt_master_file_path_monthly if frequency == 'monthly' else smt_master_file_path_weekly,
+            append_to_master_file,
+            prepare_single_file,
+            ("SMT", frequency, file_path, clean_and_rename_smt_columns, unpivot_smt_data, extract_smt_data),
+        ))
 
     # SMT Load Processing
     smt_load_files = config['data_extraction'].get('smt_load_files', {})
@@ -223,9 +365,40 @@ def process_files(config, base_output_folder):
 
     for suffix, file_path in smt_load_files.items():
         if suffix == '12months':
-            process_smt_load_file(file_path, smt_load_master_12months, rename_columns_for_12_months, suffix)
+            jobs.append((f"SMT Load {suffix}", smt_load_master_12months, append_to_master_smt_load_file,
+                         prepare_smt_load_file, (file_path, rename_columns_for_12_months, suffix)))
         elif suffix == '5quarters':
-            process_smt_load_file(file_path, smt_load_master_5quarters, rename_columns_for_5_quarters, suffix)
+            jobs.append((f"SMT Load {suffix}", smt_load_master_5quarters, append_to_master_smt_load_file,
+                         prepare_smt_load_file, (file_path, rename_columns_for_5_quarters, suffix)))
+
+    # Extract, clean, unpivot and date all files (in parallel if configured)
+    results = run_tasks([(prepare_job, (label, prepare_func, args)) for label, _, _, prepare_func, args in jobs],
+                        workers, executor)
+
+    # Collect the new rows per master in job order; failed inputs (None) are left out
+    write_buffer = {}
+    for (label, master_file_path, append_func, _, _), df_final in zip(jobs, results):
+        if df_final is None:
+            print(f"No rows from {label} will be appended.")
+            continue
+        buffer_append(write_buffer, df_final, master_file_path, append_func)
+        print(f"Successfully processed {label}, queued for {os.path.basename(master_file_path)}.")
+
+    # One write per master file
+    failed = flush_write_buffer(write_buffer)
+    if failed:
+        print(f"{len(failed)} master file(s) were not updated: {', '.join(map(os.path.basename, failed))}")
+
+
+def export_master_files(config, base_output_folder):
+    """
+    Export the partitioned master stores to .xlsx for Power BI, if enabled in the config.
+    """
+    if not config.get('storage', {}).get('export_excel', True):
+        print("Excel export of master files is disabled.")
+        return
+    for master_file in MASTER_FILES:
+        export_to_excel(os.path.join(base_output_folder, master_file))
 
 
 if __name__ == "__main__":
@@ -240,7 +413,13 @@ if __name__ == "__main__":
 
     if config is not None:
         os.makedirs(base_output_folder, exist_ok=True)
+        configure_cache(config)
+        configure_storage(config)
+        configure_calendar(config)
         process_files(config, base_output_folder)
+        log_cache_summary()
+        log_plan_summary()
+        export_master_files(config, base_output_folder)
         print("PB, SMT, and SMT Load processing completed successfully!")
     else:
         print("Configuration could not be loaded.")
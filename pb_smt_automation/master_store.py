@@ -0,0 +1,349 @@
+import os
+import glob
+import numbers
+import shutil
+from datetime import datetime
+import pandas as pd
+import pyarrow.parquet as pq
+import sqlite_store
+
+# Every master file gets a sibling directory holding one sub-folder per day
+# (e.g. pb_master_monthly_store/Date=2025-03-04/part-103000-000001.parquet).
+# Appending a run only writes the new part file, so its cost does not grow
+# with the history kept in the master.
+STORE_SUFFIX = "_store"
+PARTITION_PREFIX = "Date="
+UNKNOWN_PARTITION = "unknown"
+
+# Object columns that only hold numbers are written as numeric columns. Columns mixing
+# numbers and text (e.g. an SMT 'Value' column with a few '0100 | SMT4' cells) are written
+# as a text column plus a numeric '<col>__numbers' column; their names go into the part
+# file so reading merges them back (a text like '12' stays text).
+MIXED_COLUMNS_ATTR = "mixed_columns"
+NUMBERS_SUFFIX = "__numbers"
+NUMERIC_INFERRED_TYPES = ("integer", "floating", "mixed-integer-float", "decimal")
+
+# Backend of the master stores: "parquet" (partition folders) or "sqlite" (one indexed
+# database per master, see sqlite_store). Set from the 'storage' section of the config.
+STORAGE_SETTINGS = {"backend": "parquet"}
+BACKENDS = ("parquet", "sqlite")
+
+
+def configure_storage(config):
+    """
+    Apply the 'storage' section of the YAML config (backend).
+    """
+    backend = (config or {}).get("storage", {}).get("backend", STORAGE_SETTINGS["backend"])
+    if backend not in BACKENDS:
+        print(f"Unknown storage backend '{backend}', falling back to 'parquet'.")
+        backend = "parquet"
+    STORAGE_SETTINGS["backend"] = backend
+
+
+def _use_sqlite():
+    return STORAGE_SETTINGS["backend"] == "sqlite"
+
+
+def get_store_path(master_file_path):
+    """
+    Return the partitioned store directory that belongs to a master file.
+
+    :param master_file_path: Path to the master Excel file (e.g. pb_master_monthly.xlsx).
+    :return: Path to the store directory (e.g. pb_master_monthly_store).
+    """
+    root, _ = os.path.splitext(master_file_path)
+    return root + STORE_SUFFIX
+
+
+def partition_key(date_value):
+    """
+    Return the partition folder name for a single 'Date' value.
+    """
+    timestamp = pd.to_datetime(date_value, errors='coerce')
+    if pd.isna(timestamp):
+        return PARTITION_PREFIX + UNKNOWN_PARTITION
+    return PARTITION_PREFIX + timestamp.strftime('%Y-%m-%d')
+
+
+def list_partitions(master_file_path):
+    """
+    List the partition folders of a store, oldest first.
+    """
+    store_path = get_store_path(master_file_path)
+    if not os.path.isdir(store_path):
+        return []
+    return sorted(name for name in os.listdir(store_path) if name.startswith(PARTITION_PREFIX))
+
+
+def _make_arrow_safe(df):
+    """
+    Prepare a DataFrame for pyarrow. Object columns holding only numbers become numeric;
+    columns mixing numbers and text keep the text and move the numbers to a '<col>__numbers'
+    column. The mixed columns are listed in df.attrs, which pandas stores in the part file,
+    so _read_part can merge them back.
+    """
+    df = df.copy()
+    mixed_columns = []
+    for col in df.columns:
+        # Categoricals from the unpivot steps are stored with their plain dtype
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+        if df[col].dtype == object:
+            inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+            if inferred in NUMERIC_INFERRED_TYPES:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            elif inferred.startswith('mixed'):
+                is_number = df[col].map(_is_number)
+                text = df[col].where(~is_number)
+                df[f"{col}{NUMBERS_SUFFIX}"] = pd.to_numeric(df[col].where(is_number), errors='coerce')
+                df[col] = text.where(text.isna(), text.astype(str))
+                mixed_columns.append(str(col))
+    df.columns = [str(col) for col in df.columns]
+    df.attrs = {MIXED_COLUMNS_ATTR: mixed_columns} if mixed_columns else {}
+    return df
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _read_part(part_path, columns=None):
+    """
+    Read one part file and restore the numbers of its mixed columns.
+    """
+    if columns is not None:
+        stored = pq.read_schema(part_path).names
+        columns = list(columns) + [f"{col}{NUMBERS_SUFFIX}" for col in columns if f"{col}{NUMBERS_SUFFIX}" in stored]
+    df = pd.read_parquet(part_path, columns=columns, engine='pyarrow')
+    for col in df.attrs.pop(MIXED_COLUMNS_ATTR, []):
+        numbers_col = f"{col}{NUMBERS_SUFFIX}"
+        if numbers_col in df.columns:
+            if col in df.columns:
+                df[col] = df[col].astype(object).where(df[numbers_col].isna(), df[numbers_col])
+            df = df.drop(columns=numbers_col)
+    return df
+
+
+def _write_part(df, partition_dir):
+    """
+    Write one part file into a partition folder and return its path.
+    """
+    os.makedirs(partition_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%H%M%S%f')
+    part_path = os.path.join(partition_dir, f"part-{stamp}-{os.getpid()}.parquet")
+    tmp_path = part_path + ".tmp"
+    _make_arrow_safe(df).to_parquet(tmp_path, index=False, engine='pyarrow')
+    os.replace(tmp_path, part_path)
+    return part_path
+
+
+def _seed_from_excel(master_file_path, date_column='Date'):
+    """
+    Copy an existing master workbook into the store once, so no history is lost
+    when switching from the .xlsx master to the partitioned store.
+    """
+    store_path = get_store_path(master_file_path)
+    if os.path.isdir(store_path) or not os.path.exists(master_file_path):
+        return
+    legacy_df = pd.read_excel(master_file_path, engine='openpyxl')
+    print(f"Migrating {len(legacy_df)} rows from {master_file_path} into {store_path}")
+    os.makedirs(store_path, exist_ok=True)
+    if not legacy_df.empty:
+        write_partitions(legacy_df, master_file_path, date_column=date_column)
+
+
+def _seed_sqlite(master_file_path, date_column='Date'):
+    """
+    Copy an existing store (or legacy workbook) into the SQLite database once,
+    so no history is lost when switching the backend.
+    """
+    if sqlite_store.db_exists(master_file_path):
+        return
+    legacy_df = _read_parquet_master(master_file_path)
+    if legacy_df.empty:
+        return
+    print(f"Migrating {len(legacy_df)} rows of {master_file_path} into {sqlite_store.get_db_path(master_file_path)}")
+    sqlite_store.append_rows(legacy_df, master_file_path, date_column=date_column)
+
+
+def write_partitions(df, master_file_path, date_column='Date'):
+    """
+    Write a DataFrame into the store, one new part file per 'Date' day.
+
+    :param df: DataFrame to store.
+    :param master_file_path: Path to the master Excel file the store belongs to.
+    :param date_column: Column used to partition the rows (default is 'Date').
+    :return: Number of rows written.
+    """
+    store_path = get_store_path(master_file_path)
+    if date_column in df.columns:
+        keys = pd.to_datetime(df[date_column], errors='coerce').map(partition_key)
+    else:
+        keys = pd.Series(PARTITION_PREFIX + UNKNOWN_PARTITION, index=df.index)
+
+    for key, part in df.groupby(keys, sort=True):
+        _write_part(part, os.path.join(store_path, key))
+    return len(df)
+
+
+def append_partition(df, master_file_path, date_column='Date'):
+    """
+    Append a run's rows to the partitioned store of a master file.
+    Only the new rows are written; existing partitions are left untouched.
+
+    :param df: DataFrame to append.
+    :param master_file_path: Path to the master Excel file the store belongs to.
+    :param date_column: Column used to partition the rows (default is 'Date').
+    """
+    if df is None or df.empty:
+        print(f"No rows to append to {master_file_path}.")
+        return 0
+    if _use_sqlite():
+        _seed_sqlite(master_file_path, date_column=date_column)
+        rows = sqlite_store.append_rows(df, master_file_path, date_column=date_column)
+        print(f"Appended {rows} rows to {sqlite_store.get_db_path(master_file_path)}")
+        return rows
+    _seed_from_excel(master_file_path, date_column=date_column)
+    rows = write_partitions(df, master_file_path, date_column=date_column)
+    print(f"Appended {rows} rows to {get_store_path(master_file_path)}")
+    return rows
+
+
+def read_master(master_file_path):
+    """
+    Read the full history of a master file.
+    Falls back to the legacy .xlsx master if no store exists yet.
+
+    :param master_file_path: Path to the master Excel file.
+    :return: DataFrame with all rows, oldest partition first.
+    """
+    if _use_sqlite() and sqlite_store.db_exists(master_file_path):
+        return sqlite_store.read_master(master_file_path)
+    return _read_parquet_master(master_file_path)
+
+
+def _read_parquet_master(master_file_path):
+    store_path = get_store_path(master_file_path)
+    if not os.path.isdir(store_path):
+        if os.path.exists(master_file_path):
+            return pd.read_excel(master_file_path, engine='openpyxl')
+        return pd.DataFrame()
+
+    frames = []
+    for partition in list_partitions(master_file_path):
+        for part_path in sorted(glob.glob(os.path.join(store_path, partition, "*.parquet"))):
+            frames.append(_read_part(part_path))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def drop_partition(master_file_path, partition):
+    """
+    Remove a whole partition folder from the store.
+    """
+    partition_dir = os.path.join(get_store_path(master_file_path), partition)
+    if os.path.isdir(partition_dir):
+        shutil.rmtree(partition_dir)
+
+
+def partition_date(partition):
+    """
+    Return the day of a partition folder name (e.g. 'Date=2025-03-04'), or None for the 'unknown' partition.
+    """
+    day = pd.to_datetime(partition[len(PARTITION_PREFIX):], format='%Y-%m-%d', errors='coerce')
+    return None if pd.isna(day) else day
+
+
+def count_partition_rows(master_file_path, partition):
+    """
+    Count the rows of a partition from the Parquet footers, without reading any data.
+    """
+    partition_dir = os.path.join(get_store_path(master_file_path), partition)
+    return sum(pq.read_metadata(part_path).num_rows
+               for part_path in glob.glob(os.path.join(partition_dir, "*.parquet")))
+
+
+def drop_partitions_before(master_file_path, cutoff_day):
+    """
+    Drop every partition of a store whose day lies before cutoff_day.
+    Partitions inside the window (and the 'unknown' partition) are not opened.
+
+    :param master_file_path: Path to the master Excel file the store belongs to.
+    :param cutoff_day: First day to keep.
+    :return: Dict {partition: number of rows dropped}.
+    """
+    dropped = {}
+    for partition in list_partitions(master_file_path):
+        day = partition_date(partition)
+        if day is None or day >= cutoff_day:
+            continue
+        dropped[partition] = count_partition_rows(master_file_path, partition)
+        drop_partition(master_file_path, partition)
+    return dropped
+
+
+def export_to_excel(master_file_path):
+    """
+    Write the full store back to the .xlsx master so Power BI can keep reading it.
+
+    :param master_file_path: Path to the master Excel file.
+    """
+    if _use_sqlite():
+        if not sqlite_store.db_exists(master_file_path):
+            return
+    elif not os.path.isdir(get_store_path(master_file_path)):
+        return
+    try:
+        df = read_master(master_file_path)
+        df.to_excel(master_file_path, index=False, engine='openpyxl')
+        print(f"Exported {len(df)} rows to {master_file_path}")
+    except PermissionError:
+        print(f"Permission denied: Unable to write to {master_file_path}. Please close the file and try again.")
+    except Exception as e:
+        print(f"Unexpected error while exporting {master_file_path}: {e}")
+
+
+def buffer_append(write_buffer, df, master_file_path, append_func):
+    """
+    Queue rows for a master instead of writing them right away (write-behind).
+    All frames queued for the same master are written together by flush_write_buffer.
+
+    :param write_buffer: Dict {master_file_path: (append_func, [frames])} owned by the caller for one run.
+    :param df: DataFrame with the new rows; None or empty frames (failed inputs) are ignored.
+    :param master_file_path: Path to the master Excel file.
+    :param append_func: Function (df, master_file_path) that writes the rows, e.g. append_to_master_file.
+    """
+    if df is None or df.empty:
+        return
+    write_buffer.setdefault(master_file_path, (append_func, []))[1].append(df)
+
+
+def flush_write_buffer(write_buffer):
+    """
+    Write every buffered master once: one concat and one append per master, in the order they were first queued.
+    A master whose append fails is reported and skipped, so the other masters are still written.
+
+    :param write_buffer: Dict filled by buffer_append. It is emptied afterwards.
+    :return: List of the master files that could not be written.
+    """
+    failed = []
+    for master_file_path, (append_func, frames) in write_buffer.items():
+        try:
+            df = pd.concat(frames, ignore_index=True)
+            print(f"Flushing {len(frames)} buffered frame(s) with {len(df)} rows to {master_file_path}")
+            append_func(df, master_file_path)
+        except Exception as e:
+            print(f"Failed to write {master_file_path}: {e}")
+            failed.append(master_file_path)
+    write_buffer.clear()
+    return failed
+
+
+if __name__ == "__main__":
+    # Export masters on demand, e.g.: python master_store.py sqlite /main/.../pb_master_monthly.xlsx
+    import sys
+
+    configure_storage({"storage": {"backend": sys.argv[1]}})
+    for path in sys.argv[2:]:
+        export_to_excel(path)
@@ -0,0 +1,71 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from input_cache import CACHE_STATS
+from rename_planner import PLAN_STATS
+
+# Independent input files (extract -> clean -> unpivot -> date columns) can be
+# prepared concurrently. Results are always returned in task order, so the
+# masters are appended in the same order as in a serial run.
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def get_worker_settings(config):
+    """
+    Read the 'processing' section of the YAML config.
+
+    :param config: Loaded configuration dictionary.
+    :return: Tuple (workers, executor); workers <= 1 means serial processing.
+    """
+    settings = (config or {}).get("processing", {})
+    workers = int(settings.get("workers", 1) or 1)
+    executor = settings.get("executor", "thread")
+    if executor not in EXECUTORS:
+        print(f"Unknown executor '{executor}', falling back to 'thread'.")
+        executor = "thread"
+    return workers, executor
+
+
+# Per-run counters that worker processes report back to the parent
+WORKER_STATS = [CACHE_STATS, PLAN_STATS]
+
+
+def _call_in_worker(func, args):
+    """
+    Run a task in a worker process and hand its cache statistics back to the parent.
+    """
+    for stats in WORKER_STATS:
+        for key in stats:
+            stats[key] = 0
+    result = func(*args)
+    return result, [dict(stats) for stats in WORKER_STATS]
+
+
+def run_tasks(tasks, workers=1, executor="thread"):
+    """
+    Run independent tasks and return their results in task order.
+
+    :param tasks: List of (func, args) tuples. For the process executor, func must be importable at module level.
+    :param workers: Number of concurrent workers; 1 runs the tasks one after another.
+    :param executor: "thread" or "process".
+    :return: List of results, one per task, in the order of tasks.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        return [func(*args) for func, args in tasks]
+
+    workers = min(workers, len(tasks))
+    print(f"Running {len(tasks)} tasks with {workers} {executor} workers.")
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        if executor == "process":
+            futures = [pool.submit(_call_in_worker, func, args) for func, args in tasks]
+            results = []
+            for future in futures:
+                result, worker_stats = future.result()
+                for stats, counts in zip(WORKER_STATS, worker_stats):
+                    for key, value in counts.items():
+                        stats[key] += value
+                results.append(result)
+            return results
+        futures = [pool.submit(func, *args) for func, args in tasks]
+        return [future.result() for future in futures]
@@ -1,60 +1,94 @@
 import re
+from rename_planner import get_rename_plan, apply_rename_plan
 
-def clean_and_rename_columns(df):
+# Header patterns of the PB customer labor exports
+CUSTOMER_COLUMN = re.compile(r'Info1.*Mat\.Dat\.')
+MONTH_COLUMN = re.compile(r'Ecktermin .*:(\d{2}\.\d{4}),.*')
+WEEK_COLUMN = re.compile(r'Ecktermin 🔑:W(\d{2}) \d{4},Rest-Belastung Gesamt Personal')
+UNNAMED_COLUMN = re.compile(r'^Unnamed')
+PB_PLAN_VERSION = 1
+
+def plan_pb_columns(columns):
+    """
+    Compute the rename plan for a PB export header (see rename_planner.get_rename_plan).
+    - Renames the first 'Info1 (Mat.Dat.)' column to 'Coustmer Type'.
+    - Renames 'Arbeitsplatznummer' to 'SMT Type'.
+    - Renames 'Ecktermin 🔑:WXX YYYY,...' to 'KWXX' and 'Ecktermin ...:MM.YYYY,...' to 'MM.YYYY'.
+    - Drops unnamed columns.
+
+    :param columns: List of column names.
+    :return: Plan dict with 'rename', 'drop' and 'missing'.
+    """
+    names = list(columns)
+    missing = []
+
+    customer_columns = [i for i, name in enumerate(names) if CUSTOMER_COLUMN.search(name)]
+    if customer_columns:
+        old_name = names[customer_columns[0]]
+        names = ['Coustmer Type' if name == old_name else name for name in names]
+    else:
+        missing.append('Info1 (Mat.Dat.)')
+
+    names = ['SMT Type' if name == 'Arbeitsplatznummer' else name for name in names]
+
+    period_count = 0
+    for i, name in enumerate(names):
+        if WEEK_COLUMN.search(name):
+            names[i] = WEEK_COLUMN.sub(r'KW\1', name)
+            period_count += 1
+        elif MONTH_COLUMN.search(name):
+            names[i] = MONTH_COLUMN.sub(r'\1', name)
+            period_count += 1
+    if not period_count:
+        missing.append('Ecktermin period columns')
+
+    return {
+        "rename": {old: new for old, new in zip(columns, names) if old != new},
+        "drop": [name for name in names if UNNAMED_COLUMN.search(name)],
+        "missing": missing,
+    }
+
+def rename_pb_columns(df):
     """
-    Clean and rename columns in the DataFrame.
+    Rename and clean the columns of a raw PB export, keeping all rows.
     - Renames 'Info1 (Mat.Dat.)' to 'Coustmer Type'.
     - Renames 'Arbeitsplatznummer' to 'SMT Type'.
     - Converts month-year and week-year columns to a unified 'Period' format.
 
+    The first row (the PB total without customer) is still present, so the
+    combined production hours can be taken from the same frame.
+
     :param df: Input DataFrame
-    :return: Cleaned and renamed DataFrame
+    :return: DataFrame with renamed columns
     """
     if df is None:
         print("DataFrame is empty. Cannot clean and rename columns.")
         return None
 
-    # Rename 'Info1 (Mat.Dat.)' to 'Coustmer Type'
-    potential_columns = [col for col in df.columns if re.search(r'Info1.*Mat\.Dat\.', col)]
-    if potential_columns:
-        df.rename(columns={potential_columns[0]: 'Coustmer Type'}, inplace=True)
-
-    # Rename 'Arbeitsplatznummer' to 'SMT Type'
-    if 'Arbeitsplatznummer' in df.columns:
-        df.rename(columns={'Arbeitsplatznummer': 'SMT Type'}, inplace=True)
-
-    # Rename Month-Year and Week-Year columns to a unified 'Period' format
-    period_columns = {}
-    for col in df.columns:
-        # Match Month-Year columns (e.g., Ecktermin 🔑:MM.YYYY,...)
-        if re.search(r'Ecktermin .*:\d{2}\.\d{4},.*', col):
-            new_col_name = re.sub(r'Ecktermin .*:(\d{2}\.\d{4}),.*', r'\1', col)
-            period_columns[col] = new_col_name
-        # Match Week-Year columns (e.g., Ecktermin 🔑:WXX YYYY,...)
-        # Rename weekly period columns
-    # Rename weekly period columns
-    week_year_columns = [col for col in df.columns if re.search(r'Ecktermin 🔑:W\d{2} \d{4},Rest-Belastung Gesamt Personal', col)]
-    for col in week_year_columns:
-    # Extract only the week number (WXX) and rename to KWXX
-        new_col_name = re.sub(r'Ecktermin 🔑:W(\d{2}) \d{4},Rest-Belastung Gesamt Personal', r'KW\1', col)
-        df.rename(columns={col: new_col_name}, inplace=True)
-
-    print("Columns after renaming weekly data:", df.columns.tolist())
-
-
-    # Apply renaming for all identified Period columns
-    df.rename(columns=period_columns, inplace=True)
+    # Rename and drop the columns in one step, planned once per header layout
+    plan = get_rename_plan("pb", df.columns, plan_pb_columns, version=PB_PLAN_VERSION)
+    df = apply_rename_plan(df, plan)
 
     # Debugging: Print columns after renaming
     print("Columns after renaming:", df.columns.tolist())
 
-    # Drop unnamed columns
-    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-
     # Clean 'Coustmer Type' column
     if "Coustmer Type" in df.columns:
         df["Coustmer Type"] = df["Coustmer Type"].str.replace(r'[+"-]', '', regex=True).str.strip()
 
+    return df
+
+
+def select_customer_rows(df):
+    """
+    Keep only the customer rows of a renamed PB frame (see rename_pb_columns).
+
+    :param df: DataFrame returned by rename_pb_columns
+    :return: DataFrame without rows missing a 'Coustmer Type'
+    """
+    if df is None:
+        return None
+
     # Remove rows with missing or empty 'Coustmer Type'
     df = df[df['Coustmer Type'].notna() & (df['Coustmer Type'] != '')]
 
@@ -63,3 +97,13 @@ def clean_and_rename_columns(df):
         df['SMT Type'] = df['SMT Type'].fillna('Unknown')
 
     return df
+
+
+def clean_and_rename_columns(df):
+    """
+    Clean and rename columns in the DataFrame and drop rows without a customer.
+
+    :param df: Input DataFrame
+    :return: Cleaned and renamed DataFrame
+    """
+    return select_customer_rows(rename_pb_columns(df))
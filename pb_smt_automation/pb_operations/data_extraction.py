@@ -1,11 +1,13 @@
 import pandas as pd
 import os
 import yaml
+from input_cache import cached_input
 
 def load_yaml_config(config_path):
     with open(config_path, 'r') as file:
         return yaml.safe_load(file)
 
+@cached_input(parser_version=1)
 def extract_data(file_path):
     if not os.path.exists(file_path):
         print(f"File not found: {file_path}")
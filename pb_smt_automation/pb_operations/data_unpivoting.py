@@ -1,7 +1,11 @@
 
 import pandas as pd
-import re
 from datetime import datetime 
+from unpivot_kernel import compile_period_matcher, select_value_columns, unpivot
+
+# Period columns after renaming: MM.YYYY (monthly) or KWXX (weekly)
+PERIOD_COLUMNS = compile_period_matcher(r'^\d{2}\.\d{4}$', r'^KW\d{2}$')
+
 def unpivot_data(df, pb_type):
     """
     Unpivot the DataFrame and add consistent columns.
@@ -11,7 +15,7 @@ def unpivot_data(df, pb_type):
     :return: Unpivoted DataFrame
     """
     # Identify columns that match the 'Period' format (MM.YYYY or WKXX.YYYY)
-    period_columns = [col for col in df.columns if re.match(r'^\d{2}\.\d{4}$', col) or re.match(r'^KW\d{2}$', col)]
+    period_columns = select_value_columns(df, ["Coustmer Type"], PERIOD_COLUMNS)
     
     # Debugging: Print identified Period columns
     print("Identified Period columns:", period_columns)
@@ -20,14 +24,15 @@ def unpivot_data(df, pb_type):
         print("Error: No 'Period' columns found. Verify column renaming logic.")
         return None
 
-    # Melt (unpivot) the DataFrame
-    df_unpivoted = pd.melt(df, id_vars=["Coustmer Type"], value_vars=period_columns,
-                           var_name="Period", value_name="Value")
-
-    # Add metadata columns
-    df_unpivoted['PB Type'] = pb_type
-    df_unpivoted['Attribute'] = 'Production Hours'
-    df_unpivoted['Date'] = pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0))
+    # Melt (unpivot) the DataFrame and add the metadata columns
+    df_unpivoted = unpivot(df, id_vars=["Coustmer Type"], var_name="Period", value_name="Value",
+                           value_vars=period_columns,
+                           constants={
+                               'PB Type': pb_type,
+                               'Attribute': 'Production Hours',
+                               'Date': pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0)),
+                           },
+                           categorical=True)
 
 
     return df_unpivoted
@@ -0,0 +1,32 @@
+from pb_operations.data_extraction import extract_data
+from pb_operations.clean_rename import rename_pb_columns
+from parallel import run_tasks
+
+
+def ingest_pb_file(pb_type, frequency, file_path):
+    """
+    Parse and rename a single PB input file.
+
+    :return: Renamed DataFrame, or None if the file could not be read.
+    """
+    print(f"Ingesting {pb_type} {frequency}: {file_path}")
+    df = extract_data(file_path)
+    if df is None or df.empty:
+        print(f"Error: Data extraction failed for {pb_type} - {frequency}.")
+        return None
+    return rename_pb_columns(df)
+
+
+def ingest_pb_files(pb_input_files, workers=1, executor="thread"):
+    """
+    Parse and rename every PB input file exactly once per run.
+    The combined production hours and the PB master appends are both derived from these frames.
+
+    :param pb_input_files: Mapping {pb_type: {frequency: file_path}} from the config.
+    :param workers: Number of files parsed concurrently (1 = serial).
+    :param executor: "thread" or "process".
+    :return: Dict {(pb_type, frequency): renamed DataFrame, or None if the file could not be read}.
+    """
+    keys = [(pb_type, frequency) for pb_type, frequencies in pb_input_files.items() for frequency in frequencies]
+    tasks = [(ingest_pb_file, (pb_type, frequency, pb_input_files[pb_type][frequency])) for pb_type, frequency in keys]
+    return dict(zip(keys, run_tasks(tasks, workers, executor)))
@@ -1,48 +1,35 @@
 import os
 import pandas as pd
 import logging
-from pb_operations.data_processing import process_pb_file
 from utility_functions import unpivot_combined_data
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def process_pb_files(total_production_hours_weekly, total_production_hours_monthly):
+def process_pb_files(pb_frames, total_production_hours_weekly, total_production_hours_monthly):
     """
-    Process PB files for combined production hours.
-    Extracts the first row for production hours and appends them to the provided lists.
+    Collect the combined production hours from the already ingested PB files.
+    Takes the first row (the PB total) of each frame and appends it to the provided lists.
+
+    :param pb_frames: Dict {(pb_type, frequency): DataFrame} returned by ingest_pb_files.
     """
-    # Define PB types and frequencies
-    pb_types = ["PB1", "PB2", "PB3", "PB4"]
-    frequencies = ["weekly", "monthly"]
-
-    for pb in pb_types:
-        for freq in frequencies:
-            logging.info(f"Processing {pb} {freq} file.")
-
-            # Extract and clean the data
-            df = process_pb_file(pb, freq)
-            if df is None or df.empty:
-                logging.warning(f"No data extracted for {pb} {freq}. Skipping.")
-                continue
-
-            # Extract the first row for production hours
-            production_hours_row = df.iloc[0].copy()
-            production_hours_row["PB Type"] = pb
-
-            # Append to the appropriate list
-            if freq == "weekly":
-                total_production_hours_weekly.append(production_hours_row)
-            elif freq == "monthly":
-                total_production_hours_monthly.append(production_hours_row)
-
-            logging.info(f"Extracted first row for {pb} {freq}.")
-
-            # Log unpivoted data for debugging
-            unpivoted_df = unpivot_combined_data(df)
-            if unpivoted_df is not None:
-                logging.info(f"Unpivoted data for {pb} {freq} is ready for further processing.")
+    for (pb, freq), df in pb_frames.items():
+        if df is None or df.empty:
+            logging.warning(f"No data extracted for {pb} {freq}. Skipping.")
+            continue
+
+        # Extract the first row for production hours
+        production_hours_row = df.iloc[0].copy()
+        production_hours_row["PB Type"] = pb
+
+        # Append to the appropriate list
+        if freq == "weekly":
+            total_production_hours_weekly.append(production_hours_row)
+        elif freq == "monthly":
+            total_production_hours_monthly.append(production_hours_row)
+
+        logging.info(f"Extracted first row for {pb} {freq}.")
 
 
 def save_combined_production_hours(hours_list, output_file_name):
@@ -0,0 +1,112 @@
+import os
+import json
+import hashlib
+import threading
+from input_cache import CACHE_SETTINGS
+
+# Column renaming of the wayconnect exports only depends on the header line.
+# A rename plan (old -> new names, columns to drop) is therefore computed once per
+# distinct header signature and reused; plans are also kept on disk next to the
+# input cache, so runs with an unchanged export layout skip the header analysis.
+PLAN_FILE = "rename_plans.json"
+_PLANS = {}
+_LOADED = {"directory": None}
+PLAN_STATS = {"computed": 0, "reused": 0}
+
+
+def header_signature(layout, version, columns):
+    """
+    Return the signature of a header line for a given layout and planner version.
+    """
+    text = "\x1f".join([layout, str(version)] + [str(col) for col in columns])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _plan_path():
+    return os.path.join(CACHE_SETTINGS["directory"], PLAN_FILE)
+
+
+def _read_plan_file():
+    path = _plan_path()
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _load_plans():
+    # Read the plan file once per process (again if the cache directory changed)
+    if CACHE_SETTINGS["enabled"] and _LOADED["directory"] != CACHE_SETTINGS["directory"]:
+        _PLANS.update(_read_plan_file())
+        _LOADED["directory"] = CACHE_SETTINGS["directory"]
+
+
+def _save_plan(signature, plan):
+    if not CACHE_SETTINGS["enabled"]:
+        return
+    try:
+        os.makedirs(CACHE_SETTINGS["directory"], exist_ok=True)
+        plans = _read_plan_file()
+        plans[signature] = plan
+        path = _plan_path()
+        tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(plans, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not store rename plan {signature[:12]}: {e}")
+
+
+def get_rename_plan(layout, columns, planner, version=1):
+    """
+    Return the rename plan for a header line, computing it only for unseen header signatures.
+
+    :param layout: Name of the export layout (e.g. 'pb', 'smt').
+    :param columns: Header of the DataFrame.
+    :param planner: Function (list of column names) -> plan dict with the keys
+                    'rename' ({old: new}), 'drop' (final names to drop) and 'missing'
+                    (expected columns that were not found).
+    :param version: Bump when the planner changes, so stored plans are ignored.
+    :return: Plan dict.
+    """
+    _load_plans()
+    columns = [str(col) for col in columns]
+    signature = header_signature(layout, version, columns)
+    plan = _PLANS.get(signature)
+    if plan is None:
+        plan = planner(columns)
+        _PLANS[signature] = plan
+        _save_plan(signature, plan)
+        PLAN_STATS["computed"] += 1
+    else:
+        PLAN_STATS["reused"] += 1
+
+    if plan["missing"]:
+        print(f"Unknown {layout} header layout (signature {signature[:12]}): "
+              f"expected {plan['missing']} not found in columns {columns}")
+    return plan
+
+
+def apply_rename_plan(df, plan):
+    """
+    Apply a rename plan: one assignment of the new header, then drop the planned columns.
+    """
+    rename = plan["rename"]
+    df.columns = [rename.get(col, col) for col in df.columns]
+    if plan["drop"]:
+        drop = set(plan["drop"])
+        df = df.loc[:, [col not in drop for col in df.columns]]
+    return df
+
+
+def log_plan_summary():
+    """
+    Print how many rename plans were computed or reused in this run and reset the counters.
+    """
+    print(f"Rename plans: {PLAN_STATS['computed']} computed, {PLAN_STATS['reused']} reused "
+          f"({len(_PLANS)} known header layouts)")
+    for key in PLAN_STATS:
+        PLAN_STATS[key] = 0
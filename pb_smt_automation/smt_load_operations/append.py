@@ -1,18 +1,11 @@
-import os
-import pandas as pd
+from master_store import append_partition
 
 def append_to_master_smt_load_file(df, master_file_path):
     """
-    Append data to the SMT Load master file. If the file doesn't exist, create it.
+    Append data to the SMT Load master store. If the store doesn't exist, create it.
+    In the SMT Load tables 'Date' holds the load period, so the run date
+    ('Todays Date') is used as partition key.
     """
     print("Appending data to master file...")
-    if os.path.exists(master_file_path):
-        master_df = pd.read_excel(master_file_path)
-        print(f"Existing master file loaded with {len(master_df)} rows.")
-        updated_df = pd.concat([master_df, df], ignore_index=True)
-    else:
-        print("Master file does not exist. Creating a new one.")
-        updated_df = df
-
-    updated_df.to_excel(master_file_path, index=False)
+    append_partition(df, master_file_path, date_column='Todays Date')
     print(f"Data successfully saved to {master_file_path}")
@@ -1,8 +1,12 @@
 # modules/processing.py
 
 import pandas as pd
-from datetime import datetime, timedelta
-import re
+from datetime import datetime
+from calendar_dimension import resolve_period
+from unpivot_kernel import compile_period_matcher, unpivot
+
+# Period columns: WKXX.YYYY or MM.YYYY
+PERIOD_COLUMNS = compile_period_matcher(r'^(WK\d{2}\.\d{4}|\d{2}\.\d{4})$')
 
 def add_today_date(df):
     """
@@ -15,26 +19,20 @@ def add_today_date(df):
 def extract_month_from_week(period):
     """
     Extract the month from a given week-year period in the format 'WKXX.YYYY'.
+    The month of the ISO week's Monday is used, as for the 'KWXX' periods in helpers.py.
     """
-    if period.startswith("WK"):
-        week = int(period[2:4])  # Extract the week number
-        year = int(period[5:])  # Extract the year
-        first_day_of_year = datetime(year, 1, 1)
-        days_to_week = timedelta(weeks=week - 1)
-        first_week_date = first_day_of_year + days_to_week
-        return first_week_date.strftime("%m")  # Extract the month as 'MM'
+    info = resolve_period(period)
+    if period.startswith("WK") and info is not None:
+        return f"{info['month']:02d}"  # Extract the month as 'MM'
     return None
 
 def extract_week_from_month(period):
     """
     Extract the week from a given month-year period in the format 'MM.YYYY'.
     """
-    if "." in period:
-        month = int(period[:2])  # Extract the month
-        year = int(period[3:])  # Extract the year
-        first_day_of_month = datetime(year, month, 1)
-        week_number = first_day_of_month.isocalendar()[1]
-        return f"{week_number:02d}"  # Return as 'XX'
+    info = resolve_period(period)
+    if info is not None and info['granularity'] == 'month':
+        return f"{info['week']:02d}"  # Return as 'XX'
     return None
 
 def extract_quarter(period):
@@ -62,8 +60,7 @@ def unpivot_data(df, id_vars):
     """
     Unpivot (melt) the DataFrame from wide to long format and add derived columns.
     """
-    value_vars = [col for col in df.columns if re.match(r'^(WK\d{2}\.\d{4}|\d{2}\.\d{4})$', col)]
-    df_unpivoted = pd.melt(df, id_vars=id_vars, value_vars=value_vars, var_name="Period", value_name="Value")
+    df_unpivoted = unpivot(df, id_vars=id_vars, var_name="Period", value_name="Value", matcher=PERIOD_COLUMNS)
 
     # Add derived columns: Month, Week, Quarter
     df_unpivoted['Month'] = df_unpivoted['Period'].apply(lambda x: extract_month_from_week(x) if x.startswith("WK") else x[:2])
@@ -1,15 +1,18 @@
 import pandas as pd
 from datetime import datetime, timedelta
+from unpivot_kernel import unpivot
 
 def unpivot_smt_load_table(df):
     """
     Unpivot SMT Load data into long format.
     """
     # Unpivot all columns except key columns
-    unpivoted_df = df.melt(
+    unpivoted_df = unpivot(
+        df,
         id_vars=[df.columns[0], 'Netto-Kap. Ressource [%]', 'Durchschnitt', 'Todays Date', 'PB type'],
         var_name='Date', 
-        value_name='Value'
+        value_name='Value',
+        categorical=True
     )
 
     # Convert month names to numbers if present
@@ -1,17 +1,38 @@
 import pandas as pd
 from datetime import datetime
+from input_cache import cached_input
 
-def extract_smt_load_data(file_path):
+# Zero-based positions of the unused columns of the SMT Load table export
+UNUSED_COLUMNS = [0, 1, 4, 5, 6, 7, 8, 9]
+
+def drop_unused_columns(df):
     """
-    Extract data from the SMT Load table file.
+    Drop the unused columns of the SMT Load table by position.
+    """
+    df.drop(df.columns[UNUSED_COLUMNS], axis=1, inplace=True)
+    return df
+
+@cached_input(parser_version=1)
+def read_smt_load_csv(file_path):
+    """
+    Read the SMT Load table file and drop the unused columns.
     """
     # Read CSV file with delimiter ';' and header at row 1
     df = pd.read_csv(file_path, delimiter=';', header=1)
     
     # Correctly remove unwanted columns by zero-based index
-    df.drop(df.columns[[0, 1, 4, 5, 6, 7, 8, 9]], axis=1, inplace=True)
-    
-    # Add a column with today's date
+    return drop_unused_columns(df)
+
+def add_todays_date(df):
+    """
+    Add a column with today's date (not cached, it changes with every run).
+    """
     df['Todays Date'] = pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0))
-    
     return df
+
+def extract_smt_load_data(file_path):
+    """
+    Extract data from the SMT Load table file.
+    """
+    df = read_smt_load_csv(file_path)
+    return add_todays_date(df)
@@ -1,27 +1,14 @@
-import os
-import pandas as pd
+from master_store import append_partition
 
 def append_to_master_smt_file(df, master_file_path):
     """
-    Append SMT DataFrame to the master file.
+    Append SMT DataFrame to the partitioned store of the master file.
 
     :param df: DataFrame to append.
     :param master_file_path: Path to the master SMT Excel file.
     """
     try:
-        if os.path.exists(master_file_path):
-            # Load existing data
-            existing_data = pd.read_excel(master_file_path, engine='openpyxl')
-            print(f"Existing master file loaded: {master_file_path}")
-        else:
-            # Create an empty DataFrame if file does not exist
-            existing_data = pd.DataFrame()
-
-        # Combine old and new data
-        combined_data = pd.concat([existing_data, df], ignore_index=True)
-
-        # Save updated data back to the master file
-        combined_data.to_excel(master_file_path, index=False, engine='openpyxl')
+        append_partition(df, master_file_path, date_column='Date')
         print(f"Data successfully appended to {master_file_path}")
 
     except PermissionError:
@@ -1,5 +1,42 @@
 import pandas as pd
 import re
+from rename_planner import get_rename_plan, apply_rename_plan
+
+# Header patterns of the SMT labor exports
+MONTH_COLUMN = re.compile(r'Ecktermin 🔑:(\d{2})\.(\d{4}),Rest-Belastung Gesamt Personal')
+WEEK_COLUMN = re.compile(r'Ecktermin 🔑:W(\d{2}) \d{4},Rest-Belastung Gesamt Personal')
+UNNAMED_COLUMN = re.compile(r'^Unnamed')
+SMT_PLAN_VERSION = 1
+
+def plan_smt_columns(columns):
+    """
+    Compute the rename plan for an SMT export header (see rename_planner.get_rename_plan).
+    - Renames 'Arbeitsplatznummer' to 'SMT Type'.
+    - Renames month-year columns to 'MM.YYYY' and week-year columns to 'KWXX'.
+    - Drops unnamed columns.
+
+    :param columns: List of column names.
+    :return: Plan dict with 'rename', 'drop' and 'missing'.
+    """
+    names = ['SMT Type' if name == 'Arbeitsplatznummer' else name for name in columns]
+    missing = [] if 'Arbeitsplatznummer' in columns else ['Arbeitsplatznummer']
+
+    period_count = 0
+    for i, name in enumerate(names):
+        if MONTH_COLUMN.search(name):
+            names[i] = MONTH_COLUMN.sub(r'\1.\2', name)
+            period_count += 1
+        elif WEEK_COLUMN.search(name):
+            names[i] = WEEK_COLUMN.sub(r'KW\1', name)
+            period_count += 1
+    if not period_count:
+        missing.append('Ecktermin period columns')
+
+    return {
+        "rename": {old: new for old, new in zip(columns, names) if old != new},
+        "drop": [name for name in names if UNNAMED_COLUMN.search(name)],
+        "missing": missing,
+    }
 
 def clean_and_rename_smt_columns(df):
     """
@@ -8,13 +45,15 @@ def clean_and_rename_smt_columns(df):
     :param df: Input DataFrame.
     :return: Cleaned and renamed DataFrame.
     """
-    # Rename 'Arbeitsplatznummer' to 'SMT Type'
-    if 'Arbeitsplatznummer' in df.columns:
-        df.rename(columns={'Arbeitsplatznummer': 'SMT Type'}, inplace=True)
-    else:
+    if 'Arbeitsplatznummer' not in df.columns:
         print("Column 'Arbeitsplatznummer' not found. Please verify CSV file headers.")
         return None
 
+    # Rename 'Arbeitsplatznummer' to 'SMT Type', the period columns to 'MM.YYYY'/'KWXX'
+    # and drop unnamed columns in one step, planned once per header layout
+    plan = get_rename_plan("smt", df.columns, plan_smt_columns, version=SMT_PLAN_VERSION)
+    df = apply_rename_plan(df, plan)
+
     # Clean the 'SMT Type' column
     if "SMT Type" in df.columns:
         df["SMT Type"] = (
@@ -29,20 +68,5 @@ def clean_and_rename_smt_columns(df):
     # Remove rows with missing or empty values in "SMT Type"
     df = df[df['SMT Type'].notna() & (df['SMT Type'].str.strip() != '')]
 
-    # Identify and rename month-year columns to 'MM.YYYY' format
-    month_year_columns = [col for col in df.columns if re.search(r'Ecktermin 🔑:\d{2}\.\d{4},Rest-Belastung Gesamt Personal', col)]
-    for col in month_year_columns:
-        new_col_name = re.sub(r'Ecktermin 🔑:(\d{2})\.(\d{4}),Rest-Belastung Gesamt Personal', r'\1.\2', col)
-        df.rename(columns={col: new_col_name}, inplace=True)
-
-    # Identify and rename week-year columns to 'KWXX' format
-    week_year_columns = [col for col in df.columns if re.search(r'Ecktermin 🔑:W\d{2} \d{4},Rest-Belastung Gesamt Personal', col)]
-    for col in week_year_columns:
-        new_col_name = re.sub(r'Ecktermin 🔑:W(\d{2}) \d{4},Rest-Belastung Gesamt Personal', r'KW\1', col)
-        df.rename(columns={col: new_col_name}, inplace=True)
-
-    # Drop unnamed columns (if any exist)
-    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-
     print("Columns after cleaning and renaming:", df.columns.tolist())
     return df
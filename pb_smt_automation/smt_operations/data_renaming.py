@@ -1,38 +1,50 @@
 # modules/renaming.py
 
 import re
+from rename_planner import get_rename_plan, apply_rename_plan
 
-def rename_time_columns(df):
+# Header patterns of the wayconnect exports
+WEEK_COLUMN = re.compile(r'Ecktermin 🔑:W(\d{2}) (\d{4}),Rest-Belastung Gesamt Personal')
+MONTH_COLUMN = re.compile(r'Ecktermin 🔑:(\d{2})\.(\d{4}),Rest-Belastung Gesamt Personal')
+CUSTOMER_COLUMN = re.compile(r'Info1.*Mat\.Dat\.')
+
+def plan_time_columns(columns):
     """
-    Rename week-year and month-year columns to standardized formats.
+    Rename plan for week-year (WKXX.YYYY) and month-year (MM.YYYY) columns.
     """
-    # Rename week-year columns to standardized format (WKXX.YYYY)
-    week_year_columns = [col for col in df.columns if re.search(r'Ecktermin 🔑:W\d{2} \d{4},Rest-Belastung Gesamt Personal', col)]
-    for col in week_year_columns:
-        new_col_name = re.sub(r'Ecktermin 🔑:W(\d{2}) (\d{4}),Rest-Belastung Gesamt Personal', r'WK\1.\2', col)
-        df.rename(columns={col: new_col_name}, inplace=True)
+    rename = {}
+    for col in columns:
+        if WEEK_COLUMN.search(col):
+            rename[col] = WEEK_COLUMN.sub(r'WK\1.\2', col)
+        elif MONTH_COLUMN.search(col):
+            rename[col] = MONTH_COLUMN.sub(r'\1.\2', col)
+    return {"rename": rename, "drop": [], "missing": [] if rename else ['Ecktermin period columns']}
 
-    # Rename month-year columns to standardized format (MM.YYYY)
-    month_year_columns = [col for col in df.columns if re.search(r'Ecktermin 🔑:\d{2}\.\d{4},Rest-Belastung Gesamt Personal', col)]
-    for col in month_year_columns:
-        new_col_name = re.sub(r'Ecktermin 🔑:(\d{2})\.(\d{4}),Rest-Belastung Gesamt Personal', r'\1.\2', col)
-        df.rename(columns={col: new_col_name}, inplace=True)
+def plan_additional_columns(columns):
+    """
+    Rename plan for 'Info1 (Mat.Dat.)' -> 'Coustmer Type' and 'Arbeitsplatznummer' -> 'SMT Type'.
+    """
+    rename = {}
+    customer_columns = [col for col in columns if CUSTOMER_COLUMN.search(col)]
+    if customer_columns:
+        rename[customer_columns[0]] = 'Coustmer Type'
+    if 'Arbeitsplatznummer' in columns:
+        rename['Arbeitsplatznummer'] = 'SMT Type'
+    return {"rename": rename, "drop": [], "missing": [] if customer_columns else ['Info1 (Mat.Dat.)']}
 
-    return df
+def rename_time_columns(df):
+    """
+    Rename week-year and month-year columns to standardized formats.
+    """
+    # WKXX.YYYY for week-year and MM.YYYY for month-year columns, in one rename
+    plan = get_rename_plan("export_time", df.columns, plan_time_columns)
+    return apply_rename_plan(df, plan)
 
 def rename_additional_columns(df):
     """
     Rename additional columns: 'Info1 (Mat.Dat.)' to 'Coustmer Type' and 'Arbeitsplatznummer' to 'SMT Type'.
     """
-    # Rename 'Info1 (Mat.Dat.)' to 'Coustmer Type'
-    potential_columns = [col for col in df.columns if re.search(r'Info1.*Mat\.Dat\.', col)]
-    if potential_columns:
-        df.rename(columns={potential_columns[0]: 'Coustmer Type'}, inplace=True)
-    else:
+    plan = get_rename_plan("export_additional", df.columns, plan_additional_columns)
+    if plan["missing"]:
         print("Warning: Column 'Info1 (Mat.Dat.)' or similar not found. Please verify CSV file headers.")
-
-    # Rename 'Arbeitsplatznummer' to 'SMT Type'
-    if 'Arbeitsplatznummer' in df.columns:
-        df.rename(columns={'Arbeitsplatznummer': 'SMT Type'}, inplace=True)
-
-    return df
+    return apply_rename_plan(df, plan)
@@ -1,5 +1,12 @@
 import pandas as pd
 from datetime import datetime 
+from unpivot_kernel import select_value_columns, unpivot
+
+# Period columns per frequency: MM.YYYY (monthly) or KWXX (weekly)
+PERIOD_MATCHERS = {
+    'monthly': lambda col: '.' in col,
+    'weekly': lambda col: col.startswith('KW'),
+}
 
 def unpivot_smt_data(df, frequency):
     """
@@ -10,17 +17,20 @@ def unpivot_smt_data(df, frequency):
     :return: Unpivoted DataFrame.
     """
     # Determine the columns to unpivot based on frequency
-    value_vars = [col for col in df.columns if (frequency == 'monthly' and '.' in col) or (frequency == 'weekly' and col.startswith('KW'))]
+    matcher = PERIOD_MATCHERS.get(frequency)
+    value_vars = select_value_columns(df, ["SMT Type"], matcher) if matcher else []
     if not value_vars:
         print(f"No value columns found to unpivot for {frequency}. Verify input data.")
         return None
 
-    # Melt the DataFrame
-    df_unpivoted = pd.melt(df, id_vars=["SMT Type"], value_vars=value_vars, var_name="Period", value_name="Value")
-
-    # Add Frequency column
-    df_unpivoted['Frequency'] = frequency
-    df_unpivoted['Date'] = pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0))
+    # Melt the DataFrame and add the Frequency and Date columns
+    df_unpivoted = unpivot(df, id_vars=["SMT Type"], var_name="Period", value_name="Value",
+                           value_vars=value_vars,
+                           constants={
+                               'Frequency': frequency,
+                               'Date': pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0)),
+                           },
+                           categorical=True)
 
 
     print("Unpivoted DataFrame sample:")
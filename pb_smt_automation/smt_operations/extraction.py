@@ -1,7 +1,9 @@
 import pandas as pd
 import os
+from input_cache import cached_input
 
 
+@cached_input(parser_version=1)
 def extract_smt_data(file_path):
     """
     Extract data from SMT input files.
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+
+# Optional SQLite backend of the master stores (storage: backend: "sqlite").
+# Every master gets one database next to its .xlsx (e.g. pb_master_monthly.sqlite)
+# with a single table and composite indexes on the lookup columns. A run's rows
+# are written with one executemany() in one transaction.
+DB_SUFFIX = ".sqlite"
+TABLE = "master"
+META_TABLE = "master_meta"
+INDEX_COLUMNS = ['PB Type', 'Period', 'Attribute', 'Date']
+PARTITION_PREFIX = "Date="
+UNKNOWN_PARTITION = "unknown"
+# Timestamps are stored as sortable text, so a day is a range query on the index
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+TIMESTAMP_PATTERN = r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
+
+sqlite3.register_adapter(pd.Timestamp, lambda value: value.strftime(TIMESTAMP_FORMAT))
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.float64, float)
+sqlite3.register_adapter(np.bool_, bool)
+
+
+def get_db_path(master_file_path):
+    """
+    Return the SQLite database that belongs to a master file.
+
+    :param master_file_path: Path to the master Excel file (e.g. pb_master_monthly.xlsx).
+    :return: Path to the database (e.g. pb_master_monthly.sqlite).
+    """
+    root, _ = os.path.splitext(master_file_path)
+    return root + DB_SUFFIX
+
+
+def db_exists(master_file_path):
+    """
+    Return True if the master has a SQLite database.
+    """
+    return os.path.exists(get_db_path(master_file_path))
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _connect(master_file_path):
+    conn = sqlite3.connect(get_db_path(master_file_path))
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def _table_columns(conn):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({TABLE})")]
+
+
+def _get_meta(conn, key):
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (META_TABLE,)).fetchone():
+        return None
+    row = conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _date_column(conn):
+    return _get_meta(conn, "date_column") or 'Date'
+
+
+def _prepare_table(conn, columns, date_column):
+    """
+    Create the table and its indexes on first use and add columns that appear in later runs.
+    Columns are declared without a type, so every value keeps the type it was written with.
+    """
+    existing = _table_columns(conn)
+    if not existing:
+        conn.execute(f"CREATE TABLE {TABLE} ({', '.join(_quote(col) for col in columns)})")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+        conn.execute(f"INSERT OR REPLACE INTO {META_TABLE} VALUES ('date_column', ?)", (date_column,))
+    else:
+        for col in columns:
+            if col not in existing:
+                conn.execute(f"ALTER TABLE {TABLE} ADD COLUMN {_quote(col)}")
+    columns = _table_columns(conn)
+
+    lookup_columns = [col for col in INDEX_COLUMNS if col in columns]
+    if lookup_columns:
+        name = "idx_" + "_".join(col.replace(' ', '_').lower() for col in lookup_columns)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {TABLE} ({', '.join(map(_quote, lookup_columns))})")
+    if date_column in columns:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_day ON {TABLE} ({_quote(date_column)})")
+
+
+def _records(df):
+    """
+    Convert a DataFrame to rows of plain Python values (missing values become NULL).
+    """
+    data = df.astype(object)
+    return list(data.where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _insert(conn, df):
+    columns = ", ".join(_quote(col) for col in df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    conn.executemany(f"INSERT INTO {TABLE} ({columns}) VALUES ({placeholders})", _records(df))
+
+
+def _plain_columns(df):
+    """
+    Use string column names and plain dtypes for categoricals from the unpivot steps.
+    """
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(df[col].cat.categories.dtype)
+    df.columns = [str(col) for col in df.columns]
+    return df
+
+
+def _day_clause(partition, date_column):
+    """
+    Return the WHERE clause and parameters selecting one day ('Date=YYYY-MM-DD' or a date).
+    """
+    if isinstance(partition, str) and partition.startswith(PARTITION_PREFIX):
+        partition = partition[len(PARTITION_PREFIX):]
+    day = pd.to_datetime(partition, errors='coerce')
+    if pd.isna(day):
+        return f"{_quote(date_column)} IS NULL", ()
+    day = day.normalize()
+    return (f"{_quote(date_column)} >= ? AND {_quote(date_column)} < ?",
+            (day.strftime('%Y-%m-%d'), (day + timedelta(days=1)).strftime('%Y-%m-%d')))
+
+
+def _restore_timestamps(df):
+    """
+    Turn the stored timestamp text back into datetime columns.
+    """
+    for col in df.columns:
+        if not (pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])):
+            continue
+        values = df[col].dropna()
+        if len(values) and values.map(type).eq(str).all() and values.str.fullmatch(TIMESTAMP_PATTERN).all():
+            df[col] = pd.to_datetime(df[col], format=TIMESTAMP_FORMAT)
+    return df
+
+
+def read_rows(master_file_path, where="", params=()):
+    """
+    Read rows of a master database in insertion order.
+
+    :param master_file_path: Path to the master Excel file.
+    :param where: Optional SQL condition (use ? placeholders).
+    :param params: Parameters of the condition.
+    :return: DataFrame; empty if the database does not exist.
+    """
+    if not db_exists(master_file_path):
+        return pd.DataFrame()
+    conn = _connect(master_file_path)
+    try:
+        if not _table_columns(conn):
+            return pd.DataFrame()
+        query = f"SELECT * FROM {TABLE}" + (f" WHERE {where}" if where else "") + " ORDER BY rowid"
+        df = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+    return _restore_timestamps(df)
+
+
+def read_master(master_file_path):
+    """
+    Read the full history of a master database.
+    """
+    return read_rows(master_file_path)
+
+
+def append_rows(df, master_file_path, date_column='Date'):
+    """
+    Append rows to a master database in one transaction.
+
+    :return: Number of rows written.
+    """
+    df = _plain_columns(df)
+    conn = _connect(master_file_path)
+    try:
+        with conn:
+            _prepare_table(conn, list(df.columns), date_column)
+            _insert(conn, df)
+    finally:
+        conn.close()
+    return len(df)
+
+
+def list_days(master_file_path):
+    """
+    List the days held by a master database as partition names ('Date=2025-03-04'), oldest first.
+    """
+    if not db_exists(master_file_path):
+        return []
+    conn = _connect(master_file_path)
+    try:
+        date_column = _date_column(conn)
+        if date_column not in _table_columns(conn):
+            return [PARTITION_PREFIX + UNKNOWN_PARTITION]
+        rows = conn.execute(f"SELECT DISTINCT substr({_quote(date_column)}, 1, 10) FROM {TABLE}").fetchall()
+    finally:
+        conn.close()
+    days = sorted(PARTITION_PREFIX + day for (day,) in rows if day is not None)
+    if any(day is None for (day,) in rows):
+        days.append(PARTITION_PREFIX + UNKNOWN_PARTITION)
+    return days
+
+
+def count_day_rows(master_file_path, partition):
+    """
+    Count the rows of one day.
+    """
+    conn = _connect(master_file_path)
+    try:
+        where, params = _day_clause(partition, _date_column(conn))
+        return conn.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE {where}", params).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def delete_days_before(master_file_path, cutoff_day):
+    """
+    Delete all rows dated before cutoff_day; rows without a date are kept.
+
+    :return: Number of rows deleted.
+    """
+    if not db_exists(master_file_path):
+        return 0
+    conn = _connect(master_file_path)
+    try:
+        with conn:
+            date_column = _date_column(conn)
+            if date_column not in _table_columns(conn):
+                return 0
+            cursor = conn.execute(f"DELETE FROM {TABLE} WHERE {_quote(date_column)} < ?",
+                                  (pd.Timestamp(cutoff_day).strftime('%Y-%m-%d'),))
+            return cursor.rowcount
+    finally:
+        conn.close()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# The modules of pb_smt_automation are imported by their file names (as in main.py)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import master_store  # noqa: E402
+
+
+@pytest.fixture(params=master_store.BACKENDS)
+def backend(request):
+    master_store.configure_storage({"storage": {"backend": request.param}})
+    yield request.param
+    master_store.configure_storage({"storage": {"backend": "parquet"}})
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+import pytest
+
+import input_cache
+import main
+import master_store
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Small exports of every input file (PB1-PB4, SMT labor and SMT load tables)
+INPUT_FOLDER = os.path.join(ROOT, "New folder")
+
+
+def load_test_config(ingestion):
+    """
+    Load config.yaml with the input files taken from INPUT_FOLDER.
+    """
+    config = main.load_config(os.path.join(ROOT, "config", "config.yaml"))
+    data_extraction = config['data_extraction']
+    for files in [*data_extraction['pb_input_files'].values(),
+                  data_extraction['smt_input_files'], data_extraction['smt_load_files']]:
+        for name, path in files.items():
+            files[name] = os.path.join(INPUT_FOLDER, os.path.basename(path))
+    config['processing'] = {'workers': 1}
+    config['ingestion'] = ingestion
+    return config
+
+
+def read_outputs(output_dir):
+    """
+    Read every master and production hours file of a run, sorted so row order does not matter.
+    """
+    outputs = {}
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith(master_store.STORE_SUFFIX):
+            df = master_store.read_master(os.path.join(output_dir, name[:-len(master_store.STORE_SUFFIX)] + ".xlsx"))
+        elif name.endswith(".xlsx") and name not in main.MASTER_FILES:
+            df = pd.read_excel(os.path.join(output_dir, name))
+        else:
+            continue
+        df = df.astype({col: object for col in df.columns if not pd.api.types.is_numeric_dtype(df[col])
+                        and not pd.api.types.is_datetime64_any_dtype(df[col])})
+        outputs[name] = df.sort_values(list(df.columns)).reset_index(drop=True)
+    return outputs
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_chunked_ingestion_matches_full_ingestion(tmp_path, monkeypatch, engine):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setitem(input_cache.CACHE_SETTINGS, 'enabled', False)
+    full_dir, chunked_dir = str(tmp_path / "full"), str(tmp_path / "chunked")
+    os.makedirs(full_dir)
+    os.makedirs(chunked_dir)
+
+    main.process_files(load_test_config({'mode': 'full'}), full_dir)
+    # Chunks of 3 rows split every input file into several chunks
+    main.process_files(load_test_config({'mode': 'chunked', 'engine': engine, 'chunk_rows': 3,
+                                         'block_size_mb': 0.0005}), chunked_dir)
+
+    full, chunked = read_outputs(full_dir), read_outputs(chunked_dir)
+    assert sorted(full) == sorted(chunked)
+    assert len(full) == 10
+    for name in full:
+        pd.testing.assert_frame_equal(full[name], chunked[name], check_dtype=False, obj=name)
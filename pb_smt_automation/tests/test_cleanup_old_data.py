@@ -0,0 +1,100 @@
+import os
+import shutil
+
+import pandas as pd
+from datetime import timedelta
+
+import cleanup_old_data
+import master_store
+import sqlite_store
+
+
+def dated_rows(dates):
+    return pd.DataFrame({
+        'PB Type': [f"PB{i}" for i in range(len(dates))],
+        'Value': range(len(dates)),
+        'Date': pd.to_datetime(dates),
+    })
+
+
+def around_cutoff():
+    # The last minute before the cutoff day is expired, the first minutes of the cutoff day are kept
+    cutoff_day = cleanup_old_data.get_cutoff_day(8)
+    return [cutoff_day - timedelta(days=40), cutoff_day - timedelta(minutes=1),
+            cutoff_day + timedelta(minutes=30), cutoff_day + timedelta(days=3, hours=10)]
+
+
+def test_expired_days_are_dropped(tmp_path, backend):
+    master_path = str(tmp_path / "pb_master_monthly.xlsx")
+    master_store.append_partition(dated_rows(around_cutoff()), master_path)
+
+    results = cleanup_old_data.delete_old_data_from_output_files(str(tmp_path), months_to_keep=8)
+
+    assert [(result['kind'], result['rows_dropped']) for result in results] == [
+        ("sqlite" if backend == "sqlite" else "store", 2)]
+    assert master_store.read_master(master_path)['PB Type'].tolist() == ['PB2', 'PB3']
+    if backend == "parquet":
+        cutoff_day = cleanup_old_data.get_cutoff_day(8)
+        assert all(master_store.partition_date(partition) >= cutoff_day
+                   for partition in master_store.list_partitions(master_path))
+
+
+def test_database_days(tmp_path):
+    master_path = str(tmp_path / "pb_master_monthly.xlsx")
+    sqlite_store.append_rows(dated_rows(['2025-03-04 10:00', '2025-03-05 00:30', '2025-03-05 23:59']), master_path)
+    sqlite_store.append_rows(dated_rows([None]), master_path)
+
+    assert sqlite_store.list_days(master_path) == ['Date=2025-03-04', 'Date=2025-03-05', 'Date=unknown']
+    assert sqlite_store.count_day_rows(master_path, 'Date=2025-03-05') == 2
+    assert sqlite_store.delete_days_before(master_path, pd.Timestamp('2025-03-05')) == 1
+    # Rows without a date are kept
+    assert sqlite_store.list_days(master_path) == ['Date=2025-03-05', 'Date=unknown']
+    assert len(sqlite_store.read_master(master_path)) == 3
+
+
+def test_workbook_with_timestamps(tmp_path):
+    file_path = str(tmp_path / "combined_weekly_production_hours.xlsx")
+    # Timestamps do not match date_format and are parsed flexibly
+    dates = [day.strftime('%Y-%m-%d %H:%M:%S') for day in around_cutoff()]
+    dated_rows(dates).astype({'Date': str}).to_excel(file_path, index=False)
+
+    assert cleanup_old_data.delete_old_data(file_path) == 2
+    df = pd.read_excel(file_path)
+    assert df['PB Type'].tolist() == ['PB2', 'PB3']
+    assert pd.api.types.is_datetime64_any_dtype(df['Date'])
+
+
+def test_workbook_without_expired_rows_is_skipped(tmp_path, monkeypatch):
+    file_path = str(tmp_path / "combined_weekly_production_hours.xlsx")
+    dated_rows(around_cutoff()[2:]).to_excel(file_path, index=False)
+    assert cleanup_old_data.delete_old_data(file_path) == 0
+    assert os.path.exists(file_path + cleanup_old_data.DATE_RANGE_SUFFIX)
+    mtime_ns = os.stat(file_path).st_mtime_ns
+
+    opened = []
+    monkeypatch.setattr(cleanup_old_data.pd, "read_excel", lambda *args, **kwargs: opened.append(args))
+    assert cleanup_old_data.delete_old_data(file_path) is None
+    assert opened == []
+    assert os.stat(file_path).st_mtime_ns == mtime_ns
+
+
+def test_process_pool_sweep_matches_serial_sweep(tmp_path):
+    output_folder = tmp_path / "serial"
+    (output_folder / "pb").mkdir(parents=True)
+    master_store.append_partition(dated_rows(around_cutoff()), str(output_folder / "pb" / "pb_master_monthly.xlsx"))
+    for name in ("a", "b", "c"):
+        dated_rows(around_cutoff()).to_excel(output_folder / "pb" / f"{name}_weekly.xlsx", index=False)
+    shutil.copytree(output_folder, tmp_path / "process")
+
+    serial = cleanup_old_data.delete_old_data_from_output_files(str(output_folder), workers=1)
+    pooled = cleanup_old_data.delete_old_data_from_output_files(str(tmp_path / "process"), workers=2,
+                                                                executor="process")
+
+    assert [(os.path.relpath(result['file'], tmp_path / "serial"), result['kind'], result['rows_dropped'])
+            for result in serial] == [
+        (os.path.relpath(result['file'], tmp_path / "process"), result['kind'], result['rows_dropped'])
+        for result in pooled]
+    assert [result['rows_dropped'] for result in pooled] == [2, 2, 2, 2]
+    for name in ("a", "b", "c"):
+        pd.testing.assert_frame_equal(pd.read_excel(tmp_path / "serial" / "pb" / f"{name}_weekly.xlsx"),
+                                      pd.read_excel(tmp_path / "process" / "pb" / f"{name}_weekly.xlsx"))
@@ -0,0 +1,62 @@
+import pandas as pd
+from openpyxl import load_workbook
+
+import master_store
+
+
+def smt_rows(day):
+    # 'Value' mixes numbers with a few text cells, as in the SMT monthly master
+    return pd.DataFrame({
+        'SMT Type': ['SMT4', 'SMT6', 'SMT7', 'SMT9'],
+        'Period': ['01.2025', '02.2025', '03.2025', '04.2025'],
+        'Value': pd.Series([133, 4.5, '0100 | SMT4', None], dtype=object),
+        'Quarter': pd.Series([1, 1.0, 1, 2], dtype=object),
+        'Date': pd.Timestamp(day),
+    })
+
+
+def test_mixed_value_column_round_trip(tmp_path, backend):
+    master_path = str(tmp_path / "smt_master_monthly.xlsx")
+    master_store.append_partition(smt_rows('2025-03-04 10:00'), master_path)
+    master_store.append_partition(smt_rows('2025-03-05 10:00'), master_path)
+
+    df = master_store.read_master(master_path)
+    assert len(df) == 8
+    assert df['Value'].tolist()[:3] == [133, 4.5, '0100 | SMT4']
+    assert pd.isna(df['Value'].iloc[3])
+    assert pd.api.types.is_numeric_dtype(df['Quarter'])
+
+    master_store.export_to_excel(master_path)
+    sheet = load_workbook(master_path).active
+    header = [cell.value for cell in sheet[1]]
+    values = [row[header.index('Value')] for row in sheet.iter_rows(min_row=2)]
+    assert [cell.value for cell in values[:3]] == [133, 4.5, '0100 | SMT4']
+    assert [cell.data_type for cell in values[:3]] == ['n', 'n', 's']
+
+
+def test_numeric_text_stays_text(tmp_path):
+    master_path = str(tmp_path / "pb_master_monthly.xlsx")
+    df = pd.DataFrame({'Value': pd.Series([7, '0100', '12'], dtype=object), 'Date': pd.Timestamp('2025-03-04')})
+    master_store.append_partition(df, master_path)
+
+    # Texts that look like numbers stay texts
+    assert master_store.read_master(master_path)['Value'].tolist() == [7, '0100', '12']
+
+
+def test_failed_master_does_not_stop_the_flush(tmp_path):
+    write_buffer = {}
+    written = {}
+
+    def append(df, master_file_path):
+        if "smt" in master_file_path:
+            raise PermissionError("the workbook is open")
+        written[master_file_path] = len(df)
+
+    for name in ("pb_master_monthly.xlsx", "smt_master_monthly.xlsx", "pb_master_weekly.xlsx"):
+        master_store.buffer_append(write_buffer, smt_rows('2025-03-04 10:00'), str(tmp_path / name), append)
+
+    failed = master_store.flush_write_buffer(write_buffer)
+
+    assert failed == [str(tmp_path / "smt_master_monthly.xlsx")]
+    assert written == {str(tmp_path / "pb_master_monthly.xlsx"): 4, str(tmp_path / "pb_master_weekly.xlsx"): 4}
+    assert write_buffer == {}
@@ -1,10 +1,13 @@
 import pandas as pd
-import re
 import logging
 from datetime import datetime 
+from unpivot_kernel import compile_period_matcher, select_value_columns, unpivot
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Period columns after renaming: MM.YYYY (monthly) or KWXX (weekly)
+PERIOD_COLUMNS = compile_period_matcher(r'^\d{2}\.\d{4}$', r'^KW\d{2}$')
+
 def unpivot_combined_data(combined_df):
     """
     Unpivot the combined DataFrame for production hours.
@@ -23,27 +26,24 @@ def unpivot_combined_data(combined_df):
     try:
         # Identify id_vars and value_vars
         id_vars = ['PB Type'] if 'PB Type' in combined_df.columns else []
-        value_vars = [
-            col for col in combined_df.columns
-            if re.match(r'^\d{2}\.\d{4}$', col) or re.match(r'^KW\d{2}$', col)
-        ]
+        value_vars = select_value_columns(combined_df, id_vars, PERIOD_COLUMNS)
 
         # Log identified columns for debugging
         logging.info(f"id_vars: {id_vars}, value_vars: {value_vars}")
 
-        # Perform unpivoting (melt operation)
-        combined_unpivoted = pd.melt(
+        # Perform unpivoting (melt operation) and add additional metadata
+        combined_unpivoted = unpivot(
             combined_df,
             id_vars=id_vars,
-            value_vars=value_vars,
             var_name="Period",
-            value_name="Value"
+            value_name="Value",
+            value_vars=value_vars,
+            constants={
+                'Attribute': 'Production Hours',
+                'Date': pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0)),
+            }
         )
 
-        # Add additional metadata
-        combined_unpivoted['Attribute'] = 'Production Hours'
-        combined_unpivoted['Date'] = pd.to_datetime(datetime.now().replace(minute=0,second=0, microsecond=0))
-
         logging.info(f"Unpivoted combined DataFrame shape: {combined_unpivoted.shape}")
         return combined_unpivoted
 
@@ -0,0 +1,253 @@
+import math
+import numbers
+import re
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Precomputed ISO calendar shared by pb_smt_automation, kapa_automation and
+# production_backlog_automation. Every Docker image only sees its own folder,
+# so the three copies of this file are kept identical.
+#
+# The tables are built once per process for a year range; period labels are then
+# resolved with dictionary lookups instead of strptime/to_datetime per value.
+#
+# Integer period keys:
+#   week  -> ISO year * 100 + ISO week (e.g. 202507 for KW07 2025)
+#   month -> year * 100 + month        (e.g. 202503 for 03.2025)
+# Week rows carry the month_key of their Monday and month rows the week_key of their
+# first day, so weekly and monthly data can be joined on integers.
+CALENDAR_SETTINGS = {
+    "first_year": date.today().year - 5,
+    "last_year": date.today().year + 5,
+}
+_CALENDAR = {}
+_LABEL_CACHE = {}
+
+WEEK_LABEL = re.compile(r'^(?:KW|WK)\.?(\d{1,2})(?:[. ](\d{4}))?$', re.IGNORECASE)
+MONTH_LABEL = re.compile(r'^(\d{2})\.(\d{4})$')
+# Month periods reach the masters as '03.2025' (Berechnungsbasis), '3.2025', or as the
+# number 3.2025 Excel makes of such a label. period_label gives all of them one label.
+LOOSE_MONTH_LABEL = re.compile(r'^(\d{1,2})\.(\d{4})$')
+
+
+def configure_calendar(config):
+    """
+    Apply the 'calendar' section of the YAML config (first_year, last_year).
+    """
+    settings = (config or {}).get("calendar", {})
+    CALENDAR_SETTINGS["first_year"] = int(settings.get("first_year", CALENDAR_SETTINGS["first_year"]))
+    CALENDAR_SETTINGS["last_year"] = int(settings.get("last_year", CALENDAR_SETTINGS["last_year"]))
+    _CALENDAR.clear()
+    _LABEL_CACHE.clear()
+
+
+def build_calendar(first_year, last_year):
+    """
+    Precompute the week, month and day tables for first_year..last_year (inclusive).
+
+    :return: Dict with the DataFrames 'weeks', 'months', 'days' (indexed by period key / day)
+             and the lookup dicts 'week_index' and 'month_index'.
+    """
+    weeks = []
+    for iso_year in range(first_year, last_year + 1):
+        week_count = date(iso_year, 12, 28).isocalendar()[1]
+        for week in range(1, week_count + 1):
+            monday = date.fromisocalendar(iso_year, week, 1)
+            weeks.append({
+                "period_key": iso_year * 100 + week,
+                "label": f"KW{week:02d}",
+                "iso_year": iso_year,
+                "week": week,
+                "month": monday.month,
+                "quarter": (monday.month - 1) // 3 + 1,
+                "first_day": monday,
+                "last_day": monday + timedelta(days=6),
+                "month_key": monday.year * 100 + monday.month,
+            })
+
+    months = []
+    for year in range(first_year, last_year + 1):
+        for month in range(1, 13):
+            first_day = date(year, month, 1)
+            next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+            iso_year, week, _ = first_day.isocalendar()
+            months.append({
+                "period_key": year * 100 + month,
+                "label": f"{month:02d}.{year}",
+                "iso_year": iso_year,
+                "week": week,
+                "month": month,
+                "quarter": (month - 1) // 3 + 1,
+                "first_day": first_day,
+                "last_day": next_month - timedelta(days=1),
+                "week_key": iso_year * 100 + week,
+            })
+
+    weeks_df = pd.DataFrame(weeks).set_index("period_key")
+    months_df = pd.DataFrame(months).set_index("period_key")
+
+    # One row per day with the keys of its ISO week and its month
+    days = pd.date_range(date(first_year, 1, 1), date(last_year, 12, 31), freq="D")
+    iso = days.isocalendar()
+    days_df = pd.DataFrame({
+        "week_key": (iso["year"].astype("int64") * 100 + iso["week"].astype("int64")).to_numpy(),
+        "iso_year": iso["year"].astype("int64").to_numpy(),
+        "week": iso["week"].astype("int64").to_numpy(),
+        "month_key": days.year * 100 + days.month,
+    }, index=days)
+
+    return {
+        "weeks": weeks_df,
+        "months": months_df,
+        "days": days_df,
+        "week_index": weeks_df.to_dict(orient="index"),
+        "month_index": months_df.to_dict(orient="index"),
+    }
+
+
+def get_calendar(year=None):
+    """
+    Return the precomputed calendar, building it on first use.
+    If a year outside the configured range is requested, the range is extended.
+    """
+    first_year, last_year = CALENDAR_SETTINGS["first_year"], CALENDAR_SETTINGS["last_year"]
+    if year is not None and not first_year <= year <= last_year:
+        CALENDAR_SETTINGS["first_year"] = min(first_year, year)
+        CALENDAR_SETTINGS["last_year"] = max(last_year, year)
+        _CALENDAR.clear()
+    if not _CALENDAR:
+        _CALENDAR.update(build_calendar(CALENDAR_SETTINGS["first_year"], CALENDAR_SETTINGS["last_year"]))
+    return _CALENDAR
+
+
+def _valid_year(year):
+    # Keep a margin to date.min/date.max, the tables also hold the neighbouring days
+    return 1 < year < 9999
+
+
+def week_info(iso_year, week):
+    """
+    Look up an ISO week.
+
+    :return: Dict with label, iso_year, week, month, quarter, first_day, last_day, month_key;
+             None if the week does not exist.
+    """
+    if not _valid_year(iso_year):
+        return None
+    return get_calendar(iso_year)["week_index"].get(iso_year * 100 + week)
+
+
+def month_info(year, month):
+    """
+    Look up a calendar month.
+
+    :return: Dict with label, iso_year, week (ISO week of the first day), month, quarter,
+             first_day, last_day, week_key; None if the month does not exist.
+    """
+    if not _valid_year(year) or not 1 <= month <= 12:
+        return None
+    return get_calendar(year)["month_index"].get(year * 100 + month)
+
+
+def resolve_period(label, default_year=None):
+    """
+    Resolve a period label ('KW07', 'KW07 2025', 'WK07.2025', 'wk.07.2025' or '03.2025').
+    Labels without a year are resolved in default_year (the current year if not given).
+
+    :return: Dict with 'granularity' ('week' or 'month'), 'period_key' and the calendar fields;
+             None if the label is not a known period.
+    """
+    cache_key = (label, default_year)
+    if cache_key in _LABEL_CACHE:
+        return _LABEL_CACHE[cache_key]
+
+    result = None
+    text = str(label).strip()
+    week_match = WEEK_LABEL.match(text)
+    month_match = MONTH_LABEL.match(text)
+    if week_match:
+        week = int(week_match.group(1))
+        year = int(week_match.group(2)) if week_match.group(2) else (default_year or datetime.now().year)
+        info = week_info(year, week)
+        if info is not None:
+            result = dict(info, granularity="week", period_key=year * 100 + week)
+    elif month_match:
+        month, year = int(month_match.group(1)), int(month_match.group(2))
+        info = month_info(year, month)
+        if info is not None:
+            result = dict(info, granularity="month", period_key=year * 100 + month)
+
+    _LABEL_CACHE[cache_key] = result
+    return result
+
+
+def month_label(value):
+    """
+    Return the 'MM.YYYY' label of the month a date-like value falls in.
+    """
+    timestamp = pd.Timestamp(value)
+    return month_info(timestamp.year, timestamp.month)["label"]
+
+
+def period_label(value):
+    """
+    Return the canonical label of a period value: 'M.YYYY' for months, so '03.2025',
+    '3.2025' and 3.2025 all become '3.2025'. Week labels and other values are returned unchanged.
+    """
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        if not math.isfinite(value):
+            return value
+        # A month number followed by four decimals holding the year (10.202 is '10.2020')
+        text = f"{value:.4f}"
+    elif isinstance(value, str):
+        text = value.strip()
+    else:
+        return value
+    match = LOOSE_MONTH_LABEL.match(text)
+    if match is None:
+        return value
+    month, year = int(match.group(1)), int(match.group(2))
+    if month_info(year, month) is None:
+        return value
+    return f"{month}.{year}"
+
+
+def period_labels(values):
+    """
+    Return the canonical labels (see period_label) of a Series of periods.
+    Each distinct value is converted once; missing values are kept.
+    """
+    codes, uniques = pd.factorize(values)
+    labels = np.empty(len(uniques), dtype=object)
+    labels[:] = [period_label(value) for value in uniques]
+    converted = np.where(codes >= 0, labels[codes], values.to_numpy(dtype=object))
+    return pd.Series(converted, index=values.index, name=values.name, dtype=object)
+
+
+def week_of(value):
+    """
+    Return the ISO week (see week_info) a date-like value falls in.
+    """
+    iso_year, week, _ = pd.Timestamp(value).isocalendar()
+    return week_info(iso_year, week)
+
+
+def lookup_days(dates, column="week"):
+    """
+    Look up a calendar column ('week', 'iso_year', 'week_key' or 'month_key') for a Series of dates.
+
+    :param dates: Series of datetimes (NaT allowed).
+    :param column: Column of the day table to return.
+    :return: Int64 Series aligned with dates; <NA> for missing dates.
+    """
+    dates = pd.to_datetime(dates, errors="coerce")
+    valid_years = dates.dt.year.dropna()
+    calendar = get_calendar()
+    if not valid_years.empty:
+        get_calendar(int(valid_years.min()))
+        calendar = get_calendar(int(valid_years.max()))
+    days = calendar["days"]
+    positions = days.index.get_indexer(dates.dt.normalize())
+    values = days[column].to_numpy()[positions]
+    return pd.Series(values, index=dates.index, dtype="Int64").mask(positions < 0)
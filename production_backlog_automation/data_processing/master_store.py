@@ -0,0 +1,196 @@
+import glob
+import logging
+import numbers
+import os
+import shutil
+from datetime import datetime
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Every master file gets a sibling directory holding one sub-folder per day
+# (e.g. output4(perfect)_store/Date=2025-03-04/part-103000-000001.parquet).
+# A run only writes a new part file, so the cost of an append does not grow
+# with the backlog history.
+STORE_SUFFIX = "_store"
+PARTITION_PREFIX = "Date="
+UNKNOWN_PARTITION = "unknown"
+
+# Object columns of numbers are written as numeric columns; columns mixing numbers and
+# text are split into a text and a numeric '<col>__numbers' column and named in the part
+# file, so reading merges them back.
+MIXED_COLUMNS_ATTR = "mixed_columns"
+NUMBERS_SUFFIX = "__numbers"
+NUMERIC_INFERRED_TYPES = ("integer", "floating", "mixed-integer-float", "decimal")
+
+
+def get_store_path(master_file_path):
+    """Return the partitioned store directory that belongs to a master file."""
+    root, _ = os.path.splitext(master_file_path)
+    return root + STORE_SUFFIX
+
+
+def partition_key(date_value):
+    """Return the partition folder name for a single 'Date' value."""
+    timestamp = pd.to_datetime(date_value, errors='coerce')
+    if pd.isna(timestamp):
+        return PARTITION_PREFIX + UNKNOWN_PARTITION
+    return PARTITION_PREFIX + timestamp.strftime('%Y-%m-%d')
+
+
+def list_partitions(master_file_path):
+    """List the partition folders of a store, oldest first."""
+    store_path = get_store_path(master_file_path)
+    if not os.path.isdir(store_path):
+        return []
+    return sorted(name for name in os.listdir(store_path) if name.startswith(PARTITION_PREFIX))
+
+
+def _make_arrow_safe(df):
+    """
+    Prepare a DataFrame for pyarrow. Object columns holding only numbers become numeric;
+    columns mixing numbers and text keep the text and move the numbers to a '<col>__numbers'
+    column. The mixed columns are listed in df.attrs, which pandas stores in the part file,
+    so _read_part can merge them back.
+    """
+    df = df.copy()
+    mixed_columns = []
+    for col in df.columns:
+        if df[col].dtype == object:
+            inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+            if inferred in NUMERIC_INFERRED_TYPES:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            elif inferred.startswith('mixed'):
+                is_number = df[col].map(_is_number)
+                text = df[col].where(~is_number)
+                df[f"{col}{NUMBERS_SUFFIX}"] = pd.to_numeric(df[col].where(is_number), errors='coerce')
+                df[col] = text.where(text.isna(), text.astype(str))
+                mixed_columns.append(str(col))
+    df.columns = [str(col) for col in df.columns]
+    df.attrs = {MIXED_COLUMNS_ATTR: mixed_columns} if mixed_columns else {}
+    return df
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def _read_part(part_path, columns=None):
+    """Read one part file and restore the numbers of its mixed columns."""
+    if columns is not None:
+        stored = pq.read_schema(part_path).names
+        columns = list(columns) + [f"{col}{NUMBERS_SUFFIX}" for col in columns if f"{col}{NUMBERS_SUFFIX}" in stored]
+    df = pd.read_parquet(part_path, columns=columns, engine='pyarrow')
+    for col in df.attrs.pop(MIXED_COLUMNS_ATTR, []):
+        numbers_col = f"{col}{NUMBERS_SUFFIX}"
+        if numbers_col in df.columns:
+            if col in df.columns:
+                df[col] = df[col].astype(object).where(df[numbers_col].isna(), df[numbers_col])
+            df = df.drop(columns=numbers_col)
+    return df
+
+
+def partition_keys(df, date_column='Date'):
+    """Return the partition folder name of every row."""
+    if date_column in df.columns:
+        return pd.to_datetime(df[date_column], errors='coerce').map(partition_key)
+    return pd.Series(PARTITION_PREFIX + UNKNOWN_PARTITION, index=df.index)
+
+
+def _write_part(df, partition_dir):
+    """Write one part file into a partition folder and return its path."""
+    os.makedirs(partition_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%H%M%S%f')
+    part_path = os.path.join(partition_dir, f"part-{stamp}-{os.getpid()}.parquet")
+    tmp_path = part_path + ".tmp"
+    _make_arrow_safe(df).to_parquet(tmp_path, index=False, engine='pyarrow')
+    os.replace(tmp_path, part_path)
+    return part_path
+
+
+def _read_partition_dir(partition_dir):
+    frames = [_read_part(path) for path in sorted(glob.glob(os.path.join(partition_dir, "*.parquet")))]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _seed_from_excel(master_file_path, date_column='Date'):
+    """
+    Copy an existing master workbook into the store once, so no history is lost
+    when switching from the .xlsx master to the partitioned store.
+    """
+    store_path = get_store_path(master_file_path)
+    if os.path.isdir(store_path) or not os.path.exists(master_file_path):
+        return
+    legacy_df = pd.read_excel(master_file_path, sheet_name="Sheet1", engine="openpyxl")
+    logging.info(f"📌 Migrating {len(legacy_df)} rows from {master_file_path} into {store_path}")
+    os.makedirs(store_path, exist_ok=True)
+    for key, part in legacy_df.groupby(partition_keys(legacy_df, date_column), sort=True):
+        _write_part(part, os.path.join(store_path, key))
+
+
+def read_master(master_file_path):
+    """Read the full history of a master file, falling back to the legacy .xlsx master."""
+    store_path = get_store_path(master_file_path)
+    if not os.path.isdir(store_path):
+        if os.path.exists(master_file_path):
+            return pd.read_excel(master_file_path, sheet_name="Sheet1", engine="openpyxl")
+        return pd.DataFrame()
+
+    frames = [_read_partition_dir(os.path.join(store_path, partition))
+              for partition in list_partitions(master_file_path)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def list_parts(master_file_path):
+    """
+    List the part files of a store as 'Date=YYYY-MM-DD/part-....parquet', oldest partition first.
+    A legacy .xlsx master is copied into the store first, so its rows are listed as well.
+    """
+    _seed_from_excel(master_file_path)
+    store_path = get_store_path(master_file_path)
+    return [f"{partition}/{os.path.basename(path)}"
+            for partition in list_partitions(master_file_path)
+            for path in sorted(glob.glob(os.path.join(store_path, partition, "*.parquet")))]
+
+
+def read_parts(master_file_path, parts):
+    """Read the given part files of a store (as listed by list_parts) into one DataFrame."""
+    store_path = get_store_path(master_file_path)
+    frames = [_read_part(os.path.join(store_path, part)) for part in parts]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def append_partition(df, master_file_path, date_column='Date'):
+    """Append rows to the store. Only new part files are written."""
+    if df is None or df.empty:
+        logging.info(f"📌 No rows to append to {master_file_path}.")
+        return 0
+    _seed_from_excel(master_file_path, date_column=date_column)
+    store_path = get_store_path(master_file_path)
+    for key, part in df.groupby(partition_keys(df, date_column), sort=True):
+        _write_part(part, os.path.join(store_path, key))
+    logging.info(f"✔ Appended {len(df)} rows to {store_path}")
+    return len(df)
+
+
+def export_to_excel(master_file_path):
+    """Write the full store back to the .xlsx master so Power BI can keep reading it."""
+    if not os.path.isdir(get_store_path(master_file_path)):
+        return
+    try:
+        df = read_master(master_file_path)
+        with pd.ExcelWriter(master_file_path, engine='openpyxl') as writer:
+            df.to_excel(writer, sheet_name='Sheet1', index=False)
+        logging.info(f"✔ Exported {len(df)} rows to {master_file_path}")
+    except Exception as e:
+        logging.error(f"⚠ Export failed for {master_file_path}: {str(e)}")
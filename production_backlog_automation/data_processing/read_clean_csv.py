@@ -4,6 +4,7 @@ import re
 import logging
 import yaml  # ✅ Import YAML
 from datetime import datetime
+from data_processing.master_store import append_partition
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -18,6 +19,52 @@ def load_config(yaml_path="config.yaml"):
     with open(yaml_path, "r", encoding="utf-8") as file:
         return yaml.safe_load(file)  # Load the YAML file safely
 
+# Leading "+"/"-" tree markers of the wayconnect export (e.g. '+ "0100 | AG1 | PB1 | ...')
+TREE_MARKER = re.compile(r"^[ \t]*[-+]\s+")
+
+def clean_line(line):
+    """Strips a line and removes its leading tree marker."""
+    return TREE_MARKER.sub("", line.strip())
+
+class CleanedLineReader:
+    """
+    File-like wrapper that hands the cleaned lines of an open text file to pd.read_csv on demand.
+    Lines are cleaned while the parser reads them, so no cleaned copy of the whole file is built.
+    """
+
+    def __init__(self, file):
+        self._lines = (clean_line(line) + "\n" for line in file)
+        self._buffer = ""
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            data = self._buffer + "".join(self._lines)
+            self._buffer = ""
+            return data
+
+        parts = [self._buffer]
+        length = len(self._buffer)
+        while length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        self._buffer = data[size:]
+        return data[:size]
+
+    def readline(self, size=-1):
+        if "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            return line + "\n"
+        line = self._buffer + next(self._lines, "")
+        self._buffer = ""
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, "")
+
 # ✅ Get the Timestamp from Config
 def get_timestamp(config):
     """Returns a rounded timestamp if enabled in config."""
@@ -33,23 +80,43 @@ def read_and_clean_csv(file_path, config):
         logging.error(f"❌ File not found: {file_path}")
         return pd.DataFrame()
 
-    cleaned_lines = []
+    # ✅ Lines are cleaned on the fly while the parser reads them
     with open(file_path, "r", encoding="utf-8-sig") as f:  # ✅ FIXED ENCODING
-        for line in f:
-            line = line.strip()
-            line = re.sub(r"^[ \t]*[-+]\s+", "", line)
-            cleaned_lines.append(line)
+        df = pd.read_csv(CleanedLineReader(f), delimiter=";", header=1)
 
-    cleaned_text = "\n".join(cleaned_lines)
+    return df
 
-    # ✅ Read CSV with correct encoding
-    df = pd.read_csv(pd.io.common.StringIO(cleaned_text), delimiter=";", header=1, encoding="utf-8-sig")
+# Numeric columns of the backlog export; every other column is read as text. Declaring the
+# dtypes keeps them identical in every chunk instead of inferring them per chunk
+# (e.g. 'Gut Menge' is text in a full read because of blank cells, but numbers in a chunk without them).
+NUMERIC_COLUMNS = re.compile(r"^(?:Vorgangsmenge|Gut Menge\(Szen\.:Produktiv \*\)|Arbeitsfolge Nr\.)")
 
-    return df
+def declare_dtypes(columns):
+    """Returns the declared dtypes of a header: float64 for the numeric columns, text otherwise."""
+    return {col: "float64" if NUMERIC_COLUMNS.search(col) else "str" for col in columns}
+
+def read_header(file_path):
+    """Returns the column names of the export (header in the second line), named as in a full read."""
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        return list(pd.read_csv(CleanedLineReader(f), delimiter=";", header=1, nrows=0).columns)
+
+# ✅ Read & Clean CSV in Chunks
+def iter_clean_csv_chunks(file_path, chunk_rows):
+    """Reads and cleans a CSV file in chunks of chunk_rows rows with declared dtypes (generator of DataFrames)."""
+    if not os.path.exists(file_path):
+        logging.error(f"❌ File not found: {file_path}")
+        return
+
+    dtypes = declare_dtypes(read_header(file_path))
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        with pd.read_csv(CleanedLineReader(f), delimiter=";", header=1, dtype=dtypes,
+                         chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield chunk
 
 # ✅ Clean DataFrame Based on Config
-def clean_dataframe(df, config):
-    """Performs cleaning operations on the DataFrame."""
+def clean_dataframe(df, config, timestamp=None):
+    """Performs cleaning operations on the DataFrame. timestamp defaults to get_timestamp(config)."""
     #df.columns = df.columns.str.encode("latin1").str.decode("utf-8")  # ✅ Fix encoding issue
     df.columns = df.columns.str.replace("🔑", "", regex=True).str.strip()
     drop_columns = config["columns"]["drop_columns"]
@@ -79,33 +146,15 @@ def clean_dataframe(df, config):
             df.rename(columns={col: col}, inplace=True)  # ✅ Ensure exact column names
 
 
-    df["Date"] = get_timestamp(config)  # ✅ FIXED: Correct timestamp handling
+    df["Date"] = timestamp if timestamp is not None else get_timestamp(config)  # ✅ FIXED: Correct timestamp handling
     return df
 
-# ✅ Append Data to Excel
+# ✅ Append Data to the Master Store
 def append_to_excel(df, file_path):
-    """Appends new data to the existing Excel file, handling errors properly."""
-    if os.path.exists(file_path):
-        try:
-            # ✅ Try reading the existing file
-            existing_df = pd.read_excel(file_path, sheet_name="Sheet1", engine="openpyxl")
-            
-            # ✅ Append new data
-            df_combined = pd.concat([existing_df, df], ignore_index=True)
-            logging.info(f"✔ Successfully appended {len(df)} rows to {file_path}")
-
-        except Exception as e:
-            logging.error(f"⚠ Error reading {file_path}: {str(e)}. Creating a new file.")
-            df_combined = df  # If the file is corrupted, overwrite it
-
-    else:
-        df_combined = df  # If file doesn't exist, create a new one
-
-    # ✅ Save the DataFrame back to Excel
+    """Appends new data as a new date partition next to the Excel file, without rewriting the history."""
     try:
-        df_combined.to_excel(file_path, index=False, engine="openpyxl")  # ✅ Removed 'encoding'
-        logging.info(f"✔ Data saved successfully to {file_path}")
-    
+        rows = append_partition(df, file_path)
+        logging.info(f"✔ Successfully appended {rows} rows to {file_path}")
     except Exception as e:
         logging.error(f"❌ Failed to save {file_path}: {str(e)}")
 
@@ -114,6 +163,11 @@ def process_csv(config):
     input_path = config["paths"]["input_csv"]
     output_path = config["paths"]["output_excel"]
 
+    chunk_rows = config.get("reading", {}).get("chunk_rows")
+    if chunk_rows:
+        process_csv_in_chunks(input_path, output_path, config, int(chunk_rows))
+        return
+
     df = read_and_clean_csv(input_path, config)
     if df.empty:
         logging.error("❌ No data read from the CSV. Exiting.")
@@ -121,3 +175,19 @@ def process_csv(config):
 
     df = clean_dataframe(df, config)
     append_to_excel(df, output_path)
+
+# ✅ Process CSV Chunk by Chunk
+def process_csv_in_chunks(input_path, output_path, config, chunk_rows):
+    """Cleans and appends the CSV chunk by chunk, so only one chunk is held in memory."""
+    timestamp = get_timestamp(config)  # ✅ Same timestamp for all chunks of the run
+    rows = 0
+    for chunk in iter_clean_csv_chunks(input_path, chunk_rows):
+        df = clean_dataframe(chunk, config, timestamp)
+        if not df.empty:
+            append_to_excel(df, output_path)
+            rows += len(df)
+
+    if rows == 0:
+        logging.error("❌ No data read from the CSV. Exiting.")
+        return
+    logging.info(f"✔ Processed {rows} rows in chunks of {chunk_rows}")
@@ -1,6 +1,10 @@
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import os
+import json
+from data_processing.master_store import list_parts, read_parts
+from data_processing.calendar_dimension import lookup_days, week_of
 #import yaml
 def get_timestamp(config):
     """Returns a rounded timestamp if enabled in config."""
@@ -9,44 +13,251 @@ def get_timestamp(config):
     else:
         return pd.Timestamp.now()
 
+# Durations like "12220:00" (hours:minutes, hours may exceed 24)
+DURATION_PATTERN = r"^\s*([+-]?[0-9]+)\s*:\s*([+-]?[0-9]+)\s*$"
+
+def parse_durations(values):
+    """
+    Converts 'HH:MM' values to minutes.
+    Each distinct value is parsed once (vectorized) and mapped back to the rows by its code.
+    Missing values count as 0 minutes. Other values that are not 'HH:MM' also count as 0,
+    but are counted and reported with a few examples.
+
+    :return: int64 Series of minutes aligned with values.
+    """
+    codes, uniques = pd.factorize(values.astype("string"))
+    text = pd.Series(uniques, dtype="string")
+    parts = text.str.extract(DURATION_PATTERN)
+    unique_minutes = (pd.to_numeric(parts[0]).fillna(0).to_numpy(dtype="int64") * 60
+                      + pd.to_numeric(parts[1]).fillna(0).to_numpy(dtype="int64"))
+    # Missing values (code -1) pick the trailing 0
+    minutes = np.append(unique_minutes, 0)[codes]
+
+    invalid_unique = (parts[0].isna() & (text.str.strip() != "")).to_numpy(dtype=bool)
+    invalid_rows = int(np.isin(codes, np.flatnonzero(invalid_unique)).sum())
+    if invalid_rows:
+        examples = text[invalid_unique].head(5).tolist()
+        print(f"⚠ {invalid_rows} invalid duration value(s) counted as 00:00, e.g. {examples}")
+
+    return pd.Series(minutes, index=values.index)
+
+def format_durations(minutes):
+    """
+    Formats minutes as 'HH:MM' (vectorized; hours are not wrapped at 24).
+    """
+    minutes = np.asarray(minutes, dtype="int64")
+    hours = pd.Series(minutes // 60).astype(str).str.zfill(2)
+    rest = pd.Series(minutes % 60).astype(str).str.zfill(2)
+    return (hours + ":" + rest).tolist()
+
+# Columns of the backlog used by the weekly summary
+COLUMN_KOMMENTAR = "Kommentar in Prod - INFO11"
+COLUMN_REST_BELASTUNG = "Rest-Belastung Gesamt Personal aktuel"
+COLUMN_DATE = "Date"
+
+# A weekly row is identified by ISO year + ISO week
+WEEKLY_KEY = ["Year", "KW"]
+
+def summarize_minutes(df_input):
+    """
+    Sums the remaining load in minutes per (ISO year, ISO week, comment) with one groupby.
+
+    :param df_input: Backlog rows with the columns 'Kommentar in Prod - INFO11',
+                     'Rest-Belastung Gesamt Personal aktuel' and 'Date'.
+    :return: int64 Series indexed by (Year, Week, comment); empty if a column is missing.
+    """
+    if not all(col in df_input.columns for col in (COLUMN_KOMMENTAR, COLUMN_REST_BELASTUNG, COLUMN_DATE)):
+        return empty_minutes()
+    dates = pd.to_datetime(df_input[COLUMN_DATE], errors='coerce')
+    minutes = parse_durations(df_input[COLUMN_REST_BELASTUNG])
+    summed_values = minutes.groupby([
+        lookup_days(dates, "iso_year").rename("Year"),
+        lookup_days(dates, "week").rename("Week"),
+        df_input[COLUMN_KOMMENTAR].rename(COLUMN_KOMMENTAR),
+    ]).sum()
+    return summed_values.astype("int64")
+
+def empty_minutes():
+    """Returns an empty minutes Series as produced by summarize_minutes."""
+    index = pd.MultiIndex.from_arrays([[], [], []], names=["Year", "Week", COLUMN_KOMMENTAR])
+    return pd.Series([], index=index, dtype="int64")
+
+def format_weeks(summed_values, timestamp):
+    """
+    Builds the weekly rows from the minutes of summarize_minutes.
+
+    :param timestamp: Value of the 'Timestamp' column of the weekly rows.
+    :return: One row per week: KW, Year, Timestamp and one 'HH:MM' column per comment
+             (empty if a comment does not occur in that week), ordered by year and week.
+    """
+    if summed_values.empty:
+        return pd.DataFrame(columns=["KW", "Year", "Timestamp"])
+
+    formatted = pd.Series(format_durations(summed_values.to_numpy()), index=summed_values.index)
+    df_weekly = formatted.unstack(COLUMN_KOMMENTAR)
+    df_weekly.columns.name = None
+    df_weekly = df_weekly.reset_index()
+    df_weekly.insert(0, "KW", [f"KW{week:02d}" for week in df_weekly.pop("Week")])
+    df_weekly["Year"] = df_weekly["Year"].astype(int)
+    df_weekly.insert(2, "Timestamp", timestamp)
+    return df_weekly
+
+def summarize_weeks(df_input, timestamp):
+    """
+    Sums the remaining load per comment for every (ISO year, ISO week) of the backlog (see format_weeks).
+    """
+    return format_weeks(summarize_minutes(df_input), timestamp)
+
+# ✅ Running weekly aggregates
+def get_state_path(config):
+    """Returns the path of the weekly state file (paths.weekly_state, default next to weekly_output)."""
+    state_path = config["paths"].get("weekly_state")
+    if state_path:
+        return state_path
+    return os.path.splitext(config["paths"]["weekly_output"])[0] + "_state.json"
+
+def load_weekly_state(state_path):
+    """
+    Loads the running minutes per (ISO year, ISO week, comment) and the store part files they include.
+
+    :return: (Series as produced by summarize_minutes, list of part files), or None if there is
+             no (readable) state file. States written before the part files were recorded count as missing.
+    """
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, "r", encoding="utf-8") as file:
+            state = json.load(file)
+        records, parts = state["minutes"], state.get("parts")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠ Weekly state {state_path} could not be read: {e}")
+        return None
+    if parts is None:
+        print(f"⚠ Weekly state {state_path} does not list its part files.")
+        return None
+    if not records:
+        return empty_minutes(), parts
+    years, weeks, comments, minutes = zip(*records)
+    index = pd.MultiIndex.from_arrays([list(years), list(weeks), list(comments)],
+                                      names=["Year", "Week", COLUMN_KOMMENTAR])
+    return pd.Series(minutes, index=index, dtype="int64"), parts
+
+def save_weekly_state(summed_values, parts, state_path):
+    """Writes the running minutes and the part files they include atomically to the state file."""
+    records = [[int(year), int(week), comment, int(minutes)]
+               for (year, week, comment), minutes in summed_values.items()]
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump({"version": 2, "parts": list(parts), "minutes": records}, file, ensure_ascii=False)
+    os.replace(tmp_path, state_path)
+
+def add_minutes(state, new_minutes):
+    """Adds new minutes to the running state (both as produced by summarize_minutes)."""
+    for summed_values in new_minutes:
+        if not summed_values.empty:
+            state = state.add(summed_values, fill_value=0).astype("int64")
+    return state
+
+def update_weekly_state(input_path, state_path):
+    """
+    Adds the minutes of every part file of the backlog store that the state does not include yet:
+    the rows of this run, and rows of an earlier run that stopped before its state was saved.
+    Without a state file, every part file is read once.
+
+    :return: The updated running minutes (also written to state_path).
+    """
+    parts = list_parts(input_path)
+    loaded = load_weekly_state(state_path)
+    if loaded is None:
+        print(f"⚠ No weekly state found, building {state_path} from the backlog history once.")
+        state, known_parts = empty_minutes(), set()
+    else:
+        state, known_parts = loaded[0], set(loaded[1])
+
+    missing_parts = [part for part in parts if part not in known_parts]
+    if missing_parts:
+        state = add_minutes(state, [summarize_minutes(read_parts(input_path, missing_parts))])
+    save_weekly_state(state, parts, state_path)
+    return state
+
+def weekly_keys(df_weekly):
+    """
+    Returns the (Year, KW) key of every row of a weekly output.
+    Rows written before the 'Year' column existed get the ISO year of their 'Timestamp'.
+    """
+    if "Year" in df_weekly.columns:
+        years = pd.to_numeric(df_weekly["Year"], errors="coerce").astype("Int64")
+    else:
+        years = pd.Series(pd.NA, index=df_weekly.index, dtype="Int64")
+    if "Timestamp" in df_weekly.columns:
+        years = years.fillna(lookup_days(df_weekly["Timestamp"], "iso_year"))
+    return years, df_weekly["KW"].astype(str)
+
+def read_weekly_output(output_path):
+    """Reads the weekly output (empty frame if it does not exist yet)."""
+    if not os.path.exists(output_path):
+        return pd.DataFrame()
+    return pd.read_excel(output_path, sheet_name="Sheet1", engine="openpyxl")
+
+def upsert_weekly_rows(df_weekly, output_path):
+    """
+    Writes weekly rows into the weekly output, replacing existing rows with the same ISO year + week.
+    The result is ordered by year and week.
+    """
+    existing_df = read_weekly_output(output_path)
+    if not existing_df.empty:
+        years, weeks = weekly_keys(existing_df)
+        existing_df["Year"] = years
+        new_keys = pd.MultiIndex.from_frame(df_weekly[WEEKLY_KEY])
+        existing_df = existing_df[~pd.MultiIndex.from_arrays([years, weeks]).isin(new_keys)]
+
+    df_combined = pd.concat([existing_df, df_weekly], ignore_index=True)
+    df_combined = df_combined.sort_values(WEEKLY_KEY, kind="stable", ignore_index=True)
+    front = ["KW", "Year", "Timestamp"]
+    df_combined = df_combined[front + [col for col in df_combined.columns if col not in front]]
+    df_combined.to_excel(output_path, index=False, engine="openpyxl")
+    print(f"✔ {len(df_weekly)} week(s) have been written to: {output_path}")
+
 def process_weekly_data(config):
+    """
+    Builds the weekly summary of the backlog.
+    - mode "current" (default): adds the part files of the backlog store that the running weekly
+      state does not include yet (normally the rows of this run) and appends the summary of the
+      current ISO week. The backlog history is only read once to create a missing state file.
+    - mode "backfill" (or "rebuild"): re-reads the full backlog history, rebuilds the state
+      and upserts every week into weekly_output by year + week.
+    """
     input_path = config["paths"]["output_excel"]
     output_path = config["paths"]["weekly_output"]
-    
-    df_input = pd.read_excel(input_path, sheet_name="Sheet1", engine="openpyxl")
-    
-    column_kommentar = "Kommentar in Prod - INFO11"
-    column_rest_belastung = "Rest-Belastung Gesamt Personal aktuel"
-    column_date = "Date"
-
-    if column_kommentar in df_input.columns and column_rest_belastung in df_input.columns and column_date in df_input.columns:
-        df_input[column_date] = pd.to_datetime(df_input[column_date], errors='coerce')
-        
-        today = datetime.now()
-        current_week = today.isocalendar()[1]
-        
-        df_input["Week_Number"] = df_input[column_date].dt.isocalendar().week
-        df_input = df_input[df_input["Week_Number"] == current_week]
-
-        if df_input.empty:
-            print(f"⚠ No new data found for KW{current_week:02d}. Exiting.")
+    state_path = get_state_path(config)
+    mode = config.get("weekly", {}).get("mode", "current")
+
+    if mode in ("backfill", "rebuild"):
+        parts = list_parts(input_path)
+        state = summarize_minutes(read_parts(input_path, parts))
+        save_weekly_state(state, parts, state_path)
+        df_weekly = format_weeks(state, get_timestamp(config))
+        if df_weekly.empty:
+            print("⚠ No dated backlog rows found. Nothing to backfill.")
             return
-        
-        def time_to_minutes(time_str):
-            try:
-                h, m = map(int, time_str.split(":"))
-                return h * 60 + m
-            except:
-                return 0
-        
-        df_input[column_rest_belastung] = df_input[column_rest_belastung].astype(str).apply(time_to_minutes)
-        summed_values = df_input.groupby(column_kommentar)[column_rest_belastung].sum()
-
-        df_weekly = pd.DataFrame([{"KW": f"KW{current_week:02d}", "Timestamp": get_timestamp(config)}])
-        for comment_name, total_minutes in summed_values.items():
-            df_weekly[comment_name] = f"{total_minutes // 60:02d}:{total_minutes % 60:02d}"
-
-        existing_df = pd.read_excel(output_path, sheet_name="Sheet1", engine="openpyxl") if os.path.exists(output_path) else pd.DataFrame()
-        df_combined = pd.concat([existing_df, df_weekly], ignore_index=True)
-        df_combined.to_excel(output_path, index=False, engine="openpyxl")
-        print(f"✔ Data has been appended to: {output_path}")
+        upsert_weekly_rows(df_weekly, output_path)
+        return
+
+    state = update_weekly_state(input_path, state_path)
+
+    today = week_of(datetime.now())
+    current_week = today["week"]
+
+    # Only the current ISO week (year and week)
+    in_current_week = ((state.index.get_level_values("Year") == today["iso_year"])
+                       & (state.index.get_level_values("Week") == current_week))
+    if not in_current_week.any():
+        print(f"⚠ No new data found for KW{current_week:02d}. Exiting.")
+        return
+
+    df_weekly = format_weeks(state[in_current_week], get_timestamp(config))
+
+    existing_df = read_weekly_output(output_path)
+    df_combined = pd.concat([existing_df, df_weekly], ignore_index=True)
+    df_combined.to_excel(output_path, index=False, engine="openpyxl")
+    print(f"✔ Data has been appended to: {output_path}")
@@ -2,6 +2,8 @@ import logging
 import yaml
 from data_processing.read_clean_csv import process_csv
 from data_processing.weekly_aggregation import process_weekly_data
+from data_processing.master_store import export_to_excel
+from data_processing.calendar_dimension import configure_calendar
 
 # Load Configuration
 with open("config/config.yaml", "r") as file:
@@ -16,6 +18,7 @@ logging.basicConfig(
 
 if __name__ == "__main__":
     logging.info("🚀 Production backlog processing started...")
+    configure_calendar(config)
 
     # Process CSV and Append to Excel
     process_csv(config)
@@ -23,4 +26,8 @@ if __name__ == "__main__":
     # Process Weekly Aggregation
     process_weekly_data(config)
 
+    # Export the backlog store to Excel for Power BI
+    if config.get("storage", {}).get("export_excel", True):
+        export_to_excel(config["paths"]["output_excel"])
+
     logging.info("✅ Production backlog processing completed successfully!")
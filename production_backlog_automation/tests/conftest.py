@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+import yaml
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Export bundled with the repository (65 backlog rows)
+SAMPLE_CSV = os.path.join(ROOT, "exp_waycon_0100_PB_execution not according plan last week.csv")
+
+
+@pytest.fixture
+def config(tmp_path):
+    """config.yaml with the sample export as input and all outputs in tmp_path."""
+    with open(os.path.join(ROOT, "config", "config.yaml"), "r", encoding="utf-8") as file:
+        config = yaml.safe_load(file)
+    config["paths"] = {
+        "input_csv": SAMPLE_CSV,
+        "output_excel": str(tmp_path / "output.xlsx"),
+        "weekly_output": str(tmp_path / "weekly.xlsx"),
+        "weekly_state": str(tmp_path / "weekly_state.json"),
+    }
+    return config
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from data_processing import read_clean_csv
+from data_processing.master_store import read_master
+
+RUN_STAMP = pd.Timestamp("2025-03-04 10:00")
+
+
+@pytest.fixture(autouse=True)
+def fixed_timestamp(monkeypatch):
+    monkeypatch.setattr(read_clean_csv, "get_timestamp", lambda config: RUN_STAMP)
+
+
+def test_chunks_are_typed_alike(config):
+    input_csv = config["paths"]["input_csv"]
+    full = read_clean_csv.read_and_clean_csv(input_csv, config)
+    chunks = list(read_clean_csv.iter_clean_csv_chunks(input_csv, 7))
+
+    assert sum(len(chunk) for chunk in chunks) == len(full) == 65
+    dtypes = {col: {str(chunk[col].dtype) for chunk in chunks} for col in full.columns}
+    assert all(len(kinds) == 1 for kinds in dtypes.values()), dtypes
+    # 'Gut Menge' has blank cells, so a full read returns text; so does every chunk
+    assert dtypes["Gut Menge"] == {str(full["Gut Menge"].dtype)}
+
+
+def test_chunked_run_stores_the_same_rows_as_a_full_run(config, tmp_path):
+    read_clean_csv.process_csv(config)
+    full = read_master(config["paths"]["output_excel"])
+
+    config["paths"]["output_excel"] = str(tmp_path / "chunked.xlsx")
+    config["reading"] = {"chunk_rows": 7}
+    read_clean_csv.process_csv(config)
+    chunked = read_master(config["paths"]["output_excel"])
+
+    assert len(full) == 65
+    pd.testing.assert_frame_equal(full, chunked)
@@ -0,0 +1,94 @@
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+from data_processing import weekly_aggregation
+from data_processing.master_store import read_master
+from data_processing.read_clean_csv import process_csv
+
+
+def time_to_minutes(time_str):
+    # Row-by-row parsing of the original weekly aggregation
+    try:
+        h, m = map(int, time_str.split(":"))
+        return h * 60 + m
+    except:  # noqa: E722
+        return 0
+
+
+def test_durations_are_parsed_like_before(capsys):
+    values = pd.Series(["01:30", "25:05", " 12220:00 ", "-01:30", "00:-05", "n/a", "1:2:3", "n/a", "", None])
+
+    minutes = weekly_aggregation.parse_durations(values)
+
+    assert minutes.tolist() == [time_to_minutes(value) for value in values.astype(str)]
+    assert minutes.tolist()[:5] == [90, 1505, 733200, -30, -5]
+    # Missing and empty values count as 0 without a warning; 'n/a' (twice) and '1:2:3' are reported
+    assert "3 invalid duration value(s)" in capsys.readouterr().out
+
+
+def test_durations_are_formatted_like_before():
+    minutes = [0, 59, 60, 1505, 733200, -30, -90]
+
+    assert weekly_aggregation.format_durations(minutes) == [f"{m // 60:02d}:{m % 60:02d}" for m in minutes]
+    assert weekly_aggregation.format_durations([1505, 733200]) == ["25:05", "12220:00"]
+
+
+def test_backfill_replaces_weeks_by_year_and_week(tmp_path):
+    output_path = str(tmp_path / "weekly.xlsx")
+    # Rows of an output written before the 'Year' column existed
+    pd.DataFrame({
+        "KW": ["KW52", "KW01", "KW01"],
+        "Timestamp": pd.to_datetime(["2024-12-23", "2025-01-02", "2026-01-01"]),
+        "Material": ["01:00", "02:00", "03:00"],
+    }).to_excel(output_path, index=False, engine="openpyxl")
+
+    weekly_aggregation.upsert_weekly_rows(pd.DataFrame({
+        "KW": ["KW01"], "Year": [2025], "Timestamp": pd.Timestamp("2025-03-04"), "Material": ["09:00"],
+    }), output_path)
+
+    df = pd.read_excel(output_path, engine="openpyxl")
+    assert list(zip(df["Year"], df["KW"], df["Material"])) == [
+        (2024, "KW52", "01:00"), (2025, "KW01", "09:00"), (2026, "KW01", "03:00")]
+
+
+def test_incremental_state_matches_a_backfill(config):
+    state_path = config["paths"]["weekly_state"]
+    for run in range(3):
+        process_csv(config)
+        # The second run stops before the weekly step: its rows are in the store, not in the state
+        if run != 1:
+            weekly_aggregation.process_weekly_data(config)
+    incremental = weekly_aggregation.load_weekly_state(state_path)[0]
+    current_week_row = weekly_aggregation.read_weekly_output(config["paths"]["weekly_output"]).iloc[-1]
+
+    backfill = copy.deepcopy(config)
+    backfill["weekly"] = {"mode": "backfill"}
+    weekly_aggregation.process_weekly_data(backfill)
+    rebuilt = weekly_aggregation.load_weekly_state(state_path)[0]
+
+    # The loaded state has int64 index levels, summarize_minutes has nullable ones
+    pd.testing.assert_series_equal(incremental.sort_index(), rebuilt.sort_index(), check_index_type=False)
+    history = weekly_aggregation.summarize_minutes(read_master(config["paths"]["output_excel"]))
+    pd.testing.assert_series_equal(rebuilt.sort_index(), history.sort_index(), check_index_type=False)
+    # The row of the current week written by the third run already includes the rows of all three runs
+    weekly = weekly_aggregation.read_weekly_output(config["paths"]["weekly_output"])
+    backfill_row = weekly[(weekly["Year"] == current_week_row["Year"]) & (weekly["KW"] == current_week_row["KW"])]
+    comments = [col for col in weekly.columns if col not in ("KW", "Year", "Timestamp")]
+    assert backfill_row[comments].iloc[0].tolist() == current_week_row[comments].tolist()
+
+
+def test_states_without_part_files_are_rebuilt(config):
+    process_csv(config)
+    # A state of the first version knows the minutes, but not the part files they came from
+    with open(config["paths"]["weekly_state"], "w", encoding="utf-8") as file:
+        json.dump({"version": 1, "minutes": [[2025, 10, "Material", 60]]}, file)
+
+    weekly_aggregation.process_weekly_data(config)
+
+    state, parts = weekly_aggregation.load_weekly_state(config["paths"]["weekly_state"])
+    assert len(parts) == 1
+    expected = weekly_aggregation.summarize_minutes(read_master(config["paths"]["output_excel"]))
+    pd.testing.assert_series_equal(state.sort_index(), expected.sort_index(), check_index_type=False)